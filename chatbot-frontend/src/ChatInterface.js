@@ -11,7 +11,7 @@ import {
     Tooltip,
     Card
 } from '@mui/material';
-import { useEffect, useState, useRef } from 'react';
+import { useCallback, useEffect, useState, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import SendIcon from '@mui/icons-material/Send';
 import SmartToyIcon from '@mui/icons-material/SmartToy';
@@ -21,6 +21,23 @@ import QuickActions from './components/QuickActions';
 import WelcomeMessage from './components/WelcomeMessage';
 import MobileHeader from './components/MobileHeader';
 
+// Quick-action answers are prefetched once, kept in localStorage and answered
+// locally; the stored ETag turns the background refresh into a bodiless 304
+const QUICK_ACTIONS_STORAGE_KEY = 'quickActionsBundle';
+const QUICK_ACTIONS_REFRESH_MS = 5 * 60 * 1000;
+const SOCKET_RETRY_MS = 2000;
+const SOCKET_MAX_RETRY_MS = 60000;
+
+const normalizeQuery = (text) => text.toLowerCase().replace(/[^\w\s]/g, ' ').replace(/\s+/g, ' ').trim();
+
+const readStoredBundle = () => {
+    try {
+        return JSON.parse(localStorage.getItem(QUICK_ACTIONS_STORAGE_KEY));
+    } catch (error) {
+        return null;
+    }
+};
+
 export default function ChatInterface() {
     const [messages, setMessages] = useState([]);
     const [input, setInput] = useState('');
@@ -28,14 +45,106 @@ export default function ChatInterface() {
     const [isTyping, setIsTyping] = useState(false);
     const [showWelcome, setShowWelcome] = useState(true);
     const messagesEndRef = useRef(null);
+    const quickActionsRef = useRef(readStoredBundle());
+    const quickActionsCheckedRef = useRef(0);
+    const socketRef = useRef(null);
+    const pendingRef = useRef({});
 
     // API URL from environment variable or default to localhost
     const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+    const SOCKET_URL = `${API_URL.replace(/^http/, 'ws')}/ws/chat/`;
+
+    const appendErrorMessage = () => {
+        setMessages((prev) => [...prev, {
+            id: Date.now() + 1,
+            text: "Sorry, I'm having trouble connecting right now. Please try again later.",
+            isBot: true,
+            timestamp: new Date(),
+            isError: true
+        }]);
+    };
+
+    // Answers arrive as start, part... and end frames on one connection per
+    // conversation; the bot message grows as each part arrives
+    const handleFrame = useCallback((frame) => {
+        if (frame.type === 'start') {
+            const botMsg = { ...frame, parts: [], isBot: true, timestamp: new Date() };
+            delete botMsg.type;
+            setIsTyping(false);
+            setMessages((prev) => [...prev, botMsg]);
+        } else if (frame.type === 'part') {
+            setMessages((prev) => prev.map((msg) => (
+                msg.id === frame.id ? { ...msg, parts: [...msg.parts, frame.part] } : msg
+            )));
+        } else if (frame.type === 'end' || frame.type === 'error') {
+            pendingRef.current[frame.id]?.(frame.type === 'end');
+            delete pendingRef.current[frame.id];
+        }
+    }, []);
+
+    useEffect(() => {
+        let closed = false;
+        let retry;
+        let delay = SOCKET_RETRY_MS;
+        const connect = () => {
+            const socket = new WebSocket(SOCKET_URL);
+            socket.onopen = () => {
+                delay = SOCKET_RETRY_MS;
+            };
+            socket.onmessage = (event) => handleFrame(JSON.parse(event.data));
+            socket.onclose = () => {
+                socketRef.current = null;
+                // Unfinished answers are reported as failed; new messages use REST until reconnected
+                Object.values(pendingRef.current).forEach((settle) => settle(false));
+                pendingRef.current = {};
+                if (!closed) {
+                    // Back off while the server cannot take sockets (e.g. WSGI-only runserver)
+                    retry = setTimeout(connect, delay);
+                    delay = Math.min(delay * 2, SOCKET_MAX_RETRY_MS);
+                }
+            };
+            socketRef.current = socket;
+        };
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            socketRef.current?.close();
+        };
+    }, [SOCKET_URL, handleFrame]);
 
     useEffect(() => {
         messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
     }, [messages]);
 
+    const revalidateQuickActions = useCallback(async () => {
+        quickActionsCheckedRef.current = Date.now();
+        const stored = quickActionsRef.current;
+        try {
+            const response = await axios.get(`${API_URL}/api/quick-actions/`, {
+                headers: stored?.etag ? { 'If-None-Match': stored.etag } : {},
+                validateStatus: (status) => status === 200 || status === 304
+            });
+            if (response.status === 200) {
+                const bundle = { etag: response.headers.etag, ...response.data };
+                quickActionsRef.current = bundle;
+                localStorage.setItem(QUICK_ACTIONS_STORAGE_KEY, JSON.stringify(bundle));
+            }
+        } catch (error) {
+            console.error("Failed to refresh quick actions", error);
+        }
+    }, [API_URL]);
+
+    // Prefetch at load so the first button press is already local
+    useEffect(() => {
+        revalidateQuickActions();
+    }, [revalidateQuickActions]);
+
+    const findQuickAnswer = (text) => {
+        const key = normalizeQuery(text);
+        return quickActionsRef.current?.actions?.find((action) => normalizeQuery(action.query) === key)?.response;
+    };
+
     const handleSend = async (messageText = input) => {
         if (!messageText.trim() || loading) return;
 
@@ -57,6 +166,38 @@ export default function ChatInterface() {
         };
         setMessages((prev) => [...prev, userMsg]);
 
+        // Quick-action questions are answered from the prefetched bundle
+        const quickAnswer = findQuickAnswer(userMessage);
+        if (quickAnswer) {
+            setMessages((prev) => [...prev, {
+                id: Date.now() + 1,
+                ...quickAnswer,
+                isBot: true,
+                timestamp: new Date()
+            }]);
+            setLoading(false);
+            setIsTyping(false);
+            if (Date.now() - quickActionsCheckedRef.current > QUICK_ACTIONS_REFRESH_MS) {
+                revalidateQuickActions();
+            }
+            return;
+        }
+
+        const socket = socketRef.current;
+        if (socket?.readyState === WebSocket.OPEN) {
+            const id = Date.now() + 1;
+            const answered = await new Promise((resolve) => {
+                pendingRef.current[id] = resolve;
+                socket.send(JSON.stringify({ id, message: userMessage }));
+            });
+            if (!answered) {
+                appendErrorMessage();
+            }
+            setLoading(false);
+            setIsTyping(false);
+            return;
+        }
+
         try {
             const response = await axios.post(`${API_URL}/api/chat/`, {
                 message: userMessage
@@ -71,14 +212,7 @@ export default function ChatInterface() {
             setMessages((prev) => [...prev, botMsg]);
         } catch (error) {
             console.error("Failed to fetch response", error);
-            const errorMsg = {
-                id: Date.now() + 1,
-                text: "Sorry, I'm having trouble connecting right now. Please try again later.",
-                isBot: true,
-                timestamp: new Date(),
-                isError: true
-            };
-            setMessages((prev) => [...prev, errorMsg]);
+            appendErrorMessage();
         } finally {
             setLoading(false);
             setIsTyping(false);
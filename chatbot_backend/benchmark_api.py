@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Framework overhead benchmark for the chat API.
+Drives the WSGI application in-process with a cached message so the time
+measured is almost entirely middleware, routing and (de)serialization.
+
+Usage:
+    python benchmark_api.py [--requests 2000]
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    'full': 'chatbot_backend.settings',
+    'lean': 'chatbot_backend.settings_api',
+}
+
+
+def run_profile(settings_module, total):
+    """Measure per-request latency for one settings profile (runs in a child process)"""
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    os.environ.setdefault('USE_SIMPLE_PROCESSOR', 'true')
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+
+    body = json.dumps({"message": "Tell me about Bale Mountains National Park"}).encode()
+
+    def make_environ():
+        return {
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/api/chat/',
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': '',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '8000',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost',
+            'HTTP_ORIGIN': 'http://localhost:3000',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+
+    status_holder = {}
+
+    def start_response(status, headers, exc_info=None):
+        status_holder['status'] = status
+
+    # Warm up: processor initialization, URL resolver and first-hit caches
+    for _ in range(50):
+        b''.join(application(make_environ(), start_response))
+    if not status_holder['status'].startswith('200'):
+        raise RuntimeError(f"Unexpected status {status_holder['status']}")
+
+    samples = []
+    for _ in range(total):
+        environ = make_environ()
+        start = time.perf_counter()
+        b''.join(application(environ, start_response))
+        samples.append((time.perf_counter() - start) * 1_000_000)
+
+    samples.sort()
+    return {
+        'mean_us': statistics.fmean(samples),
+        'p50_us': samples[len(samples) // 2],
+        'p99_us': samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--profile', choices=PROFILES.keys(), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(PROFILES[args.profile], args.requests)))
+        return
+
+    print("⏱️  Chat API framework overhead benchmark")
+    print("=" * 50)
+    results = {}
+    for name in PROFILES:
+        # Each profile needs its own process because Django settings are global
+        output = subprocess.run(
+            [sys.executable, __file__, '--profile', name, '--requests', str(args.requests)],
+            check=True, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+        r = results[name]
+        print(f"{name:>5}: mean {r['mean_us']:8.1f}µs  p50 {r['p50_us']:8.1f}µs  p99 {r['p99_us']:8.1f}µs")
+
+    saved = results['full']['mean_us'] - results['lean']['mean_us']
+    print(f"\n📉 Lean profile saves {saved:.1f}µs per request "
+          f"({saved / results['full']['mean_us'] * 100:.0f}% of framework overhead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Conditional-GET replay benchmark for the read endpoints.
+Simulates frontends and uptime checkers polling /api/chat/ and
+/api/weather/ and compares bytes sent and full renders when clients
+revalidate with If-None-Match, and origin hits when a shared CDN cache
+honours the s-maxage the backend advertises.
+
+Usage:
+    python benchmark_http_cache.py [--clients 20] [--polls 50] [--interval 30]
+"""
+
+import argparse
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('USE_SIMPLE_PROCESSOR', 'true')
+
+ENDPOINTS = ['/api/chat/', '/api/weather/']
+
+
+def shared_max_age(response):
+    match = re.search(r's-maxage=(\d+)', response.get('Cache-Control', ''))
+    return int(match.group(1)) if match else 0
+
+
+def replay(client, endpoint, clients, polls, interval, conditional, cdn):
+    sent_bytes = renders = origin_hits = 0
+    etags = {}
+    cdn_expires = -1
+    for tick in range(polls):
+        now = tick * interval
+        for c in range(clients):
+            # A shared cache answers on its own until its copy expires
+            if cdn and now < cdn_expires:
+                continue
+            headers = {}
+            if conditional and c in etags:
+                headers['HTTP_IF_NONE_MATCH'] = etags[c]
+            response = client.get(endpoint, **headers)
+            origin_hits += 1
+            sent_bytes += len(response.content)
+            renders += response.status_code == 200
+            etags[c] = response.get('ETag')
+            if cdn:
+                cdn_expires = now + shared_max_age(response)
+    return sent_bytes, renders, origin_hits
+
+
+MODES = [
+    ('unconditional', False, False),
+    ('If-None-Match', True, False),
+    ('behind CDN', True, True),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--polls', type=int, default=50)
+    parser.add_argument('--interval', type=int, default=30, help='seconds between polls (simulated)')
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.test import Client
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    from chatapi.utils.weather_service import get_weather_service
+
+    get_weather_service().refresh('bale mountains')
+    client = Client()
+    total = args.clients * args.polls
+
+    print("📡 Conditional GET replay")
+    print("=" * 50)
+    print(f"{args.clients} clients x {args.polls} polls every {args.interval}s per endpoint\n")
+    for endpoint in ENDPOINTS:
+        print(f"{endpoint}")
+        print(f"  {'mode':<15}{'bytes sent':>12}{'full renders':>14}{'origin hits':>13}")
+        for label, conditional, cdn in MODES:
+            sent_bytes, renders, origin_hits = replay(
+                client, endpoint, args.clients, args.polls, args.interval, conditional, cdn
+            )
+            print(f"  {label:<15}{sent_bytes:>12}{renders:>14}{origin_hits:>13}")
+        print(f"  ({total} polls per mode)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Per-request logging cost benchmark.
+Compares the old setup (a synchronous StreamHandler, two INFO records per
+chat request) with the async pipeline (AsyncHandler + SamplingFilter, one
+sampled JSON summary per request) on a stream that takes --write-us
+microseconds per write, standing in for a slow stdout or log shipper.
+Reports the time the request thread spends logging, per request.
+
+Usage:
+    python benchmark_logging.py [--requests 5000] [--write-us 200] [--sample-rate 0.05]
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from chatapi.utils.log_handlers import AsyncHandler, JsonFormatter, SamplingFilter, log_chat_request  # noqa: E402
+from chatapi.utils.query_log import QueryTrace  # noqa: E402
+
+MESSAGE = "How much are the park entrance fees for foreigners?"
+RESPONSE = {'intent': 'park_fees', 'confidence': 0.97}
+
+
+class SlowStream(io.StringIO):
+    def __init__(self, write_seconds):
+        super().__init__()
+        self.write_seconds = write_seconds
+
+    def write(self, text):
+        time.sleep(self.write_seconds)
+        return super().write(text)
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(f'benchmark.{name}')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def run_sync(requests, stream):
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('{levelname} {asctime} {module} {message}', style='{'))
+    logger = make_logger('sync', handler)
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        logger.info(f"Processing message: {MESSAGE}")
+        logger.info(f"Message processed successfully. Intent: {RESPONSE['intent']}")
+        timings.append(time.perf_counter() - started)
+    return timings, None
+
+
+def run_async(requests, stream, rate, max_per_second):
+    handler = AsyncHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    sampling = SamplingFilter(rate, max_per_second)
+    handler.addFilter(sampling)
+    logger = make_logger('async', handler)
+    trace = QueryTrace()
+    trace.tier = 'model'
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        log_chat_request(logger, MESSAGE, RESPONSE, trace, time.perf_counter())
+        timings.append(time.perf_counter() - started)
+    handler.stop()
+    return timings, {**handler.stats(), **sampling.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--write-us', type=float, default=200.0, help='simulated cost of one write to the log stream')
+    parser.add_argument('--sample-rate', type=float, default=0.05)
+    parser.add_argument('--max-per-second', type=int, default=None)
+    args = parser.parse_args()
+
+    print("📝 Per-request logging cost")
+    print("=" * 50)
+    print(f"{args.requests} requests, {args.write_us:g} µs per stream write, sample rate {args.sample_rate:g}")
+    print(f"\n{'pipeline':<10}{'mean':>11}{'p50':>11}{'p99':>11}{'lines':>8}")
+    runs = (
+        ('sync', lambda stream: run_sync(args.requests, stream)),
+        ('async', lambda stream: run_async(args.requests, stream, args.sample_rate, args.max_per_second)),
+    )
+    for name, run in runs:
+        stream = SlowStream(args.write_us / 1e6)
+        timings, stats = run(stream)
+        timings = np.array(timings) * 1e6
+        lines = stream.getvalue().count('\n')
+        print(f"{name:<10}{timings.mean():>8.1f} µs{np.percentile(timings, 50):>8.1f} µs"
+              f"{np.percentile(timings, 99):>8.1f} µs{lines:>8}")
+        if stats:
+            print(f"{'':<10}{stats}")
+
+
+if __name__ == "__main__":
+    main()
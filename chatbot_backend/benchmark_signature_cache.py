@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Text-keyed vs signature-keyed caching benchmark for ChatProcessor.
+Replays rephrasings of the training patterns (filler words, reordering,
+punctuation) and compares how often the text-keyed response cache hits
+with how often the BoW-signature prediction cache saves an inference.
+
+Requires the full ML environment (requirements-dev.txt).
+
+Usage:
+    python benchmark_signature_cache.py [--requests 3000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+
+PREFIXES = ['', 'please', 'hey', 'could you', 'i want to know', 'quick question']
+SUFFIXES = ['', 'please', 'thanks', 'now', '?', '!']
+
+
+def rephrase(pattern, rng):
+    words = pattern.rstrip('?!.').split()
+    if len(words) > 3 and rng.random() < 0.3:
+        # BoW features ignore order, so a swap keeps the signature
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    return ' '.join(filter(None, [rng.choice(PREFIXES), *words, rng.choice(SUFFIXES)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import django
+    django.setup()
+    from chatapi.utils.chat_processor import ChatProcessor
+
+    processor = ChatProcessor()
+    rng = random.Random(11)
+    patterns = [p for intent in processor.intents['intents'] for p in intent['patterns']]
+    messages = [rephrase(rng.choice(patterns), rng) for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    for message in messages:
+        processor.get_response(message)
+    elapsed = time.perf_counter() - start
+
+    stats = processor.get_cache_stats()
+    model_path = stats['prediction_cache_hits'] + stats['prediction_cache_misses']
+
+    print("🧮 BoW-signature cache benchmark")
+    print("=" * 50)
+    print(f"Requests:                  {len(messages)}")
+    print(f"Text-keyed response cache: {stats['response_cache_hit_ratio']:6.1%} hit ratio")
+    print(f"Requests reaching model:   {model_path}")
+    print(f"Signature-keyed cache:     {stats['prediction_cache_hit_ratio']:6.1%} hit ratio "
+          f"({stats['prediction_cache_size']} distinct signatures)")
+    print(f"Model inferences run:      {stats['inference_count']} "
+          f"(text-keyed caching alone would run {model_path})")
+    print(f"Replay time:               {elapsed:.2f}s ({elapsed / len(messages) * 1000:.2f}ms/request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Multi-tenant memory benchmark.
+Serves --tenants copies of the Bale Mountains knowledge base as separate
+tenants from one TenantPool and reports, per tenant loaded, the estimated
+footprint the pool budgets with and the RSS the process actually grew by,
+then replays a round-robin workload under --budget-mb to count evictions.
+
+Usage:
+    python benchmark_tenants.py [--tenants 20] [--backend simple] [--budget-mb 16]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+import django  # noqa: E402
+
+django.setup()
+
+from chatapi.utils import training  # noqa: E402
+from chatapi.utils.memory import rss_bytes  # noqa: E402
+from chatapi.utils.tenants import Tenant, TenantPool  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def make_tenants(root, count, backend):
+    """`count` tenant directories holding a copy of the Bale Mountains data and model"""
+    tenants = {}
+    for i in range(count):
+        directory = Path(root) / f'park{i:03d}'
+        directory.mkdir()
+        shutil.copy(training.INTENTS_PATH, directory / 'intents.json')
+        for name in (training.VOCABULARY_FILE, training.CLASSES_FILE, training.MODEL_FILE):
+            if (training.UTILS_DIR / name).exists():
+                shutil.copy(training.UTILS_DIR / name, directory / name)
+        tenants[directory.name] = Tenant(directory.name, directory, backend=backend)
+    return tenants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tenants', type=int, default=20)
+    parser.add_argument('--backend', default='simple')
+    parser.add_argument('--budget-mb', type=float, default=16.0)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    print("🏞️  Multi-tenant memory benchmark")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as root:
+        tenants = make_tenants(root, args.tenants, args.backend)
+
+        pool = TenantPool(tenants, float('inf'))
+        rss_start = rss_bytes()
+        print(f"{'tenant':<10}{'load s':>9}{'footprint':>13}{'RSS growth':>14}")
+        for name in tenants:
+            rss_before, started = rss_bytes(), time.perf_counter()
+            pool.get(name)
+            print(f"{name:<10}{time.perf_counter() - started:>9.3f}"
+                  f"{pool.stats()['loaded'][name] / MB:>10.2f} MB{(rss_bytes() - rss_before) / MB:>11.2f} MB")
+        stats = pool.stats()
+        print(f"\n{len(tenants)} tenants: {stats['used_bytes'] / MB:.1f} MB estimated, "
+              f"{(rss_bytes() - rss_start) / MB:.1f} MB RSS growth")
+
+        pool = TenantPool(tenants, int(args.budget_mb * MB))
+        names = list(tenants)
+        started = time.perf_counter()
+        for i in range(args.requests):
+            pool.get(names[i % len(names)]).get_response("What animals live in the park?")
+        stats = pool.stats()
+        print(f"\nRound robin, {args.requests} requests under {args.budget_mb:g} MB: "
+              f"{len(stats['loaded'])} tenants resident, {stats['used_bytes'] / MB:.1f} MB, "
+              f"{stats['loads']} loads, {stats['evictions']} evictions, "
+              f"{time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Warm-start benchmark.
+A worker serves a day of Zipf-distributed traffic and snapshots its caches,
+then fresh workers serve the first requests of the next day: cold, preloaded
+from the snapshot, and preloaded plus pre-warmed with the training patterns.
+Reports the cache hit ratio and p50/p99 latency of those first requests.
+
+Usage:
+    python benchmark_warm_start.py [--backend simple|keras|cascade|bert] [--requests 3000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import cache_snapshot, evaluation, registry, training
+
+
+def traffic(queries, total, seed):
+    """Zipf-like draw over a shared query population, so popular questions recur across days"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** 0.9 for rank in range(len(queries))]
+    return rng.choices(queries, weights=weights, k=total)
+
+
+def serve(processor, messages):
+    latencies = np.empty(len(messages))
+    for i, message in enumerate(messages):
+        started = time.perf_counter()
+        processor.get_response(message)
+        latencies[i] = time.perf_counter() - started
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=list(registry.available_backends()), default='simple')
+    parser.add_argument('--requests', type=int, default=3000, help='requests served after the restart')
+    parser.add_argument('--history', type=int, default=20000, help='requests served before the restart')
+    args = parser.parse_args()
+
+    population = [text for text, _, _ in evaluation.build_corpus(training.load_intents(), variants=3)]
+    random.Random(0).shuffle(population)
+    yesterday = traffic(population, args.history, seed=1)
+    today = traffic(population, args.requests, seed=2)
+
+    print("🔥 Warm-start benchmark")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache_snapshot.pkl')
+        previous = registry.create(args.backend)
+        serve(previous, yesterday)
+        counts = cache_snapshot.save_snapshot(previous, path)
+        print(f"📦 Snapshot after {args.history} requests: {counts} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+        print(f"\n{'start':<22}{'hit ratio':>10}{'p50':>11}{'p99':>11}{'startup':>10}")
+        for name in ('cold', 'snapshot', 'snapshot + prewarm'):
+            processor = registry.create(args.backend)
+            started = time.perf_counter()
+            if name != 'cold':
+                cache_snapshot.load_snapshot(processor, path)
+            if name == 'snapshot + prewarm':
+                cache_snapshot.prewarm(processor, cache_snapshot.prewarm_messages(processor))
+            startup = time.perf_counter() - started
+            hits = processor.response_cache.hits
+            latencies = serve(processor, today)
+            hit_ratio = (processor.response_cache.hits - hits) / len(today)
+            print(f"{name:<22}{hit_ratio:>10.2%}"
+                  f"{np.percentile(latencies, 50) * 1000:>8.3f} ms{np.percentile(latencies, 99) * 1000:>8.3f} ms"
+                  f"{startup:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
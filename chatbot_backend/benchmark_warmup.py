@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Post-deploy latency spike benchmark.
+Loads a fresh backend twice and serves the same first requests (labelled
+queries the warmup set does not contain): once straight away, once after
+the warmup routine the readiness probe waits for. Reports the first
+request's latency and p50/p99/max over the first requests.
+
+Usage:
+    python benchmark_warmup.py [--backend simple|keras|cascade|bert] [--requests 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import evaluation, registry, training, warmup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=list(registry.available_backends()), default='simple')
+    parser.add_argument('--requests', type=int, default=50, help='first requests measured after startup')
+    args = parser.parse_args()
+
+    corpus = [text for text, _, _ in evaluation.build_corpus(training.load_intents(), variants=2, seed=11)]
+    random.Random(3).shuffle(corpus)
+
+    print("🌡️  Warmup benchmark")
+    print("=" * 50)
+    print(f"\n{'start':<10}{'load':>8}{'warmup':>9}{'first':>11}{'p50':>11}{'p99':>11}{'max':>11}")
+    for name in ('cold', 'warmed'):
+        started = time.perf_counter()
+        processor = registry.create(args.backend)
+        load = time.perf_counter() - started
+        warmup_seconds = 0.0
+        messages = warmup.warmup_messages(processor)
+        if name == 'warmed':
+            warmup_seconds = warmup.warm_up(processor, messages)['seconds']
+        first = [text for text in corpus if text not in set(messages)][:args.requests]
+        latencies = np.empty(len(first))
+        for i, text in enumerate(first):
+            started = time.perf_counter()
+            processor.get_response(text)
+            latencies[i] = (time.perf_counter() - started) * 1000
+        print(f"{name:<10}{load:>7.2f}s{warmup_seconds:>8.2f}s{latencies[0]:>8.2f} ms"
+              f"{np.percentile(latencies, 50):>8.2f} ms{np.percentile(latencies, 99):>8.2f} ms"
+              f"{latencies.max():>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Weather endpoint latency benchmark.
+Compares calling a slow provider on the request path with serving from the
+background-refreshed WeatherService, using a local stub provider with
+configurable latency.
+
+Usage:
+    python benchmark_weather.py [--latency 0.8] [--requests 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+from chatapi.utils.weather_service import WeatherService
+
+
+class StubProvider:
+    name = 'stub'
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def fetch(self, location, timeout=None):
+        time.sleep(self.latency)
+        return {'location': location, 'temperature': '12°C', 'condition': 'Clear'}
+
+
+def measure(func, total):
+    samples = []
+    for _ in range(total):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.fmean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.8, help='provider latency in seconds')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    provider = StubProvider(args.latency)
+    service = WeatherService(provider, ttl=60, refresh_interval=30)
+    service.start()
+    while service.get()['source'] != provider.name:
+        time.sleep(0.05)
+
+    direct_total = max(1, min(args.requests, int(5 / max(args.latency, 0.001))))
+    direct_mean, direct_p99 = measure(lambda: provider.fetch('Bale Mountains'), direct_total)
+    cached_mean, cached_p99 = measure(lambda: service.get('Bale Mountains'), args.requests)
+    service.stop()
+
+    print("🌦️  Weather service benchmark")
+    print("=" * 50)
+    print(f"Provider on request path: mean {direct_mean:9.3f}ms  p99 {direct_p99:9.3f}ms ({direct_total} calls)")
+    print(f"Background-refreshed:     mean {cached_mean:9.3f}ms  p99 {cached_p99:9.3f}ms ({args.requests} calls)")
+    print(f"Provider calls made by the service: {service.refreshes}")
+
+
+if __name__ == "__main__":
+    main()
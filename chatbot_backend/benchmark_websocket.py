@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+REST vs WebSocket chat benchmark.
+Drives the ASGI application in-process with the same conversation twice:
+as browser-style REST calls (CORS preflight plus POST /api/chat/ per
+message) and as messages on one /ws/chat/ connection. Reports messages per
+second and the time until the first part reaches the client. Both
+transports send an answer only once it is fully computed, so the gap is
+the per-message request and preflight overhead. --rtt-ms adds a simulated network round trip per
+request leg (two per REST message, one per socket message).
+
+Usage:
+    python benchmark_websocket.py [--messages 300] [--rtt-ms 0] [--no-preflight]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+os.environ.setdefault('WARMUP_ON_START', 'false')
+os.environ.setdefault('QUERY_LOG_PATH', '')
+os.environ.setdefault('CACHE_SNAPSHOT_PATH', '')
+# One simulated client sends everything; keep the per-client rate limit out of the way
+os.environ.setdefault('CLIENT_RATE_LIMIT', '1000000')
+os.environ.setdefault('CLIENT_BURST', '1000000')
+
+from chatbot_backend.asgi import application  # noqa: E402
+from chatapi.utils import evaluation, training  # noqa: E402
+from chatapi.utils.admission import reset_admission_controller  # noqa: E402
+
+ORIGIN = b'http://localhost:3000'
+
+
+async def http_call(method, body=b'', headers=()):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': '/api/chat/', 'raw_path': b'/api/chat/', 'query_string': b'',
+        'root_path': '', 'client': ('127.0.0.1', 50000), 'server': ('localhost', 8000),
+        'headers': [
+            (b'host', b'localhost'), (b'origin', ORIGIN), (b'content-length', str(len(body)).encode()), *headers
+        ],
+    }
+    events = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status, chunks = None, []
+
+    async def receive():
+        if events:
+            return events.pop()
+        # Django watches for disconnects while responding; the client stays
+        await asyncio.Event().wait()
+
+    async def send(event):
+        nonlocal status
+        if event['type'] == 'http.response.start':
+            status = event['status']
+        elif event['type'] == 'http.response.body':
+            chunks.append(event.get('body', b''))
+
+    await application(scope, receive, send)
+    return status, b''.join(chunks)
+
+
+async def run_rest(messages, rtt, preflight):
+    first_part = []
+    started = time.perf_counter()
+    for message in messages:
+        sent = time.perf_counter()
+        if preflight:
+            await asyncio.sleep(rtt)
+            await http_call('OPTIONS', headers=[
+                (b'access-control-request-method', b'POST'),
+                (b'access-control-request-headers', b'content-type'),
+            ])
+        await asyncio.sleep(rtt)
+        status, body = await http_call(
+            'POST', json.dumps({'message': message}).encode(), [(b'content-type', b'application/json')]
+        )
+        json.loads(body)
+        first_part.append(time.perf_counter() - sent)
+    return time.perf_counter() - started, first_part
+
+
+async def run_socket(messages, rtt):
+    inbox, outbox = asyncio.Queue(), asyncio.Queue()
+    scope = {'type': 'websocket', 'path': '/ws/chat/', 'headers': [(b'origin', ORIGIN)], 'client': ('127.0.0.1', 50001)}
+    task = asyncio.create_task(application(scope, inbox.get, outbox.put))
+    await inbox.put({'type': 'websocket.connect'})
+    await outbox.get()
+
+    first_part = []
+    started = time.perf_counter()
+    for i, message in enumerate(messages):
+        sent = time.perf_counter()
+        await asyncio.sleep(rtt)
+        await inbox.put({'type': 'websocket.receive', 'text': json.dumps({'id': i, 'message': message})})
+        seen_part = False
+        while True:
+            frame = json.loads((await outbox.get())['text'])
+            if frame['type'] in ('part', 'end') and not seen_part:
+                first_part.append(time.perf_counter() - sent)
+                seen_part = True
+            if frame['type'] in ('end', 'error'):
+                break
+    elapsed = time.perf_counter() - started
+    await inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+    await task
+    return elapsed, first_part
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help='simulated network round trip per request leg')
+    parser.add_argument('--no-preflight', action='store_true', help='assume the browser cached the CORS preflight')
+    args = parser.parse_args()
+
+    corpus = [text for text, _, _ in evaluation.build_corpus(training.load_intents(), variants=1)]
+    messages = [corpus[i % len(corpus)] for i in range(args.messages)]
+    rtt = args.rtt_ms / 1000
+
+    print("🔌 REST vs WebSocket chat benchmark")
+    print("=" * 50)
+    print(f"{args.messages} messages, simulated RTT {args.rtt_ms:g} ms, "
+          f"preflight {'off' if args.no_preflight else 'on'}")
+    print(f"\n{'transport':<12}{'msg/s':>9}{'first part p50':>17}{'p99':>11}")
+    for name, run in (('rest', lambda: run_rest(messages, rtt, not args.no_preflight)),
+                      ('websocket', lambda: run_socket(messages, rtt))):
+        reset_admission_controller()
+        asyncio.run(run())  # warm pass: processor load and response cache
+        reset_admission_controller()
+        elapsed, first_part = asyncio.run(run())
+        first_part = np.array(first_part) * 1000
+        print(f"{name:<12}{len(messages) / elapsed:>9.1f}"
+              f"{np.percentile(first_part, 50):>14.3f} ms{np.percentile(first_part, 99):>8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from django.conf import settings
+
+from .utils.resilience import deadline_scope
+
+
+class RequestDeadlineMiddleware:
+    """
+    Give every request a wall-clock budget (settings.REQUEST_DEADLINE).
+    Outbound calls made while handling it cap their timeouts by what is left,
+    so a slow upstream cannot hold a worker until gunicorn's --timeout.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.seconds = getattr(settings, 'REQUEST_DEADLINE', 10.0)
+
+    def __call__(self, request):
+        with deadline_scope(self.seconds):
+            return self.get_response(request)
@@ -1,3 +1,1346 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import logging
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from chatbot_backend import settings_api
+
+from .utils.admission import (
+    FAST, MODEL, AdmissionController, Overloaded, RateLimited, client_id, reset_admission_controller
+)
+from .utils.cascade import CascadeProcessor, KeywordTier
+from .utils.cache import CacheStore, PredictionCache, bow_signature
+from .utils.cache_snapshot import SnapshotWriter, load_snapshot, save_snapshot, top_queries
+from .utils.kb_compiler import KnowledgeBaseError, compile_kb, load_knowledge_base, read_source, write_kb
+from .utils.language import PhraseMemory, detect_language
+from .utils.log_handlers import AsyncHandler, JsonFormatter, SamplingFilter, log_chat_request
+from .utils.memory import (
+    AllocationTracker, component_loads, deep_sizeof, reset_allocation_tracker, track_component
+)
+from .utils.query_log import QueryLog, QueryTrace, process_log_path, query_log_files, reset_query_log
+from .utils.quick_actions import QUICK_ACTIONS
+from .utils import registry
+from .utils.resilience import (
+    CircuitBreaker, call_external, deadline_scope, get_breaker, remaining_time, reset_breakers,
+)
+from .utils.simple_processor import SimpleProcessor
+from .utils.singleflight import SingleFlight
+from .utils.spelling import SpellingIndex
+from .utils.tenants import TenantPool, UnknownTenant, load_tenants, reset_tenants, tenant_footprint
+from .websocket import answer as websocket_answer, origin_allowed, websocket_application
+from .utils.warmup import Readiness, get_readiness, reset_readiness, warm_up, warmup_messages
+from .utils.weather_service import WeatherService, get_weather_service
+from .utils.text_normalizer import canonicalize, token_key
+from .utils import training
+from .utils.cross_validation import classification_metrics, stratified_folds
+from .utils.distillation import augmented_patterns, distillation_targets, evaluation_set
+from .utils.evaluation import build_corpus, evaluate_backend
+
+
+# Snapshots and query logs left by a dev run must not leak into the tests, nor the tests write them
+_module_settings = override_settings(CACHE_SNAPSHOT_PATH='', QUERY_LOG_PATH='')
+
+
+def setUpModule():
+    _module_settings.enable()
+
+
+def tearDownModule():
+    _module_settings.disable()
+
+
+class ChatApiTests(TestCase):
+    def setUp(self):
+        reset_admission_controller()
+
+    def post_chat(self, payload):
+        return self.client.post('/api/chat/', data=json.dumps(payload), content_type='application/json')
+
+    def test_chat_requires_message(self):
+        response = self.post_chat({"message": "   "})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Message cannot be empty"})
+
+    def test_documentation_supports_conditional_get(self):
+        first = self.client.get('/api/chat/')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('max-age=', first['Cache-Control'])
+        second = self.client.get('/api/chat/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_quick_actions_bundle_matches_chat_answers(self):
+        first = self.client.get('/api/quick-actions/')
+        bundle = first.json()
+        self.assertEqual(len(bundle['actions']), 6)
+        self.assertTrue(bundle['version'])
+        for action in bundle['actions']:
+            self.assertEqual(self.post_chat({"message": action['query']}).json(), action['response'])
+        second = self.client.get('/api/quick-actions/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_chat_returns_parts(self):
+        response = self.post_chat({"message": "Park fees"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['intent'], 'park_fees')
+        self.assertTrue(data['parts'])
+
+    def test_chat_requests_are_logged(self):
+        with tempfile.TemporaryDirectory() as tmp, self.settings(QUERY_LOG_PATH=f'{tmp}/queries.jsonl'):
+            reset_query_log()
+            self.addCleanup(reset_query_log)
+            self.post_chat({"message": "  Park FEES?? "})
+            reset_query_log()
+            with open(process_log_path(f'{tmp}/queries.jsonl'), encoding='utf-8') as f:
+                entry = json.loads(f.readline())
+        self.assertEqual(entry['message'], 'park fees')
+        self.assertEqual(entry['intent'], 'park_fees')
+        self.assertEqual(entry['status'], 200)
+        self.assertIsNotNone(entry['tier'])
+        self.assertGreaterEqual(entry['latency_ms'], 0)
+
+    def test_memory_admin_requires_token(self):
+        self.assertEqual(self.client.get('/api/admin/memory/').status_code, 404)
+        with self.settings(ADMIN_TOKEN='secret'):
+            self.assertEqual(self.client.get('/api/admin/memory/', HTTP_X_ADMIN_TOKEN='wrong').status_code, 404)
+            response = self.client.get('/api/admin/memory/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('response_cache', response.json()['caches'])
+        self.assertIn('knowledge_base', response.json()['components'])
+
+    @override_settings(ADMIN_TOKEN='secret')
+    def test_memory_admin_snapshot_diff(self):
+        self.addCleanup(reset_allocation_tracker)
+
+        def action(payload):
+            return self.client.post('/api/admin/memory/', data=json.dumps(payload),
+                                    content_type='application/json', HTTP_X_ADMIN_TOKEN='secret')
+
+        self.assertEqual(action({'action': 'snapshot'}).status_code, 409)
+        self.assertEqual(action({'action': 'start'}).status_code, 200)
+        self.assertEqual(action({'action': 'snapshot', 'label': 'before'}).json()['snapshots'], ['before'])
+        diff = action({'action': 'diff', 'from': 'before', 'limit': 5}).json()
+        self.assertLessEqual(len(diff['top']), 5)
+        self.assertEqual(action({'action': 'diff', 'from': 'missing'}).status_code, 404)
+        self.assertEqual(action({'action': 'explode'}).status_code, 400)
+        self.assertFalse(action({'action': 'stop'}).json()['tracing'])
+
+    @override_settings(ADMIN_TOKEN='secret')
+    def test_compare_backends_side_by_side(self):
+        def compare(payload):
+            return self.client.post('/api/admin/compare/', data=json.dumps(payload),
+                                    content_type='application/json', HTTP_X_ADMIN_TOKEN='secret')
+
+        results = compare({'message': 'Park fees', 'backends': ['simple', 'cascade']}).json()['results']
+        self.assertEqual({name: r['intent'] for name, r in results.items()},
+                         {'simple': 'park_fees', 'cascade': 'park_fees'})
+        self.assertIn(results['cascade']['tier'], ('rules', 'response_cache'))
+        expected = SimpleProcessor().get_response('Park fees')['parts']
+        for result in results.values():
+            self.assertEqual(result['parts'], expected)
+            self.assertTrue(result['text'])
+            self.assertEqual(result['text'], next(p['content'] for p in expected if p['type'] == 'text'))
+        self.assertEqual(compare({'message': 'hi', 'backends': ['gpt']}).status_code, 400)
+
+    def test_readiness_waits_for_warmup(self):
+        reset_readiness()
+        self.addCleanup(reset_readiness)
+        self.assertEqual(self.client.get('/api/health/live/').json(), {"status": "alive"})
+        self.client.get('/api/health/ready/')
+        get_readiness()._thread.join(timeout=30)
+        response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['state'], 'ready')
+        self.assertEqual(self.client.get('/api/performance/').json()['status'], 'healthy')
+
+
+@override_settings(
+    ROOT_URLCONF=settings_api.ROOT_URLCONF,
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+)
+class LeanApiProfileTests(ChatApiTests):
+    def test_matches_full_profile_response(self):
+        lean = self.post_chat({"message": "Park fees"}).json()
+        with self.settings(ROOT_URLCONF='chatbot_backend.urls', MIDDLEWARE=[]):
+            full = self.post_chat({"message": "Park fees"}).json()
+        self.assertEqual(lean, full)
+
+    def test_get_returns_documentation(self):
+        response = self.client.get('/api/chat/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("POST /api/chat/", response.json()['documentation'])
+
+    def test_rejects_invalid_json(self):
+        response = self.client.post('/api/chat/', data='{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TextNormalizerTests(SimpleTestCase):
+    def test_surface_variants_share_a_key(self):
+        keys = {canonicalize(text) for text in ["Hello!", "hello", "hello  ?", " HELLO 👋 "]}
+        self.assertEqual(keys, {"hello"})
+
+    def test_keeps_vocabulary_punctuation(self):
+        self.assertEqual(canonicalize("What’s a 3-day trip - really?"), "what's a 3-day trip really")
+
+    def test_token_key_ignores_order(self):
+        self.assertEqual(token_key("is it safe?"), token_key("Safe, is it"))
+
+
+class LanguageDetectionTests(SimpleTestCase):
+    def test_non_ascii_latin_and_symbols_stay_english(self):
+        for text in ["Hello 👋", "Café near the park?", "“Park fees”"]:
+            self.assertEqual(detect_language(text), 'en')
+
+    def test_ethiopic_script_is_amharic(self):
+        self.assertEqual(detect_language("የመግቢያ ክፍያ ስንት ነው?"), 'am')
+
+    def test_phrase_memory_glosses_known_words(self):
+        memory = PhraseMemory()
+        self.assertEqual(memory.translate("ሰላም"), "hello")
+        self.assertEqual(memory.translate("የባሌ ታሪክ"), "bale history")
+        self.assertIsNone(memory.translate("ይህ ያልታወቀ ጥያቄ"))
+
+
+class SpellingIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SpellingIndex(['accommodation', 'ethiopian', 'wolf', 'forest', 'stay'])
+
+    def test_corrects_within_edit_distance(self):
+        self.assertEqual(self.index.correct_text('accomodation ethiopain forrest'), 'accommodation ethiopian forest')
+
+    def test_leaves_short_and_distant_tokens(self):
+        self.assertEqual(self.index.correct('wolv'), 'wolf')
+        self.assertEqual(self.index.correct('is'), 'is')
+        self.assertEqual(self.index.correct('giraffe'), 'giraffe')
+
+
+class SimpleProcessorTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.processor = SimpleProcessor()
+
+    def setUp(self):
+        self.processor.clear_cache()
+
+    def test_exact_training_pattern_skips_matching(self):
+        result = self.processor.get_response("Tell me about Harenna Forest!")
+        self.assertEqual(result['intent'], 'GetHarennaForestInformation')
+        self.assertEqual(result['confidence'], 1.0)
+
+    def test_canonical_variants_hit_cache(self):
+        self.processor.get_response("Park fees")
+        self.processor.get_response("park fees?!")
+        self.assertEqual(self.processor.get_cache_stats()['response_cache_hits'], 1)
+
+    def test_misspelled_query_is_corrected(self):
+        result = self.processor.get_response("tell me about harena forrest")
+        self.assertEqual(result['intent'], 'GetHarennaForestInformation')
+
+    def test_plain_string_responses_are_served(self):
+        result = self.processor.get_response("goodbye")
+        self.assertEqual(result['intent'], 'farewell')
+        self.assertEqual(result['parts'][0]['type'], 'text')
+
+    def test_amharic_question_answered_locally(self):
+        result = self.processor.get_response("የመግቢያ ክፍያ ስንት ነው?")
+        self.assertEqual(result['intent'], 'park_fees')
+
+
+class CountingModel:
+    """Keras stand-in: fixed class probabilities, counting forward passes"""
+
+    def __init__(self, probabilities):
+        self.probabilities = np.array(probabilities, dtype=np.float32)
+        self.calls = 0
+
+    def predict(self, bow):
+        self.calls += 1
+        return self.probabilities
+
+
+class PredictionCacheTests(SimpleTestCase):
+    def test_equal_bow_vectors_share_a_signature(self):
+        bow = np.zeros(13, dtype=np.uint8)
+        bow[[0, 5, 12]] = 1
+        self.assertEqual(bow_signature(bow), bow_signature(bow.copy()))
+        self.assertEqual(bow_signature(bow), bow_signature(bow.astype(np.float32)))
+        self.assertEqual(len(bow_signature(bow)), 2)
+        other = bow.copy()
+        other[12] = 0
+        self.assertNotEqual(bow_signature(bow), bow_signature(other))
+
+    def test_repeated_features_are_served_from_the_cache(self):
+        model = CountingModel([0.1, 0.9])
+        cache = PredictionCache('prediction_cache', maxsize=8)
+        bow = np.array([1, 0, 1, 0, 0, 1, 0, 0, 1], dtype=np.uint8)
+        first, computed = cache.predict(bow, model.predict)
+        again, recomputed = cache.predict(bow.copy(), model.predict)
+        np.testing.assert_array_equal(first, again)
+        self.assertEqual((computed, recomputed, model.calls, cache.hits), (True, False, 1, 1))
+        _, computed = cache.predict(bow, model.predict, use_cache=False)
+        self.assertEqual((computed, model.calls, len(cache)), (True, 2, 1))
+
+
+class AdmissionControlTests(SimpleTestCase):
+    def test_processor_routes_cheap_answers_to_fast_lane(self):
+        processor = SimpleProcessor()
+        self.assertEqual(processor.admission_lane("Park fees"), FAST)
+        self.assertEqual(processor.admission_lane("Tell me about Harenna Forest!"), FAST)
+        self.assertEqual(processor.admission_lane("wolves near the lake at dawn"), MODEL)
+
+    def test_busy_model_lane_sheds_without_blocking_fast_lane(self):
+        controller = AdmissionController(model_concurrency=1, model_max_queue_delay=0.05, client_rate=0)
+        with controller.admit('a', MODEL):
+            start = time.monotonic()
+            with self.assertRaises(Overloaded) as shed:
+                with controller.admit('b', MODEL):
+                    pass
+            self.assertLess(time.monotonic() - start, 0.5)
+            self.assertGreaterEqual(shed.exception.retry_after, 1)
+            with controller.admit('c', FAST):
+                pass
+        stats = controller.stats()['lanes']
+        self.assertEqual(stats[MODEL]['shed'], 1)
+        self.assertEqual(stats[FAST]['admitted'], 1)
+
+    def test_request_queued_upstream_past_limit_is_shed_early(self):
+        controller = AdmissionController(model_max_queue_delay=0.5, client_rate=0)
+        with self.assertRaises(Overloaded):
+            controller.admit('a', MODEL, arrived_at=time.time() - 1).__enter__()
+        with controller.admit('a', FAST, arrived_at=time.time() - 1):
+            pass
+
+    def test_token_bucket_limits_each_client(self):
+        controller = AdmissionController(client_rate=1, client_burst=2)
+        for _ in range(2):
+            with controller.admit('a', FAST):
+                pass
+        with self.assertRaises(RateLimited):
+            controller.admit('a', FAST)
+        with controller.admit('b', FAST):
+            pass
+
+    def test_client_is_the_hop_added_by_the_trusted_proxy(self):
+        def request(forwarded):
+            return SimpleNamespace(META={'REMOTE_ADDR': '10.0.0.1', 'HTTP_X_FORWARDED_FOR': forwarded})
+
+        self.assertEqual(client_id(request('1.1.1.1, 203.0.113.9')), '203.0.113.9')
+        self.assertEqual(client_id(request('2.2.2.2, 203.0.113.9')), '203.0.113.9')
+        with self.settings(TRUSTED_PROXY_COUNT=2):
+            self.assertEqual(client_id(request('1.1.1.1, 203.0.113.9, 10.0.0.7')), '203.0.113.9')
+            self.assertEqual(client_id(request('203.0.113.9')), '10.0.0.1')
+        with self.settings(TRUSTED_PROXY_COUNT=0):
+            self.assertEqual(client_id(request('1.1.1.1')), '10.0.0.1')
+
+    @override_settings(CLIENT_RATE_LIMIT=0.01, CLIENT_BURST=1)
+    def test_spoofed_leftmost_hop_does_not_get_a_fresh_bucket(self):
+        reset_admission_controller()
+        self.addCleanup(reset_admission_controller)
+        statuses = [
+            self.client.post('/api/chat/', data={'message': 'Park fees'}, content_type='application/json',
+                             HTTP_X_FORWARDED_FOR=f'198.51.100.{i}, 203.0.113.9').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [200, 429, 429])
+
+    @override_settings(CLIENT_RATE_LIMIT=0.01, CLIENT_BURST=1)
+    def test_endpoint_returns_retry_after(self):
+        reset_admission_controller()
+        self.addCleanup(reset_admission_controller)
+        self.client.post('/api/chat/', data={'message': 'Park fees'}, content_type='application/json')
+        response = self.client.post('/api/chat/', data={'message': 'Park fees'}, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, flight, func, callers=8):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do('park fees', func)))
+            for _ in range(callers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results
+
+    def test_concurrent_duplicates_share_one_computation(self):
+        flight = SingleFlight('inflight')
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'intent': 'park_fees'}
+
+        results = self.run_concurrently(flight, compute)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.stats()['inflight_coalesced'], 7)
+        self.assertEqual(flight.stats()['inflight_in_flight'], 0)
+
+    def test_waiter_without_a_deadline_stops_waiting_on_a_stuck_leader(self):
+        flight = SingleFlight('inflight', max_wait=0.05)
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=('park fees', lambda: release.wait(5)))
+        leader.start()
+        self.addCleanup(leader.join, 5)
+        self.addCleanup(release.set)
+        while not flight.stats()['inflight_in_flight']:
+            time.sleep(0.001)
+        started = time.perf_counter()
+        self.assertEqual(flight.do('park fees', lambda: 'own answer'), 'own answer')
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(flight.stats()['inflight_wait_timeouts'], 1)
+
+    def test_failed_call_is_not_remembered(self):
+        flight = SingleFlight('inflight')
+
+        def fail():
+            time.sleep(0.05)
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            flight.do('park fees', fail)
+        self.assertEqual(flight.do('park fees', lambda: 'ok'), 'ok')
+
+    def test_processor_reports_coalesced_requests(self):
+        processor = SimpleProcessor()
+        compute = processor._compute_response
+
+        def slow_compute(*args):
+            time.sleep(0.1)
+            return compute(*args)
+
+        processor._compute_response = slow_compute
+        threads = [threading.Thread(target=processor.get_response, args=("Park fees",)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(processor.get_cache_stats()['inflight_coalesced'], 3)
+
+
+class TrainingDatasetTests(SimpleTestCase):
+    TOKENIZER = (str.split, lambda token: token.rstrip('s') if len(token) > 3 else token)
+
+    def test_matrix_matches_per_word_loop(self):
+        intents = training.load_intents()
+        words, classes, documents = training.build_vocabulary(intents, *self.TOKENIZER)
+        X, y = training.build_matrix(documents, words, classes)
+
+        for row, (lemmas, tag) in enumerate(documents):
+            self.assertEqual(X[row].tolist(), [1.0 if w in lemmas else 0.0 for w in words])
+            self.assertEqual(classes[int(y[row].argmax())], tag)
+        self.assertEqual(y.sum(), len(documents))
+
+    def test_dry_run_reports_stages(self):
+        manifest = training.run(dry_run=True, tokenizer=self.TOKENIZER)
+        self.assertEqual(set(manifest['stage_seconds']), {'load', 'vocabulary', 'matrix'})
+        self.assertGreater(manifest['vocabulary_size'], 0)
+        self.assertEqual(manifest['classes'], len(training.load_intents()['intents']))
+
+    def test_loader_refuses_artifacts_that_do_not_match_the_manifest(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        model_dir = Path(directory.name)
+        for name, data in ((training.VOCABULARY_FILE, ['fee', 'park']), (training.CLASSES_FILE, ['park_fees'])):
+            (model_dir / name).write_bytes(pickle.dumps(data))
+        (model_dir / training.MODEL_FILE).write_bytes(b'model v1')
+        read_model = lambda path: Path(path).read_bytes()
+        self.assertEqual(training.load_artifacts(model_dir, read_model)[2], b'model v1')
+
+        (model_dir / training.MANIFEST_FILE).write_text(json.dumps({'artifacts': {
+            name: training.file_sha256(model_dir / name) for name in training.ARTIFACT_FILES
+        }}))
+        self.assertEqual(training.load_artifacts(model_dir, read_model),
+                         (['fee', 'park'], ['park_fees'], b'model v1'))
+        # A retrain has replaced the model but not yet the vocabulary and manifest
+        (model_dir / training.MODEL_FILE).write_bytes(b'model v2')
+        with self.assertRaises(training.ArtifactMismatch):
+            training.load_artifacts(model_dir, read_model, attempts=2, retry_delay=0)
+
+
+class CrossValidationTests(SimpleTestCase):
+    def test_folds_are_stratified_and_cover_every_sample_once(self):
+        labels = [0] * 10 + [1] * 5 + [2] * 3
+        folds = stratified_folds(labels, n_splits=5, seed=1)
+        validated = sorted(i for _, val_idx in folds for i in val_idx)
+        self.assertEqual(validated, list(range(len(labels))))
+        for train_idx, val_idx in folds:
+            self.assertFalse(set(train_idx) & set(val_idx))
+            self.assertEqual(sum(1 for i in val_idx if labels[i] == 0), 2)
+
+    def test_metrics(self):
+        report = classification_metrics([0, 0, 1, 1], [0, 1, 1, 1], ['a', 'b', 'c'])
+        self.assertEqual(report['accuracy'], 0.75)
+        self.assertEqual(report['per_class']['a'], {'precision': 1.0, 'recall': 0.5, 'f1': 0.6667, 'support': 2})
+        self.assertEqual(report['per_class']['b']['precision'], 0.6667)
+        self.assertNotIn('c', report['per_class'])
+        self.assertEqual(report['macro_f1'], 0.7333)
+
+
+class KnowledgeBaseCompilerTests(SimpleTestCase):
+    def test_compiles_shipped_intents(self):
+        data, source_sha256 = read_source()
+        kb = compile_kb(data, source_sha256)
+        self.assertEqual(len(kb['tags']), len(data['intents']))
+        self.assertEqual(kb['pattern_index'][canonicalize("What are the park fees")], 'park_fees')
+        for intent in kb['intents']['intents']:
+            self.assertTrue(all('parts' in response for response in intent['responses']))
+
+    def test_rejects_malformed_intents(self):
+        with self.assertRaises(KnowledgeBaseError) as error:
+            compile_kb({'intents': [
+                {'tag': '', 'patterns': [''], 'responses': []},
+                {'tag': 'fees', 'patterns': ['fees'], 'responses': [{'parts': [{'content': 'x'}]}]},
+            ]})
+        self.assertEqual(len(error.exception.problems), 4)
+
+    def test_deduplicates_patterns_and_versions_content(self):
+        data = {'intents': [{'tag': 'fees', 'patterns': ['Park fees', 'park fees?'], 'responses': ['It costs 90 birr']}]}
+        kb = compile_kb(data)
+        self.assertEqual(kb['intents']['intents'][0]['patterns'], ['Park fees'])
+        self.assertEqual(kb['version'], compile_kb(data)['version'])
+        data['intents'][0]['responses'] = ['It costs 100 birr']
+        self.assertNotEqual(kb['version'], compile_kb(data)['version'])
+
+    def test_stale_artifact_is_recompiled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = f"{tmp}/intents.json"
+            artifact = f"{tmp}/knowledge_base.pkl"
+            with open(source, 'w') as f:
+                json.dump({'intents': [{'tag': 'fees', 'patterns': ['fees'], 'responses': ['90 birr']}]}, f)
+            data, source_sha256 = read_source(source)
+            write_kb(compile_kb(data, source_sha256), artifact)
+            self.assertEqual(load_knowledge_base(source, artifact)['source_sha256'], source_sha256)
+
+            with open(source, 'w') as f:
+                json.dump({'intents': [{'tag': 'cost', 'patterns': ['cost'], 'responses': ['90 birr']}]}, f)
+            self.assertIn('cost', load_knowledge_base(source, artifact)['tags'])
+
+
+class DistillationTests(SimpleTestCase):
+    INTENTS = {'intents': [
+        {'tag': 'park_fees', 'patterns': ['How much does it cost to enter the park?'], 'responses': ['90 birr']},
+        {'tag': 'lodging', 'patterns': ['Where can I stay near the park?'], 'responses': ['Bale Mountain Lodge']},
+    ]}
+
+    def test_augmentation_is_reproducible_and_keeps_labels(self):
+        pairs = augmented_patterns(self.INTENTS, copies=5, seed=3)
+        self.assertEqual(pairs, augmented_patterns(self.INTENTS, copies=5, seed=3))
+        self.assertGreater(len(pairs), 2)
+        self.assertTrue(all(tag == 'park_fees' for text, tag in pairs if 'cost' in text or 'price' in text))
+
+    def test_evaluation_set_excludes_training_patterns(self):
+        originals = {canonicalize(p) for i in self.INTENTS['intents'] for p in i['patterns']}
+        self.assertFalse({canonicalize(text) for text, _ in evaluation_set(self.INTENTS)} & originals)
+
+    def test_targets_blend_teacher_with_gold_labels(self):
+        classes = ['lodging', 'park_fees', 'wildlife']
+        logits = np.array([[0.0, 2.0, 0.0], [1.0, 0.0, 0.0]])
+        targets = distillation_targets(logits, ['', 'park_fees', 'lodging'], ['park_fees', 'wildlife'], classes, alpha=0.5)
+        np.testing.assert_allclose(targets.sum(axis=1), [1.0, 1.0], rtol=1e-6)
+        self.assertGreater(targets[0, 1], 0.5)
+        self.assertGreater(targets[0, 0], 0.0)
+        # The teacher never saw 'wildlife', so that row is the gold label alone
+        np.testing.assert_allclose(targets[1], [0.0, 0.0, 1.0])
+
+
+class BackendEvaluationTests(SimpleTestCase):
+    INTENTS = DistillationTests.INTENTS
+
+    def test_corpus_is_reproducible_and_labelled(self):
+        corpus = build_corpus(self.INTENTS, variants=3, seed=5)
+        self.assertEqual(corpus, build_corpus(self.INTENTS, variants=3, seed=5))
+        self.assertEqual({kind for _, _, kind in corpus},
+                         {'clean', 'typo', 'paraphrase', 'extra_words', 'dropped_word'})
+        clean = {text for text, _, kind in corpus if kind == 'clean'}
+        self.assertFalse({text for text, _, kind in corpus if kind != 'clean'} & clean)
+
+    def test_metrics_for_a_backend(self):
+        corpus = [('a', 'park_fees', 'clean'), ('b', 'lodging', 'typo'), ('c', 'lodging', 'typo')]
+        answers = {'a': 'park_fees', 'b': 'lodging', 'c': 'fallback'}
+        result = evaluate_backend('fake', lambda: answers.get, corpus)
+        self.assertEqual(result['queries'], 3)
+        self.assertAlmostEqual(result['accuracy'], 0.6667)
+        self.assertEqual(result['accuracy_by_perturbation'], {'clean': 1.0, 'typo': 0.5})
+        self.assertAlmostEqual(result['fallback_rate'], 0.3333)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+
+class MemoryIntrospectionTests(SimpleTestCase):
+    def tearDown(self):
+        reset_allocation_tracker()
+
+    def test_deep_sizeof_counts_buffers_and_shared_objects_once(self):
+        array = np.zeros(10000, dtype=np.float64)
+        self.assertGreaterEqual(deep_sizeof({'vector': array}), array.nbytes)
+        seen = set()
+        first = deep_sizeof([array], seen)
+        self.assertLess(deep_sizeof([array], seen), first - array.nbytes + 1)
+
+    def test_track_component_records_load(self):
+        with track_component('test_component'):
+            pass
+        self.assertIn('rss_delta_bytes', component_loads()['test_component'])
+
+    def test_snapshot_diff_shows_growth(self):
+        tracker = AllocationTracker()
+        with self.assertRaises(RuntimeError):
+            tracker.snapshot()
+        tracker.start()
+        tracker.snapshot('before')
+        retained = [bytearray(1024) for _ in range(500)]
+        diff = tracker.diff('before')
+        self.assertGreater(diff['size_diff_bytes'], 500 * 1024)
+        self.assertIn('tests.py', diff['top'][0]['location'])
+        with self.assertRaises(KeyError):
+            tracker.diff('unknown')
+        tracker.stop()
+        self.assertEqual(len(retained), 500)
+
+
+class CacheSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f'{self.tmp.name}/cache_snapshot.pkl'
+
+    def test_snapshot_roundtrip_keeps_hottest_entries(self):
+        processor = SimpleProcessor()
+        for message in ['park fees', 'how do i get there', 'hello', 'park fees']:
+            processor.get_response(message)
+        processor.response_cache['stale greeting'] = {'intent': 'time_based_greeting', 'parts': []}
+        self.assertEqual(save_snapshot(processor, self.path, max_entries=2), {'response_cache': 2})
+
+        restarted = SimpleProcessor()
+        self.assertEqual(load_snapshot(restarted, self.path), {'response_cache': 2})
+        self.assertIn('park fees', restarted.response_cache)
+        self.assertNotIn('stale greeting', restarted.response_cache)
+        self.assertNotIn('how do i get there', restarted.response_cache)
+
+    def test_snapshot_from_other_artifact_version_is_discarded(self):
+        processor = SimpleProcessor()
+        processor.get_response('park fees')
+        save_snapshot(processor, self.path)
+        restarted = SimpleProcessor()
+        restarted.kb = {**restarted.kb, 'version': 'retrained'}
+        self.assertEqual(load_snapshot(restarted, self.path), {'response_cache': 0})
+        self.assertEqual(len(restarted.response_cache), 0)
+
+    def test_unreadable_snapshot_is_a_cold_start(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertEqual(load_snapshot(SimpleProcessor(), self.path), {})
+        self.assertEqual(load_snapshot(SimpleProcessor(), f'{self.tmp.name}/missing.pkl'), {})
+
+    def test_writer_saves_on_stop(self):
+        processor = SimpleProcessor()
+        processor.get_response('park fees')
+        writer = SnapshotWriter(processor, path=self.path, interval=0)
+        writer.start()
+        writer.stop()
+        self.assertEqual(writer.stats()['snapshot_saves'], 1)
+        self.assertEqual(load_snapshot(SimpleProcessor(), self.path), {'response_cache': 1})
+
+    def test_workers_sharing_a_snapshot_merge_their_entries(self):
+        first, second = SimpleProcessor(), SimpleProcessor()
+        first.get_response('park fees')
+        second.get_response('where can i stay')
+        save_snapshot(first, self.path)
+        self.assertEqual(save_snapshot(second, self.path), {'response_cache': 2})
+        self.assertEqual(save_snapshot(second, self.path, max_entries=1), {'response_cache': 1})
+
+        restarted = SimpleProcessor()
+        load_snapshot(restarted, self.path)
+        self.assertEqual(list(restarted.response_cache.items())[0][0], 'where can i stay')
+
+    def test_top_queries_reads_json_lines_and_plain_text(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"message": "park fees"}\n{"message": "park fees"}\nwhere to stay\n{broken\n')
+        self.assertEqual(top_queries(self.path, 5), ['park fees', 'where to stay'])
+
+
+class QueryLogTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f'{self.tmp.name}/queries.jsonl'
+
+    def test_records_are_written_in_batches(self):
+        log = QueryLog(self.path, batch_size=50)
+        for i in range(120):
+            log.record({'message': f'query {i}'})
+        log.start()
+        log.close()
+        with open(self.path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([entry['message'] for entry in lines], [f'query {i}' for i in range(120)])
+        self.assertEqual(log.stats()['query_log_batches'], 3)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        log = QueryLog(self.path, queue_size=2)
+        started = time.perf_counter()
+        for i in range(5):
+            log.record({'message': str(i)})
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(log.stats()['query_log_dropped'], 3)
+
+    def test_rotates_by_size(self):
+        log = QueryLog(self.path, max_bytes=200, backups=2, batch_size=1)
+        log.start()
+        for i in range(40):
+            log.record({'message': 'x' * 50})
+        log.close()
+        self.assertGreaterEqual(log.stats()['query_log_rotations'], 3)
+        with open(f'{self.path}.2', encoding='utf-8') as f:
+            self.assertTrue(f.readline())
+        with self.assertRaises(FileNotFoundError):
+            open(f'{self.path}.3')
+
+    def test_each_process_writes_its_own_file_and_all_are_read(self):
+        self.assertEqual(process_log_path(self.path, pid=42).name, 'queries.42.jsonl')
+        for pid, messages in ((41, ['park fees', 'lodging']), (42, ['park fees'])):
+            log = QueryLog(process_log_path(self.path, pid=pid), max_bytes=40, batch_size=1)
+            log.start()
+            for message in messages:
+                log.record({'message': message})
+            log.close()
+        self.assertEqual([path.name for path in query_log_files(self.path)], ['queries.41.jsonl.1', 'queries.42.jsonl'])
+        self.assertEqual(top_queries(self.path, 5), ['park fees', 'lodging'])
+
+    def test_trace_reports_answering_tier(self):
+        processor = SimpleProcessor()
+        tiers = []
+        for message in ['park fees', 'park fees', 'zzqx']:
+            trace = QueryTrace()
+            processor.get_response(message, trace=trace)
+            tiers.append(trace.tier)
+        self.assertEqual(tiers, ['quick_action', 'response_cache', 'fallback'])
+        self.assertIn('match', trace.stages)
+
+
+class FixedTier:
+    """Classifier tier that always answers the same (tag, confidence) and counts calls"""
+
+    def __init__(self, name, match, threshold):
+        self.name = name
+        self.match = match
+        self.threshold = threshold
+        self.calls = 0
+
+    def classify(self, text, use_cache=True):
+        self.calls += 1
+        return self.match
+
+
+class CascadeProcessorTests(SimpleTestCase):
+    def test_keyword_confidence_discounts_common_words(self):
+        tier = KeywordTier(DistillationTests.INTENTS)
+        tag, score = tier.classify('how much does it cost to enter')
+        self.assertEqual(tag, 'park_fees')
+        self.assertGreater(score, tier.classify('where is the park')[1])
+        self.assertIsNone(tier.classify('zzqx'))
+
+    def test_rules_answer_before_any_classifier(self):
+        model = FixedTier('model', ('lodging', 0.99), 0.7)
+        cascade = CascadeProcessor(tiers=[model])
+        trace = QueryTrace()
+        self.assertEqual(cascade.get_response('park fees', trace=trace)['intent'], 'park_fees')
+        self.assertEqual((trace.tier, model.calls), ('rules', 0))
+
+    def test_escalates_until_a_tier_is_confident(self):
+        keyword = FixedTier('keyword', ('lodging', 0.2), 0.5)
+        model = FixedTier('model', ('weather', 0.9), 0.7)
+        heavy = FixedTier('bert', ('lodging', 0.99), 0.5)
+        cascade = CascadeProcessor(tiers=[keyword, model, heavy])
+        trace = QueryTrace()
+        response = cascade.get_response('is it cold up there at night', trace=trace)
+        self.assertEqual((response['intent'], response['confidence']), ('weather', 0.9))
+        self.assertEqual((trace.tier, keyword.calls, model.calls, heavy.calls), ('model', 1, 1, 0))
+        self.assertEqual(set(trace.stages), {'rules', 'keyword', 'model'})
+
+    def test_falls_back_when_every_tier_is_unsure(self):
+        cascade = CascadeProcessor(tiers=[FixedTier('keyword', ('lodging', 0.1), 0.5)])
+        cascade.get_response('qwerty asdf')
+        cascade.get_response('qwerty asdf')
+        stats = cascade.get_cache_stats()
+        self.assertEqual(stats['cascade_fallback_resolved'], 1)
+        self.assertEqual(stats['cascade_cache_resolved'], 1)
+        self.assertEqual(stats['cascade_fallback_share'], 0.5)
+        self.assertIn('cascade_keyword_mean_ms', stats)
+
+
+class ProcessorRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.builds = []
+        registry.register('broken')(self.broken)
+        registry.register('partial')(object)
+        self.addCleanup(registry._backends.pop, 'broken')
+        self.addCleanup(registry._backends.pop, 'partial')
+
+    def broken(self):
+        self.builds.append('broken')
+        raise ImportError("No module named 'tensorflow'")
+
+    def test_configured_backend_follows_legacy_switches(self):
+        with self.settings(CHAT_BACKEND='cascade'):
+            self.assertEqual(registry.configured_backend(), 'cascade')
+        with mock.patch.dict('os.environ', {'USE_SIMPLE_PROCESSOR': 'true'}):
+            self.assertEqual(registry.configured_backend(), 'simple')
+        with mock.patch.dict('os.environ', {'USE_CASCADE_PROCESSOR': 'true', 'RENDER': '1'}):
+            self.assertEqual(registry.configured_backend(), 'cascade')
+
+    def test_backends_load_once_and_side_by_side(self):
+        processors = registry.ProcessorRegistry()
+        self.assertEqual(processors.loaded(), {})
+        simple = processors.get('simple')
+        self.assertIs(processors.get('simple'), simple)
+        self.assertIsInstance(processors.get('cascade'), CascadeProcessor)
+        self.assertEqual(set(processors.stats()['loaded']), {'simple', 'cascade'})
+
+    def test_failed_backend_is_not_retried(self):
+        processors = registry.ProcessorRegistry()
+        self.assertIsNone(processors.get('broken'))
+        self.assertIsNone(processors.get('broken'))
+        self.assertEqual(self.builds, ['broken'])
+        self.assertIn('tensorflow', processors.stats()['failed']['broken'])
+
+    def test_create_checks_the_common_interface(self):
+        with self.assertRaises(TypeError):
+            registry.create('partial')
+        with self.assertRaises(KeyError):
+            registry.create('gpt')
+
+    @override_settings(CHAT_BACKEND='broken', CACHE_SNAPSHOT_PATH='')
+    def test_configured_backend_falls_back(self):
+        registry.reset_processors()
+        self.addCleanup(registry.reset_processors)
+        self.assertIsInstance(registry.get_processor(), SimpleProcessor)
+        self.assertEqual(registry.active_backend(), 'simple')
+        self.assertEqual(registry.registry_stats()['configured'], 'broken')
+
+
+class WarmupTests(SimpleTestCase):
+    def test_messages_cover_every_stage(self):
+        messages = warmup_messages(SimpleProcessor(), limit=10)
+        self.assertEqual(len(messages), 10)
+        self.assertEqual(len(set(messages)), 10)
+        report = warm_up(SimpleProcessor(), warmup_messages(SimpleProcessor()))
+        self.assertIn('quick_action', report['tiers'])
+        self.assertIn('exact_pattern', report['tiers'])
+        self.assertNotIn('error', report['tiers'])
+
+    def test_warmup_neither_reads_nor_fills_the_caches(self):
+        processor = SimpleProcessor()
+        processor.response_cache['park fees'] = {'intent': 'from_snapshot'}
+        report = warm_up(processor, ['park fees', 'where can i stay', 'zzxq vbnm'])
+        self.assertNotIn('response_cache', report['tiers'])
+        self.assertEqual(dict(processor.response_cache.items()), {'park fees': {'intent': 'from_snapshot'}})
+        self.assertEqual(processor.get_response('park fees')['intent'], 'from_snapshot')
+
+    def test_warmup_is_left_out_of_serving_metrics(self):
+        processor = SimpleProcessor()
+        cascade = CascadeProcessor(tiers=[FixedTier('keyword', ('lodging', 0.9), 0.5)])
+        messages = warmup_messages(processor) + ['ምን ያህል ነው', 'hwo much are prak fees']
+        before = (processor.get_cache_stats(), cascade.get_cache_stats(), cascade.cascade_stats())
+        warm_up(processor, messages)
+        warm_up(cascade, messages)
+        self.assertEqual((processor.get_cache_stats(), cascade.get_cache_stats(), cascade.cascade_stats()), before)
+
+    def test_quick_action_query_only_where_quick_actions_answer(self):
+        self.assertEqual(warmup_messages(SimpleProcessor())[0], QUICK_ACTIONS[0]['query'])
+        self.assertNotIn(QUICK_ACTIONS[0]['query'], warmup_messages(SimpleProcessor(quick_actions=False)))
+
+    def test_readiness_states(self):
+        readiness = Readiness(lambda: None)
+        self.assertEqual(readiness.state, 'pending')
+        readiness.start(background=False)
+        self.assertEqual((readiness.state, readiness.ready), ('failed', False))
+        self.assertIn('backend', readiness.stats()['error'])
+
+        processor = SimpleProcessor()
+        readiness.get_processor = lambda: processor
+        readiness.start(background=False)
+        self.assertTrue(readiness.ready)
+        self.assertGreater(readiness.stats()['warmup']['queries'], 0)
+        readiness.start(background=False)
+        self.assertIsNotNone(readiness.stats()['warmup_wall_seconds'])
+
+
+class LoggingPipelineTests(SimpleTestCase):
+    def record(self, level=logging.INFO, **extra):
+        return logging.makeLogRecord({'name': 'chatapi.test', 'levelno': level,
+                                      'levelname': logging.getLevelName(level), 'msg': 'hello %s', 'args': ('x',),
+                                      **extra})
+
+    def test_json_records_carry_extra_fields(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = self.record(logging.ERROR, exc_info=sys.exc_info(), intent='park_fees')
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual((entry['level'], entry['message'], entry['intent']), ('ERROR', 'hello x', 'park_fees'))
+        self.assertIn('ValueError: boom', entry['exc'])
+
+    def test_async_handler_writes_off_thread_and_drops_when_full(self):
+        stream = io.StringIO()
+        handler = AsyncHandler(stream, queue_size=1)
+        handler.setFormatter(JsonFormatter())
+        handler.handle(self.record())
+        handler.stop()
+        self.assertEqual(json.loads(stream.getvalue())['message'], 'hello x')
+        for _ in range(3):
+            handler.handle(self.record())
+        self.assertEqual(handler.stats(), {'log_queued': 1, 'log_dropped': 2})
+
+    def test_sampling_keeps_warnings_and_unmarked_records(self):
+        log_filter = SamplingFilter(rate=0.0)
+        self.assertFalse(log_filter.filter(self.record(sample=True)))
+        self.assertTrue(log_filter.filter(self.record(logging.WARNING, sample=True)))
+        self.assertTrue(log_filter.filter(self.record()))
+        capped = SamplingFilter(rate=1.0, max_per_second=2)
+        passed = [capped.filter(self.record(sample=True)) for _ in range(5)]
+        self.assertLessEqual(passed.count(True), 4)
+        self.assertEqual(capped.stats()['log_sampled_out'], 0)
+        self.assertEqual(log_filter.stats()['log_sampled_out'], 1)
+
+    def test_slow_requests_are_logged_in_full(self):
+        trace = QueryTrace()
+        trace.tier = 'model'
+        with self.assertLogs('chatapi.test', level='INFO') as logs:
+            log_chat_request(logging.getLogger('chatapi.test'), 'hi', {'intent': 'greeting'}, trace,
+                             time.perf_counter())
+            with self.settings(LOG_SLOW_REQUEST_MS=0):
+                log_chat_request(logging.getLogger('chatapi.test'), 'hi', {'intent': 'greeting'}, trace,
+                                 time.perf_counter())
+        fast, slow = logs.records
+        self.assertEqual((fast.levelno, fast.sample, fast.tier), (logging.INFO, True, 'model'))
+        self.assertEqual((slow.levelno, slow.chat_message), (logging.WARNING, 'hi'))
+        self.assertFalse(hasattr(slow, 'sample'))
+
+
+class SocketPeer:
+    """In-process ASGI WebSocket client"""
+
+    def __init__(self, path='/ws/chat/', headers=()):
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+        scope = {'type': 'websocket', 'path': path, 'headers': list(headers), 'client': ('127.0.0.1', 50000)}
+        self.task = asyncio.create_task(websocket_application(scope, self.inbox.get, self.outbox.put))
+
+    async def connect(self):
+        await self.inbox.put({'type': 'websocket.connect'})
+        return await asyncio.wait_for(self.outbox.get(), 5)
+
+    async def send(self, payload):
+        text = payload if isinstance(payload, str) else json.dumps(payload)
+        await self.inbox.put({'type': 'websocket.receive', 'text': text})
+
+    async def frame(self):
+        return json.loads((await asyncio.wait_for(self.outbox.get(), 5))['text'])
+
+    async def close(self):
+        await self.inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(self.task, 5)
+
+
+class WebSocketChatTests(SimpleTestCase):
+    def setUp(self):
+        reset_admission_controller()
+
+    def test_sends_each_answer_as_framed_parts(self):
+        async def conversation():
+            peer = SocketPeer(headers=[(b'origin', b'http://localhost:3000')])
+            self.assertEqual((await peer.connect())['type'], 'websocket.accept')
+            frames = []
+            for message_id, message in ((1, 'Park fees'), (2, 'How do I get to Bale Mountains?')):
+                await peer.send({'id': message_id, 'message': message})
+                start = await peer.frame()
+                parts = [await peer.frame() for _ in range(start['parts'])]
+                frames.append((start, parts, await peer.frame()))
+            await peer.close()
+            return frames
+
+        frames = asyncio.run(conversation())
+        for start, parts, end in frames:
+            self.assertEqual(start['type'], 'start')
+            self.assertEqual([(p['type'], p['id'], p['index']) for p in parts],
+                             [('part', start['id'], i) for i in range(start['parts'])])
+            self.assertEqual((end['type'], end['id']), ('end', start['id']))
+        start, parts, _ = frames[0]
+        self.assertEqual(start['intent'], 'park_fees')
+        self.assertEqual([p['part'] for p in parts], SimpleProcessor().get_response('Park fees')['parts'])
+
+    @override_settings(CORS_ALLOW_ALL_ORIGINS=False)
+    def test_rejects_bad_messages_and_foreign_origins(self):
+        async def conversation():
+            peer = SocketPeer()
+            await peer.connect()
+            await peer.send('{')
+            await peer.send({'id': 7, 'message': '  '})
+            errors = [await peer.frame(), await peer.frame()]
+            await peer.close()
+            foreign = SocketPeer(headers=[(b'origin', b'https://example.com')])
+            return errors, await foreign.connect()
+
+        errors, handshake = asyncio.run(conversation())
+        self.assertEqual([(e['id'], e['status']) for e in errors], [(None, 400), (7, 400)])
+        self.assertEqual(handshake, {'type': 'websocket.close', 'code': 1008})
+
+    def test_allow_all_origins_under_either_setting_name(self):
+        from django.conf import settings
+
+        with self.settings(CORS_ALLOW_ALL_ORIGINS=False):
+            self.assertFalse(origin_allowed('https://example.com'))
+            self.assertTrue(origin_allowed('http://localhost:3000'))
+        with self.settings(CORS_ALLOW_ALL_ORIGINS=True):
+            self.assertTrue(origin_allowed('https://example.com'))
+        with self.settings(CORS_ORIGIN_ALLOW_ALL=True):
+            del settings.CORS_ALLOW_ALL_ORIGINS
+            self.assertTrue(origin_allowed('https://example.com'))
+
+    def test_failed_message_does_not_stop_the_connection(self):
+        def flaky_answer(message, request, tenant=None):
+            if message == 'boom':
+                raise RuntimeError("tenant pool broke")
+            return websocket_answer(message, request, tenant)
+
+        async def conversation():
+            peer = SocketPeer()
+            await peer.connect()
+            await peer.send({'id': 1, 'message': 'boom'})
+            failed = await peer.frame()
+            await peer.send({'id': 2, 'message': 'Park fees'})
+            start = await peer.frame()
+            await peer.close()
+            return failed, start
+
+        with mock.patch('chatapi.websocket.answer', flaky_answer):
+            failed, start = asyncio.run(conversation())
+        self.assertEqual((failed['type'], failed['id'], failed['status']), ('error', 1, 500))
+        self.assertEqual((start['type'], start['id'], start['intent']), ('start', 2, 'park_fees'))
+
+    def test_messages_are_answered_within_the_request_deadline(self):
+        seen = []
+        with mock.patch('chatapi.websocket._answer', lambda *args: seen.append(remaining_time())):
+            with self.settings(REQUEST_DEADLINE=3.0):
+                websocket_answer('Park fees', SimpleNamespace(META={'REMOTE_ADDR': '10.0.0.1'}))
+        self.assertTrue(0 < seen[0] <= 3.0)
+
+    @override_settings(WEBSOCKET_MAX_PENDING=1)
+    def test_refuses_messages_beyond_the_pending_limit(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_answer(message, request, tenant=None):
+            started.set()
+            release.wait(5)
+            return {'intent': 'test', 'parts': [{'type': 'text', 'content': message}]}, 200, None
+
+        async def conversation():
+            peer = SocketPeer()
+            await peer.connect()
+            await peer.send({'id': 1, 'message': 'one'})
+            await asyncio.to_thread(started.wait, 5)
+            await peer.send({'id': 2, 'message': 'two'})
+            await peer.send({'id': 3, 'message': 'three'})
+            refused = await peer.frame()
+            release.set()
+            frames = [await peer.frame() for _ in range(6)]
+            await peer.close()
+            return refused, frames
+
+        with mock.patch('chatapi.websocket.answer', slow_answer):
+            refused, frames = asyncio.run(conversation())
+        self.assertEqual((refused['type'], refused['id'], refused['status']), ('error', 3, 429))
+        self.assertEqual([(f['type'], f['id']) for f in frames],
+                         [('start', 1), ('part', 1), ('end', 1), ('start', 2), ('part', 2), ('end', 2)])
+
+
+class TenantTests(TestCase):
+    def setUp(self):
+        reset_admission_controller()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        config = {}
+        for name in ('parka', 'parkb', 'parkc'):
+            (self.root / name).mkdir()
+            (self.root / name / 'intents.json').write_text(json.dumps({'intents': [{
+                'tag': 'greeting', 'patterns': ['hello there'],
+                'responses': [{'type': 'text', 'content': f'Welcome to {name}'}],
+            }]}))
+            config[name] = {'dir': name, 'backend': 'simple', 'title': f'{name.title()} National Park'}
+        config['ghost'] = {'dir': 'ghost', 'backend': 'simple'}
+        self.config = self.root / 'tenants.json'
+        self.config.write_text(json.dumps(config))
+        reset_tenants()
+        self.addCleanup(reset_tenants)
+
+    def post_chat(self, payload, **headers):
+        return self.client.post('/api/chat/', data=json.dumps(payload), content_type='application/json', **headers)
+
+    def test_requests_are_routed_to_their_tenant(self):
+        with self.settings(TENANTS_CONFIG=str(self.config)):
+            by_field = self.post_chat({'message': 'hello there', 'tenant': 'parka'})
+            by_header = self.post_chat({'message': 'hello there'}, HTTP_X_TENANT='parkb')
+            default = self.post_chat({'message': 'hello there'})
+            unknown = self.post_chat({'message': 'hello there', 'tenant': 'yosemite'})
+            fees = self.post_chat({'message': 'park fees', 'tenant': 'parka'})
+        self.assertEqual(by_field.json()['parts'][0]['content'], 'Welcome to parka')
+        self.assertEqual(by_header.json()['parts'][0]['content'], 'Welcome to parkb')
+        self.assertEqual(default.status_code, 200)
+        self.assertNotIn('Welcome to park', json.dumps(default.json()))
+        self.assertEqual((unknown.status_code, unknown.json()), (404, {'error': "Unknown tenant 'yosemite'"}))
+        # Bale Mountains quick actions stay with Bale Mountains
+        self.assertNotEqual(fees.json().get('intent'), 'park_fees')
+
+    def test_tenant_fallback_and_error_replies_name_their_own_park(self):
+        config = json.loads(self.config.read_text())
+        config['parkb']['replies'] = {'error': 'Parkb is having a moment.'}
+        self.config.write_text(json.dumps(config))
+        with self.settings(TENANTS_CONFIG=str(self.config)):
+            fallback = self.post_chat({'message': 'zzxq vbnm', 'tenant': 'parka'}).json()
+        self.assertEqual(fallback['intent'], 'fallback')
+        self.assertIn('Parka National Park', fallback['parts'][0]['content'])
+        self.assertNotIn('Bale', json.dumps(fallback))
+        parkb = TenantPool(load_tenants(self.config), 1 << 30).get('parkb')
+        self.assertEqual(parkb._error_response()['parts'][0]['content'], 'Parkb is having a moment.')
+        self.assertNotIn('Bale', parkb._fallback_response()['parts'][0]['content'])
+
+    @override_settings(WARMUP_ON_START=True)
+    def test_tenants_are_warmed_up_after_loading(self):
+        pool = TenantPool(load_tenants(self.config), 1 << 30, warm=True)
+        parka = pool.get('parka')
+        deadline = time.monotonic() + 5
+        while 'parka' not in pool.stats()['warmed'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn('parka', pool.stats()['warmed'])
+        self.assertEqual(len(parka.response_cache), 0)
+
+    def test_least_recently_used_tenant_is_unloaded_over_budget(self):
+        tenants = load_tenants(self.config)
+        pool = TenantPool(tenants, int(tenant_footprint(TenantPool(tenants, 0).get('parka')) * 2.5))
+        parka, parkb = pool.get('parka'), pool.get('parkb')
+        self.assertIs(parka.phrase_memory, parkb.phrase_memory)
+        self.assertIs(pool.get('parka'), parka)
+        pool.get('parkc')
+        stats = pool.stats()
+        self.assertEqual(list(stats['loaded']), ['parka', 'parkc'])
+        self.assertEqual((stats['loads'], stats['evictions']), (3, 1))
+        self.assertLessEqual(stats['used_bytes'], stats['budget_bytes'])
+        self.assertIsNot(pool.get('parkb'), parkb)
+
+    def test_unknown_and_broken_tenants(self):
+        pool = TenantPool(load_tenants(self.config), 1 << 30)
+        with self.assertRaises(UnknownTenant):
+            pool.get('yosemite')
+        self.assertIsNone(pool.get('ghost'))
+        self.assertIn('missing', pool.stats()['failed']['ghost'])
+
+
+class FakeUpstream:
+    """Local HTTP upstream with injectable latency and failure status"""
+
+    def __init__(self):
+        self.latency = 0.0
+        self.status = 200
+        self.calls = 0
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                upstream.calls += 1
+                time.sleep(upstream.latency)
+                body = json.dumps({"data": {"translations": [{"translatedText": "park fees"}]}}).encode()
+                try:
+                    self.send_response(upstream.status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # client gave up after its timeout
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD=2,
+    CIRCUIT_BREAKER_RESET_TIMEOUT=0.2,
+    OUTBOUND_TIMEOUT=1.0,
+)
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        reset_breakers()
+        self.upstream = FakeUpstream()
+        self.addCleanup(self.upstream.close)
+
+    def translate(self):
+        def request(timeout):
+            response = requests.post(self.upstream.url, timeout=timeout)
+            response.raise_for_status()
+            return response.json()['data']['translations'][0]['translatedText']
+        return call_external('translation', request, fallback=lambda: 'fallback')
+
+    def test_request_deadline_caps_slow_upstream(self):
+        self.upstream.latency = 0.5
+        start = time.monotonic()
+        with deadline_scope(0.1):
+            self.assertEqual(self.translate(), 'fallback')
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_timeouts_on_a_short_request_budget_do_not_open_the_breaker(self):
+        self.upstream.latency = 0.3
+        for _ in range(3):
+            with deadline_scope(0.05):
+                self.assertEqual(self.translate(), 'fallback')
+        breaker = get_breaker('translation').snapshot()
+        self.assertEqual((breaker['state'], breaker['failures'], breaker['fallbacks']), (CircuitBreaker.CLOSED, 0, 3))
+
+    def test_breaker_opens_then_recovers_through_half_open_probe(self):
+        self.upstream.status = 500
+        self.translate()
+        self.translate()
+        self.assertEqual(get_breaker('translation').state, CircuitBreaker.OPEN)
+
+        calls = self.upstream.calls
+        self.assertEqual(self.translate(), 'fallback')
+        self.assertEqual(self.upstream.calls, calls)
+
+        self.upstream.status = 200
+        time.sleep(0.25)
+        self.assertEqual(self.translate(), 'park fees')
+        self.assertEqual(get_breaker('translation').state, CircuitBreaker.CLOSED)
+
+    def test_breaker_state_in_performance_endpoint(self):
+        self.translate()
+        with self.settings(ROOT_URLCONF='chatbot_backend.urls'):
+            data = self.client.get('/api/performance/').json()
+        self.assertEqual(data['circuit_breakers']['translation']['state'], CircuitBreaker.CLOSED)
+
+
+class StubWeatherProvider:
+    name = 'stub'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def fetch(self, location, timeout=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {'location': location, 'temperature': f"{self.calls}°C", 'condition': 'Clear'}
+
+
+class WeatherServiceTests(SimpleTestCase):
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("condition not reached")
+            time.sleep(0.01)
+
+    def make_service(self, provider, **kwargs):
+        reset_breakers()
+        service = WeatherService(provider, refresh_interval=60, **kwargs)
+        self.addCleanup(service.stop)
+        return service
+
+    def test_never_waits_on_slow_provider(self):
+        provider = StubWeatherProvider(latency=0.5)
+        service = self.make_service(provider)
+        start = time.monotonic()
+        reading = service.get('Goba')
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(reading['source'], 'climate_normals')
+        self.assertTrue(reading['stale'])
+
+    def test_serves_stale_reading_while_revalidating(self):
+        provider = StubWeatherProvider()
+        service = self.make_service(provider, ttl=0.3)
+        service.start()
+        self.wait_for(lambda: service.get()['source'] == 'stub')
+        self.assertFalse(service.get()['stale'])
+
+        time.sleep(0.4)
+        stale = service.get()
+        self.assertTrue(stale['stale'])
+        self.assertEqual(stale['temperature'], '1°C')
+        self.wait_for(lambda: service.get()['temperature'] == '2°C')
+
+    def test_client_locations_are_bounded(self):
+        service = self.make_service(StubWeatherProvider(), max_locations=5)
+        for i in range(200):
+            service.get(f'Nowhere {i}')
+        self.wait_for(lambda: service.stats()['refreshes'] >= 4)
+        self.assertLessEqual(len(service.tracked), 5)
+        self.assertLessEqual(len(service.readings), 5)
+        self.assertIn('bale mountains', service.tracked)
+        self.assertIn('nowhere 199', service.tracked)
+
+    def test_locations_not_requested_within_stale_window_are_dropped(self):
+        service = self.make_service(StubWeatherProvider(), max_stale=0.2)
+        service.get('Goba')
+        self.wait_for(lambda: 'goba' in service.readings)
+        time.sleep(0.3)
+        service.get('Robe')
+        self.wait_for(lambda: 'goba' not in service.tracked)
+        self.assertNotIn('goba', service.readings)
+        self.assertIn('robe', service.tracked)
+
+    def test_endpoint_etag_ignores_reading_age(self):
+        get_weather_service().refresh('bale mountains')
+        first = self.client.get('/api/weather/')
+        time.sleep(0.01)
+        second = self.client.get('/api/weather/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_query_strings_do_not_grow_last_modified_table(self):
+        from .utils import http_cache
+
+        self.client.get('/api/weather/')
+        before = len(http_cache._last_changed)
+        for i in range(50):
+            self.client.get('/api/weather/', {'nonce': i})
+        # Same content under 50 URLs: no new entries
+        self.assertEqual(len(http_cache._last_changed), before)
+        with mock.patch.object(http_cache, '_last_changed', CacheStore('last_changed', maxsize=3)):
+            for i in range(10):
+                http_cache.last_changed(f'"{i}"')
+            self.assertEqual(len(http_cache._last_changed), 3)
+
+    def test_endpoint_returns_freshness_metadata(self):
+        data = self.client.get('/api/weather/', {'location': 'Bale Mountains'}).json()
+        for key in ('location', 'temperature', 'condition', 'source', 'stale', 'age_seconds'):
+            self.assertIn(key, data)
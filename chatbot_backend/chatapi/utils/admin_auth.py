@@ -0,0 +1,22 @@
+import hmac
+
+
+def _admin_token():
+    try:
+        from django.conf import settings
+        return getattr(settings, 'ADMIN_TOKEN', None)
+    except Exception:
+        return None
+
+
+def admin_authorized(request):
+    """
+    True when the request carries ADMIN_TOKEN as a Bearer token or in
+    X-Admin-Token. Admin endpoints are closed while no token is configured.
+    """
+    expected = _admin_token()
+    if not expected:
+        return False
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    supplied = header[7:] if header.startswith('Bearer ') else request.META.get('HTTP_X_ADMIN_TOKEN', '')
+    return hmac.compare_digest(supplied.encode(), expected.encode())
@@ -0,0 +1,281 @@
+import math
+import threading
+import time
+
+from .cache import CacheStore
+from .resilience import remaining_time
+
+DEFAULTS = {
+    'ADMISSION_FAST_CONCURRENCY': 32,
+    'ADMISSION_MODEL_CONCURRENCY': 4,
+    'ADMISSION_FAST_MAX_QUEUE_DELAY': 2.0,
+    'ADMISSION_MODEL_MAX_QUEUE_DELAY': 0.5,
+    'CLIENT_RATE_LIMIT': 5.0,
+    'CLIENT_BURST': 20,
+    'CLIENT_BUCKETS': 10000,
+    'TRUSTED_PROXY_COUNT': 1,
+}
+
+FAST = 'fast'
+MODEL = 'model'
+
+
+class Overloaded(Exception):
+    """The request was not admitted; retry_after tells the client when to come back"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class RateLimited(Overloaded):
+    """The client has used up its token bucket"""
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; each request takes one"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Seconds until a token is available, 0 if one was taken now"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class Lane:
+    """
+    Bounded pool of concurrent slots with queue-delay tracking.
+    Queue delay counts from when the request arrived (the proxy's
+    X-Request-Start when available), so time spent waiting for a worker
+    counts too. Requests wait for a slot for whatever is left of
+    max_queue_delay (capped by the request deadline); when that is already
+    gone, or the expected wait estimated from the queue length and recent
+    service times exceeds it, they are shed before queueing at all.
+    """
+
+    def __init__(self, name, concurrency, max_queue_delay):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue_delay = max_queue_delay
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.queue_delay = 0.0
+        self.service_time = 0.0
+
+    def expected_wait(self):
+        with self._lock:
+            if self.in_flight < self.concurrency:
+                return 0.0
+            return (self.queued + 1) / self.concurrency * self.service_time
+
+    def _record(self, attr, sample):
+        # Exponentially weighted moving average
+        current = getattr(self, attr)
+        setattr(self, attr, sample if current == 0.0 else 0.8 * current + 0.2 * sample)
+
+    def acquire(self, arrived_at=None):
+        """Wait for a slot; returns when it was granted or raises Overloaded"""
+        upstream = max(0.0, time.time() - arrived_at) if arrived_at else 0.0
+        budget = self.max_queue_delay - upstream
+        remaining = remaining_time()
+        if remaining is not None:
+            budget = min(budget, remaining)
+
+        expected = self.expected_wait()
+        if budget <= 0 or expected > budget:
+            with self._lock:
+                self.shed += 1
+                self._record('queue_delay', upstream)
+            raise Overloaded(
+                f"{self.name} lane queue delay {upstream + expected:.2f}s over limit",
+                expected or self.service_time
+            )
+
+        started = time.monotonic()
+        with self._lock:
+            self.queued += 1
+        acquired = self._slots.acquire(timeout=budget)
+        waited = upstream + time.monotonic() - started
+        with self._lock:
+            self.queued -= 1
+            self._record('queue_delay', waited)
+            if not acquired:
+                self.shed += 1
+            else:
+                self.in_flight += 1
+                self.admitted += 1
+        if not acquired:
+            raise Overloaded(f"{self.name} lane slot not available within {budget:.2f}s", self.service_time or budget)
+        return time.monotonic()
+
+    def release(self, acquired_at):
+        with self._lock:
+            self.in_flight -= 1
+            self._record('service_time', time.monotonic() - acquired_at)
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'in_flight': self.in_flight,
+                'queued': self.queued,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'queue_delay_ms': round(self.queue_delay * 1000, 2),
+                'service_time_ms': round(self.service_time * 1000, 2),
+            }
+
+
+class Admission:
+    """Holds a lane slot for the duration of a `with` block"""
+
+    def __init__(self, lane, arrived_at=None):
+        self.lane = lane
+        self.arrived_at = arrived_at
+        self._acquired_at = None
+
+    def __enter__(self):
+        self._acquired_at = self.lane.acquire(self.arrived_at)
+        return self
+
+    def __exit__(self, *exc):
+        self.lane.release(self._acquired_at)
+        return False
+
+
+class AdmissionController:
+    """
+    Front door for chat requests.
+    Cheap answers (cache hits, quick actions, exact patterns) go to the fast
+    lane and everything that may reach the model or the translator goes to a
+    separate, smaller model lane, so a burst of expensive requests cannot
+    starve the cheap ones. Each client is also limited by a token bucket.
+    """
+
+    def __init__(self, fast_concurrency=32, model_concurrency=4, fast_max_queue_delay=2.0,
+                 model_max_queue_delay=0.5, client_rate=5.0, client_burst=20, max_clients=10000):
+        self.lanes = {
+            FAST: Lane(FAST, fast_concurrency, fast_max_queue_delay),
+            MODEL: Lane(MODEL, model_concurrency, model_max_queue_delay),
+        }
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.buckets = CacheStore('client_buckets', maxsize=max_clients)
+        self._buckets_lock = threading.Lock()
+        self.rate_limited = 0
+
+    def _bucket(self, client):
+        with self._buckets_lock:
+            bucket = self.buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.client_rate, self.client_burst)
+                self.buckets[client] = bucket
+            return bucket
+
+    def check_rate(self, client):
+        """Raise RateLimited when the client has used up its token bucket"""
+        if not self.client_rate:
+            return
+        wait = self._bucket(client).take()
+        if wait:
+            self.rate_limited += 1
+            raise RateLimited(f"Rate limit exceeded for {client}", wait)
+
+    def admit(self, client, lane=MODEL, arrived_at=None):
+        """Context manager holding a slot in the given lane; raises Overloaded when shedding"""
+        self.check_rate(client)
+        return Admission(self.lanes[lane], arrived_at)
+
+    def stats(self):
+        return {
+            'lanes': {name: lane.stats() for name, lane in self.lanes.items()},
+            'rate_limited': self.rate_limited,
+            'tracked_clients': len(self.buckets),
+        }
+
+
+def client_id(request):
+    """
+    Client address as seen by the outermost of TRUSTED_PROXY_COUNT proxies:
+    the X-Forwarded-For hop that many places from the right. Hops further
+    left are written by the client and not trusted. Without enough hops, or
+    with no trusted proxies, REMOTE_ADDR.
+    """
+    proxies = _setting('TRUSTED_PROXY_COUNT')
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    if proxies > 0 and len(hops) >= proxies:
+        return hops[-proxies]
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+def request_start(request):
+    """
+    Arrival time from the proxy's X-Request-Start header ("t=<epoch>" in
+    seconds, milliseconds or microseconds), or None when absent or implausible
+    """
+    value = request.META.get('HTTP_X_REQUEST_START', '')
+    try:
+        started = float(value.strip().removeprefix('t='))
+    except ValueError:
+        return None
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    # Ignore clock skew and obviously bogus values
+    if not 0 <= time.time() - started < 3600:
+        return None
+    return started
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """Process-wide admission controller, created from settings on first use"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                fast_concurrency=_setting('ADMISSION_FAST_CONCURRENCY'),
+                model_concurrency=_setting('ADMISSION_MODEL_CONCURRENCY'),
+                fast_max_queue_delay=_setting('ADMISSION_FAST_MAX_QUEUE_DELAY'),
+                model_max_queue_delay=_setting('ADMISSION_MODEL_MAX_QUEUE_DELAY'),
+                client_rate=_setting('CLIENT_RATE_LIMIT'),
+                client_burst=_setting('CLIENT_BURST'),
+                max_clients=_setting('CLIENT_BUCKETS'),
+            )
+        return _controller
+
+
+def reset_admission_controller():
+    global _controller
+    with _controller_lock:
+        _controller = None
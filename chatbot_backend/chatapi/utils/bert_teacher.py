@@ -0,0 +1,42 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = Path(__file__).resolve().parents[3]
+TEACHER_DIR = REPO_DIR / 'bert_baale_model'
+LABELS_PATH = REPO_DIR / 'bert_label_encoder.npy'
+
+
+class BertTeacher:
+    """
+    The fine-tuned bert-base-uncased intent classifier from chatbot_bert.ipynb.
+    Too slow to serve per request on CPU, but used offline to label training
+    data for the BoW student.
+    """
+
+    def __init__(self, model_dir=TEACHER_DIR, labels_path=LABELS_PATH, max_length=64):
+        from transformers import BertTokenizer, TFBertForSequenceClassification
+
+        self.tokenizer = BertTokenizer.from_pretrained(str(model_dir))
+        self.model = TFBertForSequenceClassification.from_pretrained(str(model_dir))
+        # LabelEncoder.classes_ saved by the notebook, in logit order
+        self.classes = [str(label) for label in np.load(labels_path, allow_pickle=True)]
+        self.max_length = max_length
+        logger.info(f"BERT teacher loaded with {len(self.classes)} labels")
+
+    def logits(self, texts, batch_size=32):
+        """Raw classifier logits, one row per text"""
+        rows = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                list(texts[start:start + batch_size]),
+                return_tensors='tf',
+                padding=True,
+                truncation=True,
+                max_length=self.max_length
+            )
+            rows.append(self.model(inputs, training=False).logits.numpy())
+        return np.concatenate(rows) if rows else np.zeros((0, len(self.classes)), dtype=np.float32)
@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_MISSING = object()
+
+
+class CacheStore:
+    """
+    Thread-safe LRU cache with hit/miss accounting.
+    Supports the dict operations the processors already use on their caches.
+    """
+
+    def __init__(self, name, maxsize=None):
+        self.name = name
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Look up a key, counting the hit or miss and refreshing its recency"""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+    def stats(self):
+        """Size and hit statistics, prefixed with the cache name"""
+        return {
+            f'{self.name}_size': len(self._data),
+            f'{self.name}_hits': self.hits,
+            f'{self.name}_misses': self.misses,
+            f'{self.name}_hit_ratio': self.hit_ratio(),
+        }
+
+
+def bow_signature(bow):
+    """Compact cache key for a binary BoW vector: its active features packed into bytes"""
+    return np.packbits(np.asarray(bow, dtype=np.uint8)).tobytes()
+
+
+class PredictionCache(CacheStore):
+    """
+    Model outputs keyed by the bow_signature of their input, so messages
+    worded differently but with the same BoW features share one forward pass.
+    """
+
+    def predict(self, bow, infer, use_cache=True):
+        """
+        infer(bow) for a BoW vector, served from the cache when the same
+        features were seen before. Returns the output and whether infer ran.
+        """
+        signature = bow_signature(bow)
+        output = self.get(signature) if use_cache else None
+        if output is not None:
+            return output, False
+        output = infer(bow)
+        if use_cache:
+            self[signature] = output
+        return output, True
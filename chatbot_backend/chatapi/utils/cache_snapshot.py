@@ -0,0 +1,271 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from .cache import CacheStore
+from .query_log import query_log_files
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves still replace the file atomically, but may race
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+DEFAULTS = {
+    'CACHE_SNAPSHOT_PATH': '',
+    'CACHE_SNAPSHOT_ENTRIES': 2000,
+    'CACHE_SNAPSHOT_INTERVAL': 300,
+    'CACHE_PREWARM': False,
+    'CACHE_PREWARM_QUERY_LOG': None,
+    'CACHE_PREWARM_TOP_QUERIES': 500,
+}
+
+# Responses whose content depends on when they were built are not persisted
+VOLATILE_INTENTS = {'time_based_greeting', 'error'}
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+def artifact_version(*paths):
+    """Short content hash over a set of artifact files"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _persistable(value):
+    return not (isinstance(value, dict) and value.get('intent') in VOLATILE_INTENTS)
+
+
+def _hottest(cache, limit):
+    """Up to `limit` most recently used entries, coldest first so reloading keeps the LRU order"""
+    items = cache.items() if isinstance(cache, CacheStore) else list(cache.items())
+    return [(key, value) for key, value in items if _persistable(value)][-limit:]
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on `path`.lock, held across the workers sharing one snapshot"""
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path):
+    """The snapshot stored at `path`, or None when it is missing or unusable"""
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache snapshot {path}: {str(e)}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        logger.warning(f"Ignoring cache snapshot {path} with unknown format")
+        return None
+    return snapshot
+
+
+def save_snapshot(processor, path=None, max_entries=None):
+    """
+    Write the hottest entries of each persistent cache, tagged with the
+    artifact version they were computed against, to `path` atomically.
+    Every worker of a server saves to the same file, so the save holds a
+    lock and merges with what the other workers saved (same artifact
+    version only, this worker's entries counting as the hottest) instead
+    of the last writer discarding the rest. Returns the number of entries
+    written per cache.
+    """
+    path = Path(path or _setting('CACHE_SNAPSHOT_PATH'))
+    max_entries = max_entries or _setting('CACHE_SNAPSHOT_ENTRIES')
+    with _file_lock(path):
+        previous = (_read_snapshot(path) or {}).get('caches', {})
+        caches = {}
+        for name, (cache, version) in processor.persistent_caches().items():
+            entries = _hottest(cache, max_entries)
+            saved = previous.get(name)
+            if saved is not None and saved['version'] == version:
+                keys = {key for key, _ in entries}
+                others = [(key, value) for key, value in saved['entries'] if key not in keys]
+                entries = (others + entries)[-max_entries:]
+            caches[name] = {'version': version, 'entries': entries}
+        snapshot = {'format': SNAPSHOT_FORMAT, 'saved_at': time.time(), 'caches': caches}
+
+        fd, tmp = tempfile.mkstemp(prefix='.cache-snapshot-', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    counts = {name: len(cache['entries']) for name, cache in caches.items()}
+    logger.info(f"Cache snapshot written to {path}: {counts}")
+    return counts
+
+
+def load_snapshot(processor, path=None):
+    """
+    Preload a processor's caches from a snapshot. Caches saved against a
+    different artifact version are discarded. A missing or unreadable file
+    just means a cold start. Returns the number of entries loaded per cache.
+    """
+    path = Path(path or _setting('CACHE_SNAPSHOT_PATH'))
+    snapshot = _read_snapshot(path)
+    if snapshot is None:
+        return {}
+
+    loaded = {}
+    for name, (cache, version) in processor.persistent_caches().items():
+        saved = snapshot['caches'].get(name)
+        if saved is None:
+            continue
+        if saved['version'] != version:
+            logger.info(f"Discarding {name} snapshot from artifact version {saved['version']}")
+            loaded[name] = 0
+            continue
+        for key, value in saved['entries']:
+            cache[key] = value
+        loaded[name] = len(saved['entries'])
+    logger.info(f"Cache snapshot loaded from {path}: {loaded}")
+    return loaded
+
+
+def top_queries(path, limit):
+    """
+    Most frequent messages in a query log: JSON lines with a 'message'
+    field, or plain text with one message per line. Every worker's file
+    and their rotated backups are read (see query_log_files).
+    """
+    counts = Counter()
+    files = query_log_files(path)
+    if not files:
+        logger.warning(f"No query log at {path}")
+    for log_file in files:
+        try:
+            with open(log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if line.startswith('{'):
+                        try:
+                            line = json.loads(line).get('message', '')
+                        except ValueError:
+                            continue
+                    if line:
+                        counts[line] += 1
+        except OSError as e:
+            logger.warning(f"Cannot read query log {log_file}: {str(e)}")
+    return [message for message, _ in counts.most_common(limit)]
+
+
+def prewarm(processor, messages):
+    """Run messages through the full pipeline so their answers are cached; returns seconds taken"""
+    started = time.perf_counter()
+    for message in messages:
+        processor.get_response(message)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Pre-warmed {len(messages)} messages in {elapsed:.2f}s")
+    return elapsed
+
+
+def prewarm_messages(processor, query_log=None, top=None):
+    """Every training pattern, then the most frequent logged queries"""
+    messages = [
+        pattern for intent in processor.intents.get('intents', []) for pattern in intent.get('patterns', [])
+    ]
+    if query_log:
+        messages.extend(top_queries(query_log, top or _setting('CACHE_PREWARM_TOP_QUERIES')))
+    return list(dict.fromkeys(messages))
+
+
+class SnapshotWriter:
+    """Saves a processor's cache snapshot every `interval` seconds and at interpreter exit"""
+
+    def __init__(self, processor, path=None, interval=None, max_entries=None):
+        self.processor = processor
+        self.path = path
+        self.interval = interval if interval is not None else _setting('CACHE_SNAPSHOT_INTERVAL')
+        self.max_entries = max_entries
+        self._stopped = threading.Event()
+        self._thread = None
+        self.saves = 0
+        self.save_failures = 0
+
+    def start(self):
+        atexit.register(self.stop)
+        if self.interval and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name='cache-snapshot', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the interval thread and write a final snapshot (graceful shutdown)"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.save()
+
+    def save(self):
+        try:
+            save_snapshot(self.processor, self.path, self.max_entries)
+            self.saves += 1
+        except Exception as e:
+            self.save_failures += 1
+            logger.error(f"Cache snapshot failed: {str(e)}")
+
+    def _run(self):
+        while not self._stopped.wait(timeout=self.interval):
+            self.save()
+
+    def stats(self):
+        return {'snapshot_saves': self.saves, 'snapshot_save_failures': self.save_failures}
+
+
+def start_cache_persistence(processor):
+    """
+    Warm start for a freshly loaded processor: preload the last snapshot,
+    optionally pre-warm with training patterns and top logged queries, and
+    keep snapshotting until shutdown. Returns the snapshot writer, or None
+    when CACHE_SNAPSHOT_PATH is empty (the default).
+    """
+    persist = bool(_setting('CACHE_SNAPSHOT_PATH'))
+    if persist:
+        load_snapshot(processor)
+    if _setting('CACHE_PREWARM'):
+        prewarm(processor, prewarm_messages(processor, _setting('CACHE_PREWARM_QUERY_LOG')))
+    if not persist:
+        return None
+    writer = SnapshotWriter(processor)
+    writer.start()
+    return writer
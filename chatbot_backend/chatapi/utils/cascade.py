@@ -0,0 +1,263 @@
+import logging
+import math
+import time
+from collections import Counter
+
+import numpy as np
+
+from . import training
+from .cache import PredictionCache
+from .cache_snapshot import artifact_version
+from .language import detect_language
+from .memory import load_shared, track_component
+from .query_log import NULL_TRACE
+from .simple_processor import SimpleProcessor
+from .text_normalizer import canonicalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CASCADE_KEYWORD_THRESHOLD': 0.5,
+    'CASCADE_MODEL_THRESHOLD': 0.7,
+    'CASCADE_HEAVY_THRESHOLD': 0.5,
+    'CASCADE_HEAVY_TIER': None,
+}
+
+PREDICTION_CACHE_SIZE = 10000
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class KeywordTier:
+    """
+    Best training pattern by IDF-weighted token overlap (weighted Jaccard).
+    Words shared by many intents ("what", "the", "park") count for little,
+    so the score is a usable confidence rather than a raw hit count.
+    """
+
+    name = 'keyword'
+
+    def __init__(self, intents, threshold=DEFAULTS['CASCADE_KEYWORD_THRESHOLD']):
+        self.threshold = threshold
+        self.patterns = [
+            (intent['tag'], frozenset(canonicalize(pattern).split()))
+            for intent in intents.get('intents', []) for pattern in intent.get('patterns', [])
+        ]
+        document_frequency = Counter(word for _, words in self.patterns for word in words)
+        total = max(1, len(self.patterns))
+        self.idf = {word: math.log(1 + total / count) for word, count in document_frequency.items()}
+        self.unknown_weight = math.log(1 + total)
+        self.by_word = {}
+        for i, (_, words) in enumerate(self.patterns):
+            for word in words:
+                self.by_word.setdefault(word, []).append(i)
+
+    def _weight(self, words):
+        return sum(self.idf.get(word, self.unknown_weight) for word in words)
+
+    def classify(self, text, use_cache=True):
+        words = frozenset(text.split())
+        candidates = {i for word in words for i in self.by_word.get(word, ())}
+        best_tag, best_score = None, 0.0
+        for i in candidates:
+            tag, pattern = self.patterns[i]
+            score = self._weight(words & pattern) / self._weight(words | pattern)
+            if score > best_score:
+                best_tag, best_score = tag, score
+        return (best_tag, best_score) if best_tag else None
+
+
+class ModelTier:
+    """
+    The BoW MLP that ChatProcessor serves, without spaCy or the rest of its
+    pipeline: tokenize, lemmatize, spelling-correct, one forward pass.
+    """
+
+    name = 'model'
+
+    def __init__(self, threshold=DEFAULTS['CASCADE_MODEL_THRESHOLD'], model_dir=training.UTILS_DIR):
+        from tensorflow.keras.models import load_model
+        from .distillation import BowEncoder
+
+        def load_tracked(path):
+            with track_component('keras_model'):
+                return load_model(path)
+
+        words, self.classes, self.model = training.load_artifacts(model_dir, load_tracked)
+        if self.model.input_shape[1] != len(words):
+            raise ValueError("Model does not match vocabulary; retrain with train_model.py")
+        self.version = artifact_version(*(model_dir / name for name in training.ARTIFACT_FILES))
+        self.threshold = threshold
+        self.encoder = BowEncoder(words, *load_shared('nltk_tokenizer', training.nltk_tokenizer))
+        self.prediction_cache = PredictionCache('cascade_prediction_cache', maxsize=PREDICTION_CACHE_SIZE)
+
+    def classify(self, text, use_cache=True):
+        bow = self.encoder.encode([text])
+        probabilities, _ = self.prediction_cache.predict(
+            bow[0], lambda _: self.model(bow, training=False).numpy()[0], use_cache
+        )
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+
+class BertTier:
+    """Fine-tuned BERT classifier; only consulted when the cheaper tiers are unsure"""
+
+    name = 'bert'
+
+    def __init__(self, threshold=DEFAULTS['CASCADE_HEAVY_THRESHOLD']):
+        from .bert_teacher import BertTeacher
+        from .distillation import softmax
+
+        with track_component('bert_model'):
+            self.teacher = BertTeacher()
+        self.softmax = softmax
+        self.threshold = threshold
+        self.version = 'bert'
+
+    def classify(self, text, use_cache=True):
+        probabilities = self.softmax(self.teacher.logits([text]))[0]
+        best = int(probabilities.argmax())
+        return self.teacher.classes[best], float(probabilities[best])
+
+
+HEAVY_TIERS = {'bert': BertTier}
+
+
+class CascadeProcessor(SimpleProcessor):
+    """
+    Tiered intent resolution: cached answers, quick actions and exact
+    patterns first, then each classifier tier in order of cost until one is
+    confident. Tiers whose dependencies are missing are left out, so the
+    cascade degrades to the rule and keyword tiers without TensorFlow.
+    The model tier reads its artifacts from `model_dir`; the remaining
+    arguments select the knowledge base as for SimpleProcessor.
+    """
+
+    def __init__(self, tiers=None, model_dir=training.UTILS_DIR, **options):
+        super().__init__(**options)
+        self.model_dir = model_dir
+        self.tiers = tiers if tiers is not None else self._default_tiers()
+        self.tier_resolved = Counter()
+        self.tier_seconds = Counter()
+        self.tier_calls = Counter()
+        logger.info(f"Cascade tiers: rules, {', '.join(tier.name for tier in self.tiers)}")
+
+    def _default_tiers(self):
+        tiers = [KeywordTier(self.intents, _setting('CASCADE_KEYWORD_THRESHOLD'))]
+        try:
+            tiers.append(ModelTier(_setting('CASCADE_MODEL_THRESHOLD'), self.model_dir))
+        except Exception as e:
+            logger.warning(f"Cascade model tier disabled: {str(e)}")
+        heavy = _setting('CASCADE_HEAVY_TIER')
+        if heavy:
+            try:
+                tiers.append(HEAVY_TIERS[heavy](_setting('CASCADE_HEAVY_THRESHOLD')))
+            except Exception as e:
+                logger.warning(f"Cascade {heavy} tier disabled: {str(e)}")
+        return tiers
+
+    def _resolve(self, tier, started, trace):
+        if not trace.synthetic:
+            self.tier_resolved[tier] += 1
+        self._charge(tier, started, trace)
+        trace.tier = tier
+
+    def _charge(self, tier, started, trace):
+        if not trace.synthetic:
+            self.tier_calls[tier] += 1
+            self.tier_seconds[tier] += time.perf_counter() - started
+
+    def _compute_response(self, text, cache_key, trace=NULL_TRACE):
+        """Walk the tiers for a message that missed the response cache"""
+        cleaned_input = cache_key
+        started = time.perf_counter()
+        with trace.stage('rules'):
+            response, cleaned_input = self._rule_response(text, cleaned_input, trace)
+        if cleaned_input is None:
+            # Amharic the phrase memory cannot translate; no tier understands it
+            self._charge('rules', started, trace)
+            return self._fall_back(cache_key, trace)
+        if response is not None:
+            self._resolve('rules', started, trace)
+            return response
+        self._charge('rules', started, trace)
+
+        for tier in self.tiers:
+            started = time.perf_counter()
+            with trace.stage(tier.name):
+                match = tier.classify(cleaned_input, use_cache=trace.use_cache)
+            if match and match[1] >= tier.threshold and match[0] in self.intents_by_tag:
+                self._resolve(tier.name, started, trace)
+                return self._build_intent_response(self.intents_by_tag[match[0]], round(match[1], 4))
+            self._charge(tier.name, started, trace)
+        return self._fall_back(cache_key, trace)
+
+    def _fall_back(self, cache_key, trace):
+        if not trace.synthetic:
+            self.tier_resolved['fallback'] += 1
+        trace.tier = 'fallback'
+        return self._fallback_response()
+
+    def _rule_response(self, text, cleaned_input, trace=NULL_TRACE):
+        """
+        Quick actions and exact patterns, before and after spelling correction.
+        Returns the response (None if no rule applies) and the text the
+        classifier tiers should see, which is None for untranslatable Amharic.
+        """
+        if detect_language(text) == 'am':
+            english = self.phrase_memory.translate(cleaned_input, count=not trace.synthetic)
+            if english is None:
+                return None, None
+            cleaned_input = canonicalize(english)
+
+        candidates = [cleaned_input]
+        if self.spelling_index is not None:
+            corrected = self.spelling_index.correct_text(cleaned_input, count=not trace.synthetic)
+            if corrected != cleaned_input:
+                candidates.append(corrected)
+        for candidate in candidates:
+            response = self._handle_quick_actions(candidate)
+            if response:
+                return response, candidate
+            exact_tag = self.pattern_index.get(candidate)
+            if exact_tag in self.intents_by_tag:
+                if not trace.synthetic:
+                    self.exact_pattern_hits += 1
+                return self._build_intent_response(self.intents_by_tag[exact_tag], 1.0), candidate
+        return None, candidates[-1]
+
+    def persistent_caches(self):
+        version = '-'.join([self.kb['version']] + [getattr(tier, 'version', tier.name) for tier in self.tiers])
+        return {'response_cache': (self.response_cache, version)}
+
+    def clear_cache(self):
+        super().clear_cache()
+        for tier in self.tiers:
+            if hasattr(tier, 'prediction_cache'):
+                tier.prediction_cache.clear()
+
+    def cascade_stats(self):
+        """Share of traffic each tier resolves and its mean cost per call in milliseconds"""
+        resolved = dict(self.tier_resolved, cache=self.response_cache.hits)
+        total = sum(resolved.values())
+        stats = {}
+        for name in ['cache', 'rules', *(tier.name for tier in self.tiers), 'fallback']:
+            stats[f'cascade_{name}_resolved'] = resolved.get(name, 0)
+            stats[f'cascade_{name}_share'] = round(resolved.get(name, 0) / total, 4) if total else 0.0
+            if self.tier_calls[name]:
+                stats[f'cascade_{name}_mean_ms'] = round(self.tier_seconds[name] / self.tier_calls[name] * 1000, 3)
+        return stats
+
+    def get_cache_stats(self):
+        stats = {**super().get_cache_stats(), **self.cascade_stats()}
+        for tier in self.tiers:
+            if hasattr(tier, 'prediction_cache'):
+                stats.update(tier.prediction_cache.stats())
+        return stats
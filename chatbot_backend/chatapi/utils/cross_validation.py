@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import training
+
+_dataset = {}
+
+
+def stratified_folds(labels, n_splits=5, seed=training.DEFAULT_SEED):
+    """
+    (train_idx, val_idx) pairs with each class spread evenly over the folds.
+    Every sample is validated exactly once.
+    """
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(seed)
+    fold_of = np.empty(len(labels), dtype=np.int64)
+    offset = 0
+    for label in np.unique(labels):
+        members = rng.permutation(np.flatnonzero(labels == label))
+        # Continue round-robin where the previous class stopped so fold sizes stay even
+        fold_of[members] = (np.arange(len(members)) + offset) % n_splits
+        offset += len(members)
+    indices = np.arange(len(labels))
+    return [(indices[fold_of != fold], indices[fold_of == fold]) for fold in range(n_splits)]
+
+
+def classification_metrics(y_true, y_pred, classes):
+    """Accuracy, macro/weighted F1 and per-class precision, recall, F1 and support"""
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    n = len(classes)
+    confusion = np.zeros((n, n), dtype=np.int64)
+    np.add.at(confusion, (y_true, y_pred), 1)
+
+    true_positive = np.diag(confusion).astype(float)
+    predicted = confusion.sum(axis=0)
+    support = confusion.sum(axis=1)
+    precision = np.divide(true_positive, predicted, out=np.zeros(n), where=predicted > 0)
+    recall = np.divide(true_positive, support, out=np.zeros(n), where=support > 0)
+    denominator = precision + recall
+    f1 = np.divide(2 * precision * recall, denominator, out=np.zeros(n), where=denominator > 0)
+
+    present = support > 0
+    return {
+        'accuracy': round(float(true_positive.sum() / max(1, len(y_true))), 4),
+        'macro_f1': round(float(f1[present].mean()) if present.any() else 0.0, 4),
+        'weighted_f1': round(float((f1 * support).sum() / max(1, support.sum())), 4),
+        'per_class': {
+            classes[i]: {
+                'precision': round(float(precision[i]), 4),
+                'recall': round(float(recall[i]), 4),
+                'f1': round(float(f1[i]), 4),
+                'support': int(support[i]),
+            }
+            for i in range(n) if present[i]
+        },
+    }
+
+
+def _init_worker(threads, X, y):
+    # Cap TF's own pools before it is imported so folds do not oversubscribe the cores
+    for name in ('TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS', 'OMP_NUM_THREADS'):
+        os.environ[name] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+    _dataset['X'], _dataset['y'] = X, y
+
+
+def _run_fold(fold, train_idx, val_idx, epochs, batch_size, seed):
+    """Train a fresh model on one fold and predict its held-out patterns"""
+    started = time.perf_counter()
+    X, y = _dataset['X'], _dataset['y']
+    model, _ = training.train(X[train_idx], y[train_idx], epochs=epochs, batch_size=batch_size, seed=seed + fold)
+    predictions = model.predict(X[val_idx], verbose=0).argmax(axis=1)
+    return fold, val_idx, predictions, round(time.perf_counter() - started, 3)
+
+
+def cross_validate(X, y, classes, n_splits=5, epochs=training.DEFAULT_EPOCHS,
+                   batch_size=training.DEFAULT_BATCH_SIZE, seed=training.DEFAULT_SEED, workers=None):
+    """
+    Stratified k-fold evaluation with one fresh model per fold.
+    workers=1 runs the folds sequentially in this process; otherwise they run
+    in a spawn-based process pool (TF is not fork-safe) with the cores split
+    evenly between workers.
+    """
+    labels = y.argmax(axis=1)
+    folds = stratified_folds(labels, n_splits=n_splits, seed=seed)
+    cores = os.cpu_count() or 1
+    workers = workers or min(n_splits, cores)
+    threads = max(1, cores // workers)
+
+    started = time.perf_counter()
+    jobs = [(fold, train_idx, val_idx, epochs, batch_size, seed) for fold, (train_idx, val_idx) in enumerate(folds)]
+    if workers == 1:
+        _init_worker(threads, X, y)
+        results = [_run_fold(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(threads, X, y)
+        ) as pool:
+            results = list(pool.map(_run_fold, *zip(*jobs)))
+    wall_seconds = time.perf_counter() - started
+
+    predicted = np.empty_like(labels)
+    fold_accuracy = []
+    fold_seconds = []
+    for fold, val_idx, predictions, seconds in sorted(results, key=lambda result: result[0]):
+        predicted[val_idx] = predictions
+        fold_accuracy.append(float((predictions == labels[val_idx]).mean()))
+        fold_seconds.append(seconds)
+
+    report = classification_metrics(labels, predicted, classes)
+    report.update({
+        'folds': n_splits,
+        'workers': workers,
+        'threads_per_worker': threads,
+        'fold_accuracy': [round(accuracy, 4) for accuracy in fold_accuracy],
+        'fold_accuracy_std': round(float(np.std(fold_accuracy)), 4),
+        'fold_seconds': fold_seconds,
+        'wall_seconds': round(wall_seconds, 3),
+    })
+    return report
@@ -0,0 +1,159 @@
+import random
+import time
+
+import numpy as np
+
+from . import training
+from .perturbations import augment
+from .spelling import SpellingIndex
+from .text_normalizer import canonicalize
+
+DEFAULT_COPIES = 8
+DEFAULT_TEMPERATURE = 2.0
+DEFAULT_ALPHA = 0.7
+
+
+def augmented_patterns(intents, copies=DEFAULT_COPIES, seed=training.DEFAULT_SEED):
+    """(text, tag) pairs: every training pattern plus `copies` augmented variants of it"""
+    rng = random.Random(seed)
+    pairs = []
+    for intent in intents.get('intents', []):
+        for pattern in intent.get('patterns', []):
+            pairs.append((pattern, intent['tag']))
+            variants = {canonicalize(augment(pattern, rng)) for _ in range(copies)}
+            pairs.extend((variant, intent['tag']) for variant in sorted(variants) if variant)
+    return pairs
+
+
+def evaluation_set(intents, copies=3, seed=training.DEFAULT_SEED + 1):
+    """Held-out variants generated with a different seed, without the original patterns"""
+    originals = {
+        canonicalize(pattern) for intent in intents.get('intents', []) for pattern in intent.get('patterns', [])
+    }
+    return [
+        (text, tag) for text, tag in augmented_patterns(intents, copies=copies, seed=seed)
+        if canonicalize(text) not in originals
+    ]
+
+
+def softmax(logits, temperature=1.0):
+    scaled = logits / temperature
+    scaled = scaled - scaled.max(axis=1, keepdims=True)
+    exp = np.exp(scaled)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def distillation_targets(teacher_logits, teacher_classes, gold_tags, classes,
+                         temperature=DEFAULT_TEMPERATURE, alpha=DEFAULT_ALPHA):
+    """
+    Blend the teacher's temperature-softened distribution with one-hot gold labels.
+    The teacher was trained on an older intent set: its distribution is
+    restricted to the labels the student also has, and rows whose gold tag
+    the teacher never saw learn from the gold label alone.
+    """
+    class_index = {tag: i for i, tag in enumerate(classes)}
+    hard = np.eye(len(classes), dtype=np.float32)[[class_index[tag] for tag in gold_tags]]
+
+    shared = [(t, class_index[tag]) for t, tag in enumerate(teacher_classes) if tag in class_index]
+    soft = np.zeros_like(hard)
+    if shared:
+        teacher_cols, student_cols = zip(*shared)
+        soft[:, list(student_cols)] = softmax(np.asarray(teacher_logits)[:, list(teacher_cols)], temperature)
+
+    known = {tag for tag in teacher_classes if tag in class_index}
+    weight = np.array([alpha if tag in known else 0.0 for tag in gold_tags], dtype=np.float32)[:, np.newaxis]
+    return weight * soft + (1 - weight) * hard
+
+
+class BowEncoder:
+    """Text to BoW vector exactly as ChatProcessor does it, spelling correction included"""
+
+    def __init__(self, words, tokenize, lemmatize):
+        self.words = words
+        self.tokenize = tokenize
+        self.lemmatize = lemmatize
+        self.word_index = {word: i for i, word in enumerate(words)}
+        self.spelling_index = SpellingIndex(words)
+
+    def lemmas(self, text):
+        lemmas = [self.lemmatize(token) for token in self.tokenize(canonicalize(text))]
+        return [lemma if lemma in self.word_index else self.spelling_index.correct(lemma) for lemma in lemmas]
+
+    def encode(self, texts):
+        return training.bow_matrix([self.lemmas(text) for text in texts], self.words)
+
+
+def timed_predictions(predict_one, items):
+    """Predicted class per item, and mean single-message latency in milliseconds"""
+    predictions = []
+    started = time.perf_counter()
+    for item in items:
+        predictions.append(predict_one(item))
+    elapsed = time.perf_counter() - started
+    return predictions, round(elapsed / max(1, len(items)) * 1000, 3)
+
+
+def accuracy(predicted_tags, gold_tags):
+    correct = sum(p == g for p, g in zip(predicted_tags, gold_tags))
+    return round(correct / max(1, len(gold_tags)), 4)
+
+
+def distill(teacher, intents, tokenize, lemmatize, copies=DEFAULT_COPIES, temperature=DEFAULT_TEMPERATURE,
+            alpha=DEFAULT_ALPHA, epochs=training.DEFAULT_EPOCHS, batch_size=training.DEFAULT_BATCH_SIZE,
+            seed=training.DEFAULT_SEED):
+    """
+    Label augmented patterns with the teacher and train the BoW student on them.
+    Returns the student model, its vocabulary and classes, and a report with
+    teacher and student accuracy and latency on the same held-out set.
+    """
+    timer = training.StageTimer()
+    with timer.stage('augment'):
+        words, classes, _ = training.build_vocabulary(intents, tokenize, lemmatize)
+        pairs = augmented_patterns(intents, copies=copies, seed=seed)
+        texts, gold = [text for text, _ in pairs], [tag for _, tag in pairs]
+        held_out = evaluation_set(intents)
+        eval_texts, eval_gold = [text for text, _ in held_out], [tag for _, tag in held_out]
+
+    with timer.stage('teacher_labels'):
+        targets = distillation_targets(
+            teacher.logits(texts), teacher.classes, gold, classes, temperature=temperature, alpha=alpha
+        )
+
+    with timer.stage('student_train'):
+        encoder = BowEncoder(words, tokenize, lemmatize)
+        X = encoder.encode(texts)
+        student, history = training.train(X, targets, epochs=epochs, batch_size=batch_size, seed=seed)
+
+    with timer.stage('evaluate'):
+        teacher_pred, teacher_ms = timed_predictions(
+            lambda text: teacher.classes[int(teacher.logits([text])[0].argmax())], eval_texts
+        )
+        student_pred, student_ms = timed_predictions(
+            lambda text: classes[int(student(encoder.encode([text]), training=False).numpy()[0].argmax())],
+            eval_texts
+        )
+
+    teacher_known = [i for i, tag in enumerate(eval_gold) if tag in set(teacher.classes)]
+    report = {
+        'training_examples': len(texts),
+        'evaluation_examples': len(eval_texts),
+        'temperature': temperature,
+        'alpha': alpha,
+        'teacher': {
+            'accuracy': accuracy(teacher_pred, eval_gold),
+            'accuracy_on_known_intents': accuracy(
+                [teacher_pred[i] for i in teacher_known], [eval_gold[i] for i in teacher_known]
+            ),
+            'latency_ms': teacher_ms,
+        },
+        'student': {
+            'accuracy': accuracy(student_pred, eval_gold),
+            'accuracy_on_known_intents': accuracy(
+                [student_pred[i] for i in teacher_known], [eval_gold[i] for i in teacher_known]
+            ),
+            'latency_ms': student_ms,
+            'train_accuracy': round(float(history['accuracy'][-1]), 4),
+        },
+        'stage_seconds': timer.seconds,
+    }
+    return student, words, classes, report
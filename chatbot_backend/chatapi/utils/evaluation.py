@@ -0,0 +1,100 @@
+import gc
+import random
+import time
+
+import numpy as np
+
+from .memory import rss_bytes
+from .perturbations import add_filler, drop_word, misspell, paraphrase
+from .text_normalizer import canonicalize
+
+FALLBACK_INTENTS = {'fallback', 'unknown', 'error'}
+
+PERTURBATIONS = {
+    'clean': lambda text, rng: text,
+    'typo': misspell,
+    'paraphrase': paraphrase,
+    'extra_words': add_filler,
+    'dropped_word': drop_word,
+}
+
+
+def build_corpus(intents, perturbations=tuple(PERTURBATIONS), variants=2, seed=7):
+    """
+    Labelled queries: each training pattern under each perturbation.
+    Returns (text, tag, perturbation) triples; perturbations that leave a
+    pattern unchanged are skipped so every kind measures what it says.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for intent in intents.get('intents', []):
+        for pattern in intent.get('patterns', []):
+            base = canonicalize(pattern)
+            for kind in perturbations:
+                seen = set()
+                for _ in range(1 if kind == 'clean' else variants):
+                    text = canonicalize(PERTURBATIONS[kind](base, rng))
+                    if not text or text in seen or (kind != 'clean' and text == base):
+                        continue
+                    seen.add(text)
+                    corpus.append((text, intent['tag'], kind))
+    return corpus
+
+
+def evaluate_backend(name, factory, corpus):
+    """
+    Build a backend with `factory` and run it over the corpus in-process.
+    The factory returns a callable mapping a message to an intent tag.
+    Memory is the RSS growth from loading the backend and serving the corpus.
+    """
+    gc.collect()
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    classify = factory()
+    load_seconds = time.perf_counter() - started
+
+    latencies = np.empty(len(corpus))
+    predicted = []
+    run_started = time.perf_counter()
+    for i, (text, _, _) in enumerate(corpus):
+        started = time.perf_counter()
+        predicted.append(classify(text))
+        latencies[i] = time.perf_counter() - started
+    run_seconds = time.perf_counter() - run_started
+
+    correct = np.array([p == tag for p, (_, tag, _) in zip(predicted, corpus)])
+    kinds = sorted({kind for _, _, kind in corpus})
+    return {
+        'backend': name,
+        'queries': len(corpus),
+        'accuracy': round(float(correct.mean()), 4) if len(corpus) else 0.0,
+        'accuracy_by_perturbation': {
+            kind: round(float(correct[[k == kind for _, _, k in corpus]].mean()), 4) for kind in kinds
+        },
+        'fallback_rate': round(sum(p in FALLBACK_INTENTS for p in predicted) / max(1, len(corpus)), 4),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3) if len(corpus) else 0.0,
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 3) if len(corpus) else 0.0,
+        'throughput_qps': round(len(corpus) / run_seconds, 1) if run_seconds else 0.0,
+        'load_seconds': round(load_seconds, 3),
+        'memory_mb': round((rss_bytes() - rss_before) / (1024 * 1024), 1),
+    }
+
+
+def processor_backend(create):
+    """Factory for a chat processor; the response cache is disabled so every query is served"""
+    def factory():
+        processor = create()
+
+        def classify(text):
+            processor.clear_cache()
+            return processor.get_response(text).get('intent')
+        return classify
+    return factory
+
+
+def bert_backend(**teacher_kwargs):
+    def factory():
+        from .bert_teacher import BertTeacher
+        teacher = BertTeacher(**teacher_kwargs)
+        return lambda text: teacher.classes[int(teacher.logits([text])[0].argmax())]
+    return factory
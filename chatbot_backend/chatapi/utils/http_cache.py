@@ -0,0 +1,73 @@
+import hashlib
+import json
+import time
+
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .cache import CacheStore
+
+# Browser and CDN (Netlify/Vercel) cache lifetimes for read endpoints, shared by both API profiles, in seconds
+DOCS_MAX_AGE = 300
+DOCS_SHARED_MAX_AGE = 3600
+WEATHER_MAX_AGE = 60
+WEATHER_SHARED_MAX_AGE = 300
+WEATHER_STALE_WHILE_REVALIDATE = 600
+QUICK_ACTIONS_MAX_AGE = 300
+QUICK_ACTIONS_SHARED_MAX_AGE = 3600
+QUICK_ACTIONS_STALE_WHILE_REVALIDATE = 86400
+
+# Content hashes seen recently, however many URLs serve them
+LAST_CHANGED_ENTRIES = 1024
+
+_last_changed = CacheStore('last_changed', maxsize=LAST_CHANGED_ENTRIES)
+
+
+def content_etag(content, weak=False):
+    """Quoted ETag from a SHA-256 of the content's canonical JSON encoding"""
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    digest = hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def last_changed(etag):
+    """
+    Last-Modified derived from the content hash: the time this ETag was
+    first seen, so it only moves when the content does. Keyed by ETag
+    rather than URL, so query strings cannot grow the table; an ETag
+    evicted from it just starts again from now.
+    """
+    changed = _last_changed.get(etag)
+    if changed is None:
+        changed = int(time.time())
+        _last_changed[etag] = changed
+    return changed
+
+
+def conditional_json(request, payload, max_age, shared_max_age=None, stale_while_revalidate=None,
+                     etag_source=None, last_modified=None, response_class=JsonResponse, **response_kwargs):
+    """
+    Serve a JSON payload with ETag, Last-Modified and Cache-Control headers.
+    A matching If-None-Match (or a fresh If-Modified-Since) returns 304 without
+    rendering the body. Pass etag_source to hash only the stable part of a
+    payload that carries volatile fields; the ETag is then weak.
+    """
+    weak = etag_source is not None
+    etag = content_etag(payload if etag_source is None else etag_source, weak=weak)
+    if last_modified is None:
+        last_modified = last_changed(etag)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = response_class(payload, **response_kwargs)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    cache_control = {'public': True, 'max_age': max_age}
+    if shared_max_age is not None:
+        cache_control['s_maxage'] = shared_max_age
+    if stale_while_revalidate is not None:
+        cache_control['stale_while_revalidate'] = stale_while_revalidate
+    patch_cache_control(response, **cache_control)
+    return response
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from .text_normalizer import canonicalize, build_pattern_index
+
+logger = logging.getLogger(__name__)
+
+UTILS_DIR = Path(__file__).resolve().parent
+INTENTS_PATH = UTILS_DIR / 'baale_mountain.json'
+KB_PATH = UTILS_DIR / 'knowledge_base.pkl'
+
+# Bump when the artifact layout changes so stale artifacts are recompiled
+KB_FORMAT = 1
+
+
+class KnowledgeBaseError(ValueError):
+    """The intents file is malformed; `problems` lists every issue found"""
+
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} problem(s) in knowledge base: " + '; '.join(problems[:5]))
+        self.problems = problems
+
+
+def _normalize_response(response):
+    """Every response becomes {'parts': [...]}; bare parts and plain strings are wrapped"""
+    if isinstance(response, str):
+        return {'parts': [{'type': 'text', 'content': response}]}
+    if 'parts' in response:
+        return response
+    return {'parts': [response]}
+
+
+def validate(data):
+    """Problems that make the file unusable, and warnings for things that were fixed up"""
+    problems, warnings = [], []
+    if not isinstance(data, dict) or not isinstance(data.get('intents'), list):
+        return ["root must be an object with an 'intents' list"], warnings
+
+    seen_tags = set()
+    for position, intent in enumerate(data['intents']):
+        where = f"intent #{position}"
+        if not isinstance(intent, dict):
+            problems.append(f"{where} is not an object")
+            continue
+        tag = intent.get('tag')
+        if not isinstance(tag, str) or not tag.strip():
+            problems.append(f"{where} has no tag")
+        else:
+            where = f"intent '{tag}'"
+            if tag in seen_tags:
+                problems.append(f"{where} is defined more than once")
+            seen_tags.add(tag)
+
+        patterns = intent.get('patterns')
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            problems.append(f"{where} patterns must be a list of strings")
+        elif any(not canonicalize(p) for p in patterns):
+            problems.append(f"{where} has an empty pattern")
+
+        responses = intent.get('responses')
+        if not isinstance(responses, list) or not responses:
+            problems.append(f"{where} has no responses")
+            continue
+        for i, response in enumerate(responses):
+            if isinstance(response, str):
+                warnings.append(f"{where} response #{i} is a plain string, wrapped as a text part")
+                continue
+            if not isinstance(response, dict):
+                problems.append(f"{where} response #{i} is not an object")
+                continue
+            parts = response.get('parts', [response])
+            if not isinstance(parts, list) or not parts:
+                problems.append(f"{where} response #{i} has no parts")
+                continue
+            for j, part in enumerate(parts):
+                if not isinstance(part, dict) or 'type' not in part:
+                    problems.append(f"{where} response #{i} part #{j} has no type")
+    return problems, warnings
+
+
+def compile_kb(data, source_sha256=None):
+    """
+    Validate intents and compile them into the runtime artifact:
+    deduplicated patterns, responses normalized to part lists, the tag map
+    and the canonical pattern index, plus a version hash of the content.
+    Raises KnowledgeBaseError when the file is malformed.
+    """
+    problems, warnings = validate(data)
+    if problems:
+        raise KnowledgeBaseError(problems)
+
+    intents = []
+    for intent in data['intents']:
+        patterns, seen = [], set()
+        for pattern in intent['patterns']:
+            key = canonicalize(pattern)
+            if key in seen:
+                warnings.append(f"intent '{intent['tag']}' duplicate pattern '{pattern}' dropped")
+                continue
+            seen.add(key)
+            patterns.append(pattern)
+        intents.append({
+            **intent,
+            'patterns': patterns,
+            'responses': [_normalize_response(response) for response in intent['responses']],
+        })
+
+    compiled = {'intents': intents}
+    pattern_index = build_pattern_index(compiled)
+    for intent in intents:
+        for pattern in intent['patterns']:
+            owner = pattern_index[canonicalize(pattern)]
+            if owner != intent['tag']:
+                warnings.append(f"pattern '{pattern}' of '{intent['tag']}' already belongs to '{owner}'")
+
+    content = json.dumps(intents, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return {
+        'format': KB_FORMAT,
+        'version': hashlib.sha256(content.encode('utf-8')).hexdigest()[:16],
+        'source_sha256': source_sha256,
+        'intents': compiled,
+        'tags': {intent['tag']: i for i, intent in enumerate(intents)},
+        'pattern_index': pattern_index,
+        'warnings': warnings,
+    }
+
+
+def _parse(raw, name):
+    try:
+        return json.loads(raw.decode('utf-8-sig'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise KnowledgeBaseError([f"{name} is not valid JSON: {e}"])
+
+
+def read_source(path=INTENTS_PATH):
+    """Parsed intents file and the SHA-256 of its bytes"""
+    raw = Path(path).read_bytes()
+    return _parse(raw, Path(path).name), hashlib.sha256(raw).hexdigest()
+
+
+def write_kb(kb, path=KB_PATH):
+    """Pickle the artifact next to its destination and move it into place atomically"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix='.kb-', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(kb, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_knowledge_base(source=INTENTS_PATH, artifact=KB_PATH):
+    """
+    Compiled knowledge base for the processors. The precompiled artifact is
+    used when it was built from the current source file; otherwise the
+    source is compiled in-process (and a stale artifact is logged).
+    """
+    source_bytes = Path(source).read_bytes()
+    source_sha256 = hashlib.sha256(source_bytes).hexdigest()
+    try:
+        with open(artifact, 'rb') as f:
+            kb = pickle.load(f)
+        if kb.get('format') == KB_FORMAT and kb.get('source_sha256') == source_sha256:
+            return kb
+        logger.warning("Knowledge base artifact is stale, run compile_kb.py")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not read knowledge base artifact: {str(e)}")
+
+    return compile_kb(_parse(source_bytes, Path(source).name), source_sha256)
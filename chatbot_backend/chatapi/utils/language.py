@@ -0,0 +1,102 @@
+import json
+import logging
+from pathlib import Path
+
+from .text_normalizer import canonicalize
+
+logger = logging.getLogger(__name__)
+
+# Unicode blocks: Ethiopic, Ethiopic Supplement, Extended, Extended-A, Extended-B
+ETHIOPIC_RANGES = (
+    (0x1200, 0x137F),
+    (0x1380, 0x139F),
+    (0x2D80, 0x2DDF),
+    (0xAB00, 0xAB2F),
+    (0x1E7E0, 0x1E7FF),
+)
+
+# Basic Latin letters plus Latin-1 Supplement, Extended-A/B and Extended Additional
+LATIN_RANGES = (
+    (0x0041, 0x005A),
+    (0x0061, 0x007A),
+    (0x00C0, 0x024F),
+    (0x1E00, 0x1EFF),
+)
+
+PHRASES_PATH = Path(__file__).resolve().parent / 'amharic_phrases.json'
+
+
+def _in_ranges(code, ranges):
+    return any(start <= code <= end for start, end in ranges)
+
+
+def detect_language(text):
+    """
+    Classify a message by the script of its letters.
+    Returns 'am' for Ethiopic, 'en' for Latin (accents included) or no letters
+    at all (emoji, digits, punctuation), and 'und' for any other script.
+    """
+    if text.isascii():
+        return 'en'
+
+    ethiopic = latin = other = 0
+    for ch in text:
+        code = ord(ch)
+        if code < 0x80:
+            latin += ch.isalpha()
+        elif _in_ranges(code, ETHIOPIC_RANGES):
+            ethiopic += 1
+        elif _in_ranges(code, LATIN_RANGES):
+            latin += 1
+        elif ch.isalpha():
+            other += 1
+
+    if ethiopic and ethiopic >= latin:
+        return 'am'
+    if other > latin:
+        return 'und'
+    return 'en'
+
+
+class PhraseMemory:
+    """
+    Local Amharic-to-English memory for common tourist questions.
+    Whole phrases are looked up first; otherwise a message whose every word
+    is in the glossary is glossed word by word, which is all a bag-of-words
+    classifier needs. Anything else returns None and goes to the translator.
+    """
+
+    def __init__(self, path=PHRASES_PATH):
+        self.phrases = {}
+        self.words = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.phrases = {canonicalize(k): v for k, v in data.get('phrases', {}).items()}
+            self.words = {canonicalize(k): v for k, v in data.get('words', {}).items()}
+            logger.info(f"Phrase memory loaded: {len(self.phrases)} phrases, {len(self.words)} words")
+        except Exception as e:
+            logger.error(f"Failed to load phrase memory: {str(e)}")
+
+    def translate(self, text, count=True):
+        """English rendering of a canonical Amharic message, or None if unseen"""
+        english = self.phrases.get(text)
+        if english is None:
+            tokens = text.split()
+            if tokens and all(token in self.words for token in tokens):
+                english = ' '.join(self.words[token] for token in tokens)
+
+        if count:
+            if english is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return english
+
+    def stats(self):
+        return {
+            'phrase_memory_hits': self.hits,
+            'phrase_memory_misses': self.misses,
+        }
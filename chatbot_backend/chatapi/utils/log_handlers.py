@@ -0,0 +1,163 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULTS = {
+    'LOG_SLOW_REQUEST_MS': 500,
+}
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'sample'}
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, `extra` fields and traceback"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str, separators=(',', ':'))
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: the queue may be full when the handler stops
+        self.queue.put(self._sentinel)
+
+
+class AsyncHandler(QueueHandler):
+    """
+    Hands records to a background listener that writes them to `stream`, so
+    a slow stdout never blocks the request thread. The queue is bounded;
+    when it is full records are dropped and counted rather than waited for.
+    Formatting happens on the listener thread.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = _Listener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        self.dropped = 0
+        self._stopped = False
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        # dictConfig's `formatter` applies to the output, not to the queue
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Only merge the arguments; the listener thread does the formatting
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Write what is queued and stop the listener"""
+        if not self._stopped:
+            self._stopped = True
+            self.listener.stop()
+
+    def stats(self):
+        return {'log_queued': self.queue.qsize(), 'log_dropped': self.dropped}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thins routine per-request records: those logged with extra={'sample': True}
+    below WARNING pass with probability `rate` and at most `max_per_second`
+    per second. Errors, warnings (slow requests among them) and unmarked
+    records always pass. Passed records carry `sample_rate` for reweighting.
+    """
+
+    def __init__(self, rate=1.0, max_per_second=None):
+        super().__init__()
+        self.rate = rate
+        self.max_per_second = max_per_second
+        self._second = 0
+        self._passed_this_second = 0
+        self._lock = threading.Lock()
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not getattr(record, 'sample', False):
+            return True
+        if self.rate < 1.0 and random.random() >= self.rate:
+            self.sampled_out += 1
+            return False
+        if self.max_per_second is not None:
+            second = int(time.monotonic())
+            with self._lock:
+                if second != self._second:
+                    self._second, self._passed_this_second = second, 0
+                if self._passed_this_second >= self.max_per_second:
+                    self.rate_limited += 1
+                    return False
+                self._passed_this_second += 1
+        record.sample_rate = self.rate
+        return True
+
+    def stats(self):
+        return {'log_sampled_out': self.sampled_out, 'log_rate_limited': self.rate_limited}
+
+
+def log_chat_request(logger, message, response, trace, started, lane=None, transport='rest', tenant=None):
+    """
+    One record per chat request. Requests slower than LOG_SLOW_REQUEST_MS are
+    logged in full at WARNING (message text and stage timings included); the
+    rest as a sampled INFO summary.
+    """
+    latency_ms = round((time.perf_counter() - started) * 1000, 3)
+    fields = {
+        'event': 'chat_request',
+        'transport': transport,
+        'tenant': tenant,
+        'latency_ms': latency_ms,
+        'intent': response.get('intent') if response else None,
+        'tier': trace.tier,
+        'lane': lane,
+    }
+    if latency_ms >= _setting('LOG_SLOW_REQUEST_MS'):
+        logger.warning("Slow chat request", extra={**fields, 'chat_message': message[:200], 'stages': trace.stages})
+    else:
+        logger.info("Chat request served", extra={**fields, 'sample': True})
+
+
+def logging_stats(name='chatapi'):
+    """Queue and sampling counters of the async handlers on a logger"""
+    stats = {}
+    for handler in logging.getLogger(name).handlers:
+        if isinstance(handler, AsyncHandler):
+            stats.update(handler.stats())
+            for log_filter in handler.filters:
+                if isinstance(log_filter, SamplingFilter):
+                    stats.update(log_filter.stats())
+    return stats
@@ -0,0 +1,284 @@
+import logging
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import FunctionType, ModuleType
+
+import numpy as np
+
+from .cache import CacheStore
+
+logger = logging.getLogger(__name__)
+
+# Processor attributes sized as loaded data, when present
+DATA_ATTRIBUTES = (
+    'kb', 'intents_by_tag', 'canonical_patterns', 'words', 'word_index', 'vocabulary',
+    'spelling_index', 'phrase_memory', 'time_based_patterns',
+)
+
+_components = OrderedDict()
+_components_lock = threading.Lock()
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@contextmanager
+def track_component(name):
+    """
+    Record the RSS growth and load time of the enclosed block under `name`.
+    Loads run once at startup, so the deltas attribute the process footprint
+    to the library, model or data that caused it.
+    """
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        delta = rss_bytes() - rss_before
+        with _components_lock:
+            _components[name] = {
+                'rss_delta_bytes': delta,
+                'load_seconds': round(time.perf_counter() - started, 4),
+            }
+        logger.info(f"Loaded {name}: {delta / (1024 * 1024):.1f} MB RSS")
+
+
+def load_shared(name, loader):
+    """
+    The process-wide instance of a tenant-independent component (spaCy
+    pipeline, lemmatizer, phrase memory), loaded once under track_component.
+    Every processor gets the same object, so another tenant does not pay
+    for it again.
+    """
+    with _shared_lock:
+        if name not in _shared:
+            with track_component(name):
+                _shared[name] = loader()
+        return _shared[name]
+
+
+def shared_components():
+    with _shared_lock:
+        return dict(_shared)
+
+
+def component_loads():
+    with _components_lock:
+        return {name: dict(entry) for name, entry in _components.items()}
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Bytes held by an object and everything it references: containers,
+    numpy buffers and plain instances. Objects already in `seen` count once,
+    so a shared seen set sizes several structures without double counting.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(current))
+        if isinstance(current, np.ndarray):
+            total += sys.getsizeof(current) + (current.nbytes if current.base is None else 0)
+            continue
+        total += sys.getsizeof(current)
+        if isinstance(current, CacheStore):
+            stack.append(current._data)
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, '__dict__') and not isinstance(current, (str, bytes)):
+            stack.append(vars(current))
+    return total
+
+
+def cache_sizes(processor):
+    """Entries and bytes of each cache a processor holds"""
+    sizes = {}
+    for name, value in vars(processor).items():
+        if isinstance(value, CacheStore) or (name.endswith('_cache') and isinstance(value, dict)):
+            sizes[name] = {'entries': len(value), 'bytes': deep_sizeof(value)}
+    return sizes
+
+
+def data_sizes(processor):
+    """Bytes of the loaded intents, indexes and vocabularies; shared objects count once"""
+    seen = set()
+    return {
+        name: deep_sizeof(getattr(processor, name), seen)
+        for name in DATA_ATTRIBUTES if getattr(processor, name, None) is not None
+    }
+
+
+class AllocationTracker:
+    """
+    Named tracemalloc snapshots and the differences between them.
+    Tracing slows allocation down noticeably, so it is only on between
+    start() and stop(); only the newest `max_snapshots` snapshots are kept.
+    """
+
+    def __init__(self, frames=1, max_snapshots=8):
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.tracing:
+            tracemalloc.start(self.frames)
+            logger.info(f"tracemalloc started with {self.frames} frame(s)")
+
+    def stop(self):
+        with self._lock:
+            self._snapshots.clear()
+        if self.tracing:
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+    def snapshot(self, label=None):
+        """Take a snapshot and keep it under `label`; returns the label"""
+        if not self.tracing:
+            raise RuntimeError("tracemalloc is not running; start tracking first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        with self._lock:
+            label = label or f'snapshot-{len(self._snapshots) + 1}'
+            self._snapshots.pop(label, None)
+            self._snapshots[label] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return label
+
+    def diff(self, first, second=None, limit=20, group_by='lineno'):
+        """
+        Top allocation changes from snapshot `first` to `second` (a fresh
+        snapshot when omitted), largest growth first.
+        """
+        with self._lock:
+            if first not in self._snapshots or (second is not None and second not in self._snapshots):
+                raise KeyError(f"Unknown snapshot: {second if first in self._snapshots else first}")
+            old = self._snapshots[first]
+            new = self._snapshots[second] if second is not None else None
+        if new is None:
+            new = self._snapshots[self.snapshot()]
+
+        stats = new.compare_to(old, group_by)
+        return {
+            'from': first,
+            'to': second,
+            'size_diff_bytes': sum(stat.size_diff for stat in stats),
+            'top': [
+                {
+                    'location': str(stat.traceback[0]) if stat.traceback else '?',
+                    'size_diff_bytes': stat.size_diff,
+                    'count_diff': stat.count_diff,
+                    'size_bytes': stat.size,
+                    'count': stat.count,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def stats(self):
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        with self._lock:
+            labels = list(self._snapshots)
+        return {
+            'tracing': self.tracing,
+            'snapshots': labels,
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+        }
+
+
+def memory_report(processor=None):
+    """Process RSS, per-component load deltas, and cache and data sizes of the processor"""
+    report = {
+        'rss_bytes': rss_bytes(),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'components': component_loads(),
+        'tracemalloc': get_allocation_tracker().stats(),
+    }
+    if processor is not None:
+        report['caches'] = cache_sizes(processor)
+        report['data'] = data_sizes(processor)
+    return report
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_allocation_tracker():
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = AllocationTracker()
+        return _tracker
+
+
+def reset_allocation_tracker():
+    global _tracker
+    with _tracker_lock:
+        if _tracker is not None:
+            _tracker.stop()
+        _tracker = None
+
+
+def run_admin_action(params):
+    """
+    Execute a memory admin action: start, snapshot, diff or stop.
+    Raises ValueError for a bad request, KeyError for an unknown snapshot
+    and RuntimeError when tracing is not running.
+    """
+    tracker = get_allocation_tracker()
+    action = params.get('action')
+    if action == 'start':
+        tracker.start()
+        return {'started': True, **tracker.stats()}
+    if action == 'snapshot':
+        return {'snapshot': tracker.snapshot(params.get('label')), **tracker.stats()}
+    if action == 'diff':
+        if not params.get('from'):
+            raise ValueError("diff needs a 'from' snapshot label")
+        try:
+            limit = int(params.get('limit', 20))
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        return tracker.diff(params['from'], params.get('to'), limit=limit,
+                            group_by=params.get('group_by', 'lineno'))
+    if action == 'stop':
+        tracker.stop()
+        return {'stopped': True, **tracker.stats()}
+    raise ValueError("action must be one of start, snapshot, diff, stop")
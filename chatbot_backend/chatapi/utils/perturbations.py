@@ -0,0 +1,84 @@
+import random
+import string
+
+TYPO_OPERATIONS = ('delete', 'insert', 'substitute', 'transpose')
+
+
+def introduce_typo(word, rng=random):
+    """Apply one random keyboard-style edit (delete, insert, substitute, transpose)"""
+    if len(word) < 3:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    operation = rng.choice(TYPO_OPERATIONS)
+    if operation == 'delete':
+        return word[:i] + word[i + 1:]
+    if operation == 'insert':
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if operation == 'substitute':
+        return word[:i] + rng.choice(string.ascii_lowercase.replace(word[i], '')) + word[i + 1:]
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+
+
+def misspell(text, rng=random, min_length=5):
+    """Misspell one of the longer words of a message, leaving the rest intact"""
+    words = text.split()
+    candidates = [i for i, word in enumerate(words) if len(word) >= min_length and word.isalpha()]
+    if not candidates:
+        return text
+    i = rng.choice(candidates)
+    words[i] = introduce_typo(words[i], rng)
+    return ' '.join(words)
+
+
+# Rewrites visitors commonly use for the same question
+QUESTION_REWRITES = [
+    ('tell me about', 'what do you know about'),
+    ('what is', "what's"),
+    ('how much does it cost', 'what is the price'),
+    ('how do i get to', 'how can i reach'),
+    ('what are', 'which are'),
+    ('can you tell me', 'do you know'),
+    ('is it safe', 'is it dangerous'),
+    ('where can i stay', 'where to sleep'),
+]
+PREFIXES = ['', '', 'please ', 'hi ', 'i want to know ', 'could you tell me ']
+SUFFIXES = ['', '', ' please', ' thanks', ' for my trip']
+
+
+def paraphrase(text, rng=random):
+    """Rule-based paraphrase: swap a common question frame and add polite filler"""
+    text = text.lower()
+    rewrites = [(a, b) for a, b in QUESTION_REWRITES if a in text] + [(b, a) for a, b in QUESTION_REWRITES if b in text]
+    if rewrites:
+        source, target = rng.choice(rewrites)
+        text = text.replace(source, target, 1)
+    return f"{rng.choice(PREFIXES)}{text}{rng.choice(SUFFIXES)}"
+
+
+def drop_word(text, rng=random):
+    """Remove one word from messages long enough to survive it"""
+    words = text.split()
+    if len(words) < 4:
+        return text
+    del words[rng.randrange(len(words))]
+    return ' '.join(words)
+
+
+def augment(text, rng=random):
+    """One random variant: paraphrase, typo, dropped word, or a combination"""
+    variant = paraphrase(text, rng) if rng.random() < 0.6 else text
+    if rng.random() < 0.5:
+        variant = misspell(variant, rng)
+    if rng.random() < 0.3:
+        variant = drop_word(variant, rng)
+    return variant
+
+
+FILLER_WORDS = ['um', 'actually', 'really', 'so', 'hey', 'quick question', 'exactly', 'the']
+
+
+def add_filler(text, rng=random):
+    """Insert a conversational filler word at a random position"""
+    words = text.split()
+    words.insert(rng.randrange(len(words) + 1), rng.choice(FILLER_WORDS))
+    return ' '.join(words)
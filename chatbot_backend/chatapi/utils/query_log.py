@@ -0,0 +1,244 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from .text_normalizer import canonicalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'QUERY_LOG_PATH': '',
+    'QUERY_LOG_MAX_BYTES': 10 * 1024 * 1024,
+    'QUERY_LOG_BACKUPS': 5,
+    'QUERY_LOG_QUEUE_SIZE': 10000,
+    'QUERY_LOG_BATCH_SIZE': 256,
+}
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class QueryTrace:
+    """
+    How one request was answered: the cache tier that produced the response
+    and milliseconds spent in each pipeline stage. With `use_cache=False`
+    the processor neither reads nor fills its caches for the request; a
+    `synthetic` request (warmup) is left out of the serving counters.
+    """
+
+    def __init__(self, use_cache=True, synthetic=False):
+        self.tier = None
+        self.stages = {}
+        self.use_cache = use_cache
+        self.synthetic = synthetic
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - started) * 1000, 3)
+
+
+class _NullTrace:
+    """Stand-in when nobody asked for a trace; costs one attribute store per tier"""
+
+    tier = None
+    use_cache = True
+    synthetic = False
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+
+NULL_TRACE = _NullTrace()
+
+
+def process_log_path(path, pid=None):
+    """
+    This process's own file for a configured log path: query_log.jsonl
+    becomes query_log.<pid>.jsonl. Each server worker writes and rotates
+    its own file; renaming a file another process still appends to would
+    lose its lines.
+    """
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{pid or os.getpid()}{path.suffix}')
+
+
+def query_log_files(path):
+    """Every file of a configured log path: the path itself, each process's file and their rotated backups"""
+    path = Path(path)
+    candidates = {path} | {candidate for candidate in path.parent.glob(f'{path.stem}.*') if path.suffix in candidate.name}
+    return sorted(candidate for candidate in candidates if candidate.is_file())
+
+
+class QueryLog:
+    """
+    Append-only JSON-lines log written by a background thread.
+    record() never blocks the request: entries go on a bounded queue and
+    are dropped (and counted) when it is full. The writer drains the queue
+    in batches, writes each batch with one call and rotates the file to
+    path.1 ... path.N once it reaches max_bytes. Only one process may write
+    a given path (see process_log_path).
+    """
+
+    def __init__(self, path, max_bytes=DEFAULTS['QUERY_LOG_MAX_BYTES'], backups=DEFAULTS['QUERY_LOG_BACKUPS'],
+                 queue_size=DEFAULTS['QUERY_LOG_QUEUE_SIZE'], batch_size=DEFAULTS['QUERY_LOG_BATCH_SIZE']):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._thread = None
+        self._file = None
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.write_failures = 0
+
+    def start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='query-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, entry):
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5):
+        """Write what is queued and stop the writer"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                if self._stopped.is_set():
+                    return
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        data = ''.join(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n' for entry in batch)
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(batch)
+            self.batches += 1
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            self.write_failures += 1
+            logger.error(f"Query log write failed, {len(batch)} records lost: {str(e)}")
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f'{self.path.name}.{i}')
+            if older.exists():
+                os.replace(older, self.path.with_name(f'{self.path.name}.{i + 1}'))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f'{self.path.name}.1'))
+        else:
+            self.path.unlink()
+        self.rotations += 1
+
+    def stats(self):
+        return {
+            'query_log_written': self.written,
+            'query_log_dropped': self.dropped,
+            'query_log_queued': self._queue.qsize(),
+            'query_log_batches': self.batches,
+            'query_log_rotations': self.rotations,
+            'query_log_write_failures': self.write_failures,
+        }
+
+
+def query_entry(message, response=None, trace=None, latency=None, lane=None, status=200):
+    """One log record: normalized text, outcome, cache tier and stage timings"""
+    return {
+        'ts': round(time.time(), 3),
+        'message': message,
+        'intent': response.get('intent') if response else None,
+        'confidence': response.get('confidence') if response else None,
+        'tier': trace.tier if trace else None,
+        'lane': lane,
+        'status': status,
+        'latency_ms': round(latency * 1000, 3) if latency is not None else None,
+        'stages': trace.stages if trace else {},
+    }
+
+
+def log_query(message, response=None, trace=None, started=None, lane=None, status=200):
+    """Queue a record for a chat request on the process-wide log, if it is enabled"""
+    log = get_query_log()
+    if log is not None:
+        latency = time.perf_counter() - started if started is not None else None
+        log.record(query_entry(canonicalize(message), response, trace, latency, lane, status))
+
+
+_query_log = None
+_query_log_lock = threading.Lock()
+
+
+def get_query_log():
+    """
+    Process-wide query log, started on first use, writing this process's
+    file for QUERY_LOG_PATH; None when QUERY_LOG_PATH is empty.
+    """
+    global _query_log
+    if _query_log is not None:
+        return _query_log
+    with _query_log_lock:
+        if _query_log is None and _setting('QUERY_LOG_PATH'):
+            _query_log = QueryLog(
+                process_log_path(_setting('QUERY_LOG_PATH')),
+                max_bytes=_setting('QUERY_LOG_MAX_BYTES'),
+                backups=_setting('QUERY_LOG_BACKUPS'),
+                queue_size=_setting('QUERY_LOG_QUEUE_SIZE'),
+                batch_size=_setting('QUERY_LOG_BATCH_SIZE'),
+            )
+            _query_log.start()
+        return _query_log
+
+
+def reset_query_log():
+    global _query_log
+    with _query_log_lock:
+        if _query_log is not None:
+            _query_log.close()
+        _query_log = None
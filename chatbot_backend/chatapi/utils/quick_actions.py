@@ -0,0 +1,227 @@
+from .http_cache import content_etag
+
+# Canned answers for the quick-action buttons, shared by every processor
+# and served to the frontend as one bundle. A message containing any of an
+# action's phrases (after normalization) gets its response. `query` is the
+# text the frontend button sends.
+QUICK_ACTIONS = [
+    {
+        'id': 'park_info',
+        'label': 'Park Information',
+        'query': "Tell me about Bale Mountains National Park",
+        'phrases': [
+            "tell me about bale mountains national park",
+            "tell me about bale mountains",
+            "tell me about baale mountain",
+            "park information",
+            "about the park"
+        ],
+        'response': {
+            'parts': [{
+                'type': 'header',
+                'content': 'Bale Mountains National Park Information'
+            }, {
+                'type': 'text',
+                'content': 'Bale Mountains National Park is known for its diverse ecosystems, rare wildlife like the Ethiopian wolf, and stunning landscapes such as the Sanetti Plateau and Harenna Forest. It\'s perfect for wildlife enthusiasts and nature lovers.'
+            }],
+            'confidence': 0.95,
+            'intent': 'place_info'
+        },
+    },
+    {
+        'id': 'getting_there',
+        'label': 'How to Get There',
+        'query': "How do I get to Bale Mountains?",
+        'phrases': [
+            "how do i get to bale mountains",
+            "how do i get to baale mountain",
+            "how to get there",
+            "directions to bale mountains",
+            "how to reach the park"
+        ],
+        'response': {
+            'parts': [{
+                'type': 'header',
+                'content': 'How to Get to Bale Mountains National Park'
+            }, {
+                'type': 'text',
+                'content': 'There are three main routes to reach Bale Mountains National Park:'
+            }, {
+                'type': 'list',
+                'content': [
+                    'Route 1: Via Addis Ababa - Shashemene - Goba (460km, 6-8 hours)',
+                    'Route 2: Via Addis Ababa - Dodola - Adaba (380km, 5-7 hours)',
+                    'Route 3: Via Addis Ababa - Ziway - Shashemene (450km, 6-7 hours)'
+                ]
+            }, {
+                'type': 'text',
+                'content': '💡 Tip: Goba town serves as the main gateway to the park with accommodation and supplies available.'
+            }],
+            'confidence': 0.95,
+            'intent': 'getting_there'
+        },
+    },
+    {
+        'id': 'accommodation',
+        'label': 'Accommodations',
+        'query': "What are the accommodation options?",
+        'phrases': [
+            "accommodation options",
+            "where can i stay",
+            "lodging",
+            "hotels",
+            "places to stay"
+        ],
+        'response': {
+            'parts': [{
+                'type': 'header',
+                'content': 'Accommodation Options'
+            }, {
+                'type': 'text',
+                'content': 'There are several accommodation options available for visitors:'
+            }, {
+                'type': 'list',
+                'content': [
+                    'Bale Mountain Lodge - Luxury eco-lodge with stunning views',
+                    'Goba Hotels - Various budget to mid-range options in Goba town',
+                    'Camping - Designated camping areas within the park',
+                    'Community Lodges - Local community-run accommodations'
+                ]
+            }],
+            'confidence': 0.95,
+            'intent': 'lodging'
+        },
+    },
+    {
+        'id': 'activities',
+        'label': 'Activities',
+        'query': "What activities can I do in the park?",
+        'phrases': [
+            "what activities can i do",
+            "activities in the park",
+            "what can i do",
+            "park activities"
+        ],
+        'response': {
+            'parts': [{
+                'type': 'header',
+                'content': 'Activities in Bale Mountains National Park'
+            }, {
+                'type': 'text',
+                'content': 'The park offers a wide range of activities for nature enthusiasts:'
+            }, {
+                'type': 'list',
+                'content': [
+                    'Wildlife viewing (Ethiopian wolves, mountain nyala, etc.)',
+                    'Bird watching (over 280 species recorded)',
+                    'Hiking and trekking on various trails',
+                    'Photography of landscapes and wildlife',
+                    'Cultural visits to local communities',
+                    'Horseback riding',
+                    'Camping under the stars'
+                ]
+            }],
+            'confidence': 0.95,
+            'intent': 'activities_within_park'
+        },
+    },
+    {
+        'id': 'best_time',
+        'label': 'Best Time to Visit',
+        'query': "When is the best time to visit?",
+        'phrases': [
+            "when is the best time to visit",
+            "best time to go",
+            "when to visit",
+            "best season"
+        ],
+        'response': {
+            'parts': [{
+                'type': 'header',
+                'content': 'Best Time to Visit Bale Mountains'
+            }, {
+                'type': 'text',
+                'content': 'The best time to visit depends on your preferences:'
+            }, {
+                'type': 'section',
+                'title': 'Dry Season (October - March)',
+                'content': [{
+                    'type': 'list',
+                    'content': [
+                        'Best for wildlife viewing',
+                        'Clear skies and good visibility',
+                        'Easier road access',
+                        'Ideal for photography'
+                    ]
+                }]
+            }, {
+                'type': 'section',
+                'title': 'Wet Season (April - September)',
+                'content': [{
+                    'type': 'list',
+                    'content': [
+                        'Lush green landscapes',
+                        'Wildflowers in bloom',
+                        'Bird migration season',
+                        'Some roads may be challenging'
+                    ]
+                }]
+            }],
+            'confidence': 0.95,
+            'intent': 'when_to_go'
+        },
+    },
+    {
+        'id': 'park_fees',
+        'label': 'Park Fees',
+        'query': "What are the park entrance fees?",
+        'phrases': [
+            "park fees",
+            "entrance fees",
+            "how much does it cost",
+            "park entrance fee"
+        ],
+        'response': {
+            'parts': [{
+                'type': 'header',
+                'content': 'Bale Mountains National Park Fees'
+            }, {
+                'type': 'text',
+                'content': 'Park entrance fees vary by visitor type:'
+            }, {
+                'type': 'table',
+                'columns': ['Visitor Type', 'Daily Fee'],
+                'rows': [
+                    ['Foreign Tourist', '200 ETB'],
+                    ['Domestic Tourist', '50 ETB'],
+                    ['Student (with ID)', '25 ETB'],
+                    ['Local Community', '10 ETB']
+                ]
+            }, {
+                'type': 'text',
+                'content': '💡 Additional fees may apply for camping, guides, and special activities.'
+            }],
+            'confidence': 0.95,
+            'intent': 'park_fees'
+        },
+    },
+]
+
+
+def match_quick_action(cleaned_input):
+    """Response of the first quick action whose phrase occurs in the normalized message, or None"""
+    for action in QUICK_ACTIONS:
+        if any(phrase in cleaned_input for phrase in action['phrases']):
+            return action['response']
+    return None
+
+
+def _bundle():
+    actions = [
+        {key: action[key] for key in ('id', 'label', 'query', 'response')} for action in QUICK_ACTIONS
+    ]
+    return {'version': content_etag(actions).strip('"')[:16], 'actions': actions}
+
+
+# Versioned payload for /api/quick-actions/; changes only when an answer does
+QUICK_ACTIONS_BUNDLE = _bundle()
@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CHAT_BACKEND': None,
+    'CHAT_BACKEND_FALLBACK': 'simple',
+}
+
+# What every backend offers the views, cache snapshots and benchmarks
+REQUIRED_METHODS = ('get_response', 'admission_lane', 'get_cache_stats', 'clear_cache', 'persistent_caches')
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class Backend:
+    def __init__(self, name, factory, description):
+        self.name = name
+        self.factory = factory
+        self.description = description
+
+
+_backends = {}
+
+
+def register(name, description=''):
+    """
+    Register a processor factory under `name`. Factories import their own
+    dependencies, so an unused backend's ML stack is never loaded, and take
+    keyword options selecting the data to serve (model_dir, intents_path,
+    kb_path, quick_actions; see tenants.py); without them they serve Bale
+    Mountains.
+    """
+    def decorator(factory):
+        _backends[name] = Backend(name, factory, description)
+        return factory
+    return decorator
+
+
+@register('simple', 'Pattern matching only; no ML dependencies')
+def _simple(model_dir=None, **options):
+    from .simple_processor import SimpleProcessor
+    return SimpleProcessor(**options)
+
+
+@register('keras', 'spaCy pipeline with the BoW MLP intent model')
+def _keras(**options):
+    from .chat_processor import ChatProcessor
+    return ChatProcessor(**options)
+
+
+@register('cascade', 'Rules, keywords, BoW MLP and optional BERT, cheapest confident tier wins')
+def _cascade(**options):
+    from .cascade import CascadeProcessor
+    return CascadeProcessor(**options)
+
+
+@register('bert', 'Rules, then the fine-tuned BERT classifier for everything else')
+def _bert(**options):
+    from .cascade import BertTier, CascadeProcessor, _setting as cascade_setting
+    return CascadeProcessor(tiers=[BertTier(cascade_setting('CASCADE_HEAVY_THRESHOLD'))], **options)
+
+
+def available_backends():
+    return {name: backend.description for name, backend in _backends.items()}
+
+
+def configured_backend():
+    """CHAT_BACKEND, or the backend implied by the older RENDER / USE_*_PROCESSOR variables"""
+    name = _setting('CHAT_BACKEND')
+    if name:
+        return name
+    if os.environ.get('USE_CASCADE_PROCESSOR', 'false').lower() == 'true':
+        return 'cascade'
+    if os.environ.get('RENDER') or os.environ.get('USE_SIMPLE_PROCESSOR', 'false').lower() == 'true':
+        return 'simple'
+    return 'keras'
+
+
+def create(name, **options):
+    """A new, uncached instance of a backend, checked against the common interface"""
+    if name not in _backends:
+        raise KeyError(f"Unknown backend '{name}'; available: {', '.join(_backends)}")
+    processor = _backends[name].factory(**options)
+    missing = [method for method in REQUIRED_METHODS if not callable(getattr(processor, method, None))]
+    if missing:
+        raise TypeError(f"Backend '{name}' lacks {', '.join(missing)}")
+    return processor
+
+
+class ProcessorRegistry:
+    """
+    Backend instances built on first use and then shared. Several backends
+    can be loaded side by side; a backend that failed to load is not
+    retried on every request.
+    """
+
+    def __init__(self):
+        self._instances = {}
+        self._errors = {}
+        self._load_seconds = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """The shared instance of a backend, or None if it cannot be loaded"""
+        processor = self._instances.get(name)
+        if processor is not None or name in self._errors:
+            return processor
+        with self._lock:
+            if name in self._instances or name in self._errors:
+                return self._instances.get(name)
+            started = time.perf_counter()
+            try:
+                processor = create(name)
+            except Exception as e:
+                logger.error(f"Failed to load backend '{name}': {str(e)}")
+                self._errors[name] = str(e)
+                return None
+            self._load_seconds[name] = round(time.perf_counter() - started, 3)
+            self._instances[name] = processor
+            logger.info(f"Backend '{name}' loaded in {self._load_seconds[name]}s")
+            return processor
+
+    def loaded(self):
+        return dict(self._instances)
+
+    def stats(self):
+        return {
+            'loaded': dict(self._load_seconds),
+            'failed': dict(self._errors),
+        }
+
+
+_registry = ProcessorRegistry()
+_primary = None
+_primary_lock = threading.Lock()
+
+
+def get_processor(name=None):
+    """
+    The processor for `name`, or the configured backend when omitted. If the
+    configured backend cannot load (say TensorFlow is missing) the fallback
+    backend serves instead, and its caches are warm-started from the last
+    snapshot on first use.
+    """
+    if name is not None:
+        return _registry.get(name)
+    global _primary
+    if _primary is not None:
+        return _primary[1]
+    with _primary_lock:
+        if _primary is None:
+            name = configured_backend()
+            processor = _registry.get(name)
+            fallback = _setting('CHAT_BACKEND_FALLBACK')
+            if processor is None and fallback and fallback != name:
+                logger.warning(f"Falling back to backend '{fallback}'")
+                name, processor = fallback, _registry.get(fallback)
+            if processor is None:
+                return None
+            from .cache_snapshot import start_cache_persistence
+            _primary = (name, processor, start_cache_persistence(processor))
+        return _primary[1]
+
+
+def active_backend():
+    """Name of the backend serving chat traffic, None until it has loaded"""
+    return _primary[0] if _primary else None
+
+
+def snapshot_writer():
+    return _primary[2] if _primary else None
+
+
+def registry_stats():
+    return {
+        'active': active_backend(),
+        'configured': configured_backend(),
+        **_registry.stats(),
+    }
+
+
+def reset_processors():
+    """Forget every loaded backend (tests and reloads)"""
+    global _registry, _primary
+    with _primary_lock:
+        if _primary is not None and _primary[2] is not None:
+            _primary[2].stop()
+        _registry = ProcessorRegistry()
+        _primary = None
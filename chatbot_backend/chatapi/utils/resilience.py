@@ -0,0 +1,220 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'OUTBOUND_TIMEOUT': 2.0,
+    'CIRCUIT_BREAKER_FAILURE_THRESHOLD': 5,
+    'CIRCUIT_BREAKER_RESET_TIMEOUT': 30.0,
+    'CIRCUIT_BREAKER_HALF_OPEN_CALLS': 1,
+}
+
+_deadline = contextvars.ContextVar('request_deadline', default=None)
+
+TIMEOUT_ERRORS = (TimeoutError, requests.Timeout)
+
+
+class DeadlineExceeded(Exception):
+    """The current request has no time budget left for an outbound call"""
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        # Usable outside a configured Django project (scripts, benchmarks)
+        return DEFAULTS[name]
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Give everything executed in this context at most `seconds` of wall-clock time"""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """Seconds left before the current deadline, or None outside a deadline scope"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def time_budget(timeout):
+    """Timeout for an outbound call: its own limit capped by the request deadline"""
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline already passed")
+    return min(timeout, remaining)
+
+
+class CircuitBreaker:
+    """
+    Per-dependency circuit breaker.
+    CLOSED lets calls through and counts consecutive failures; after
+    failure_threshold it goes OPEN and rejects calls outright. Once
+    reset_timeout has elapsed it goes HALF_OPEN and lets a limited number
+    of probe calls through: a success closes it again, a failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, half_open_calls=1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.rejections = 0
+        self.fallbacks = 0
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejections += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes_in_flight = 0
+                logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+
+            if self.state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_calls:
+                    self.rejections += 1
+                    return False
+                self._probes_in_flight += 1
+
+            self.calls += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                logger.info(f"Circuit '{self.name}' closed after successful probe")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def record_abandoned(self):
+        """The call ran out of the caller's time, which says nothing about the dependency"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {self.consecutive_failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probes_in_flight = 0
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 2)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in_seconds': retry_in,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejections': self.rejections,
+                'fallbacks': self.fallbacks,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Shared breaker for a dependency, created from settings on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=_setting('CIRCUIT_BREAKER_FAILURE_THRESHOLD'),
+                reset_timeout=_setting('CIRCUIT_BREAKER_RESET_TIMEOUT'),
+                half_open_calls=_setting('CIRCUIT_BREAKER_HALF_OPEN_CALLS'),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def breaker_states():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def call_external(name, func, fallback, timeout=None):
+    """
+    Run an outbound call through the dependency's circuit breaker.
+    func receives the timeout it must honour (the dependency timeout capped by
+    the request deadline). Open circuits, exhausted deadlines and errors all
+    return fallback() instead of raising. A timeout on a budget the request
+    deadline cut short is not held against the dependency, so one slow
+    request cannot open the circuit for every client.
+    """
+    breaker = get_breaker(name)
+    timeout = timeout if timeout is not None else _setting('OUTBOUND_TIMEOUT')
+    try:
+        budget = time_budget(timeout)
+    except DeadlineExceeded:
+        breaker.record_fallback()
+        return fallback()
+
+    if not breaker.allow_request():
+        breaker.record_fallback()
+        return fallback()
+
+    try:
+        result = func(budget)
+    except Exception as e:
+        if isinstance(e, TIMEOUT_ERRORS) and budget < timeout:
+            logger.warning(f"Outbound call '{name}' ran out of request deadline after {budget:.2f}s")
+            breaker.record_abandoned()
+        else:
+            logger.error(f"Outbound call '{name}' failed: {str(e)}")
+            breaker.record_failure()
+        breaker.record_fallback()
+        return fallback()
+
+    breaker.record_success()
+    return result
@@ -1,105 +1,222 @@
-import json
 import random
 import logging
 import re
-from pathlib import Path
+
+from .admission import FAST, MODEL
+from .cache import CacheStore
+from .kb_compiler import INTENTS_PATH, KB_PATH, compile_kb, load_knowledge_base
+from .language import PhraseMemory, detect_language
+from .memory import load_shared, track_component
+from .query_log import NULL_TRACE
+from .quick_actions import match_quick_action
+from .singleflight import SingleFlight
+from .spelling import SpellingIndex
+from .text_normalizer import canonicalize
 
 logger = logging.getLogger(__name__)
 
+RESPONSE_CACHE_SIZE = 10000
+DEFAULT_PARK = 'Bale Mountains National Park'
+
+
+def park_replies(park):
+    """Replies that do not come from the knowledge base, worded for `park`"""
+    return {
+        'greeting': f"Hello! How can I help you with {park}?",
+        'fallback': (f"I'd be happy to help you learn about {park}! You can ask me about park information, "
+                     "how to get there, accommodations, activities, best times to visit, or park fees."),
+        'error': (f"I'm having trouble processing your request right now. Please try asking about {park} "
+                  "information, directions, or activities."),
+    }
+
+
 class SimpleProcessor:
     """
     Lightweight chat processor for deployment without heavy ML dependencies.
     Uses pattern matching instead of ML models for intent recognition.
+    Another park's knowledge base is served by passing its `intents_path`
+    (and compiled `kb_path`), its `replies` (see park_replies) for the
+    fallback and error answers; `quick_actions=False` turns off the Bale
+    Mountains quick-action answers for it.
     """
     
-    def __init__(self):
-        self.BASE_DIR = Path(__file__).resolve().parent.parent.parent
-        self.response_cache = {}
+    def __init__(self, intents_path=INTENTS_PATH, kb_path=KB_PATH, quick_actions=True, replies=None):
+        self.intents_path = intents_path
+        self.kb_path = kb_path
+        self.quick_actions = quick_actions
+        self.replies = {**park_replies(DEFAULT_PARK), **(replies or {})}
+        self.response_cache = CacheStore('response_cache', maxsize=RESPONSE_CACHE_SIZE)
+        self.inflight = SingleFlight('inflight')
+        self.exact_pattern_hits = 0
+        self.phrase_memory = load_shared('phrase_memory', PhraseMemory)
         
         try:
             self._load_intents()
             logger.info("SimpleProcessor initialized successfully")
         except Exception as e:
             logger.error(f"SimpleProcessor initialization failed: {str(e)}")
-            self.intents = {"intents": []}
+            self.kb = compile_kb({"intents": []})
+            self.intents = self.kb['intents']
+        with track_component('indexes'):
+            self._build_indexes()
     
     def _load_intents(self):
-        """Load intents from JSON file"""
+        """Load the compiled knowledge base (precompiled artifact or intents JSON)"""
         try:
-            intents_path = self.BASE_DIR / 'chatapi/utils/baale_mountain.json'
-            with open(intents_path, 'r', encoding='utf-8-sig') as f:
-                self.intents = json.load(f)
-            logger.info("Intents loaded successfully")
+            with track_component('knowledge_base'):
+                self.kb = load_knowledge_base(self.intents_path, self.kb_path)
+            self.intents = self.kb['intents']
+            logger.info(f"Knowledge base {self.kb['version']} loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load intents: {str(e)}")
             # Fallback intents
-            self.intents = {
+            self.kb = compile_kb({
                 "intents": [
                     {
                         "tag": "greeting",
                         "patterns": ["hello", "hi", "hey"],
-                        "responses": [{"type": "text", "content": "Hello! How can I help you with Bale Mountains?"}]
+                        "responses": [{"type": "text", "content": self.replies['greeting']}]
                     },
                     {
                         "tag": "fallback",
                         "patterns": [],
-                        "responses": [{"type": "text", "content": "I'd be happy to help you learn about Bale Mountains National Park!"}]
+                        "responses": [{"type": "text", "content": self.replies['fallback']}]
                     }
                 ]
-            }
+            })
+            self.intents = self.kb['intents']
     
-    def get_response(self, text, threshold=0.7):
+    def _build_indexes(self):
+        """Precompute canonical patterns; the exact-pattern lookup table comes compiled"""
+        self.intents_by_tag = {
+            intent.get('tag'): intent for intent in self.intents.get('intents', [])
+        }
+        self.pattern_index = self.kb['pattern_index']
+        self.canonical_patterns = [
+            (intent, [canonicalize(pattern) for pattern in intent.get('patterns', [])])
+            for intent in self.intents.get('intents', [])
+        ]
+        # Out-of-vocabulary tokens are mapped onto the words the patterns use
+        self.spelling_index = SpellingIndex(
+            word for _, patterns in self.canonical_patterns for pattern in patterns for word in pattern.split()
+        )
+    
+    def get_response(self, text, threshold=0.7, trace=None):
         """
-        Get response using pattern matching instead of ML models
+        Get response using pattern matching instead of ML models.
+        A QueryTrace passed as `trace` records the answering tier and stage timings.
         """
+        trace = trace or NULL_TRACE
         try:
+            cache_key = canonicalize(text)
+            if not trace.use_cache:
+                return self._compute_response(text, cache_key, trace)
+
             # Check cache first
-            cache_key = text.strip().lower()
-            if cache_key in self.response_cache:
-                return self.response_cache[cache_key]
-            
-            # Clean input
-            cleaned_input = cache_key
-            
-            # Quick action pattern matching
-            quick_response = self._handle_quick_actions(cleaned_input)
-            if quick_response:
-                self.response_cache[cache_key] = quick_response
-                return quick_response
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                trace.tier = 'response_cache'
+                return cached
             
-            # Pattern matching for intents
-            best_intent = self._match_intent(cleaned_input)
-            
-            if best_intent:
-                response = random.choice(best_intent.get('responses', []))
-                result = {
-                    'parts': response.get('parts', [response]) if 'parts' in response else [response],
-                    'confidence': 0.85,
-                    'intent': best_intent.get('tag', 'unknown')
-                }
-                self.response_cache[cache_key] = result
-                return result
-            
-            # Fallback response
-            result = self._fallback_response()
-            self.response_cache[cache_key] = result
+            # Identical messages arriving together share one matching run
+            result = self.inflight.do(cache_key, lambda: self._compute_and_cache(text, cache_key, trace))
+            if trace.tier is None:
+                trace.tier = 'coalesced'
             return result
             
         except Exception as e:
             logger.error(f"Response generation failed: {str(e)}")
+            trace.tier = 'error'
             return self._error_response()
     
+    def _compute_and_cache(self, text, cache_key, trace):
+        result = self._compute_response(text, cache_key, trace)
+        self.response_cache[cache_key] = result
+        return result
+
+    def _compute_response(self, text, cache_key, trace=NULL_TRACE):
+        """Match a message that missed the response cache"""
+        # Clean input
+        cleaned_input = cache_key
+
+        # Amharic questions are answered from the local phrase memory
+        if detect_language(text) == 'am':
+            with trace.stage('translate'):
+                english = self.phrase_memory.translate(cleaned_input, count=not trace.synthetic)
+            if english is None:
+                trace.tier = 'fallback'
+                result = self._fallback_response()
+                return result
+            cleaned_input = canonicalize(english)
+
+        # Quick action pattern matching
+        with trace.stage('quick_actions'):
+            quick_response = self._handle_quick_actions(cleaned_input)
+        if quick_response:
+            trace.tier = 'quick_action'
+            return quick_response
+
+        # Map misspelled words onto pattern vocabulary before matching
+        if self.spelling_index is not None:
+            with trace.stage('spelling'):
+                corrected_input = self.spelling_index.correct_text(cleaned_input, count=not trace.synthetic)
+            if corrected_input != cleaned_input:
+                cleaned_input = corrected_input
+                quick_response = self._handle_quick_actions(cleaned_input)
+                if quick_response:
+                    trace.tier = 'quick_action'
+                    return quick_response
+
+        # Message identical to a training pattern
+        exact_tag = self.pattern_index.get(cleaned_input)
+        if exact_tag in self.intents_by_tag:
+            trace.tier = 'exact_pattern'
+            if not trace.synthetic:
+                self.exact_pattern_hits += 1
+            result = self._build_intent_response(self.intents_by_tag[exact_tag], 1.0)
+            return result
+
+        # Pattern matching for intents
+        with trace.stage('match'):
+            best_intent = self._match_intent(cleaned_input)
+
+        if best_intent:
+            trace.tier = 'pattern_match'
+            result = self._build_intent_response(best_intent, 0.85)
+            return result
+
+        # Fallback response
+        trace.tier = 'fallback'
+        result = self._fallback_response()
+        return result
+    
+    def admission_lane(self, text):
+        """FAST for cached, exact-pattern and quick-action answers, MODEL for fuzzy matching"""
+        key = canonicalize(text)
+        if key in self.response_cache or key in self.pattern_index:
+            return FAST
+        if self._handle_quick_actions(key):
+            return FAST
+        return MODEL
+    
+    def _build_intent_response(self, intent, confidence):
+        """Pick one of the intent's responses and wrap it in the API format"""
+        response = random.choice(intent.get('responses', []))
+        return {
+            'parts': response.get('parts', [response]) if 'parts' in response else [response],
+            'confidence': confidence,
+            'intent': intent.get('tag', 'unknown')
+        }
+    
     def _match_intent(self, text):
         """Match intent using simple pattern matching"""
         best_match = None
         best_score = 0
         
-        for intent in self.intents.get('intents', []):
-            patterns = intent.get('patterns', [])
+        for intent, patterns in self.canonical_patterns:
             score = 0
             
-            for pattern in patterns:
-                pattern_lower = pattern.lower()
+            for pattern_lower in patterns:
                 # Simple keyword matching
                 if pattern_lower in text:
                     score += 1
@@ -114,198 +231,15 @@ class SimpleProcessor:
         return best_match if best_score > 0 else None
     
     def _handle_quick_actions(self, cleaned_input):
-        """Handle specific quick action queries with direct responses"""
-        
-        # Park Information
-        if any(phrase in cleaned_input for phrase in [
-            "tell me about bale mountains national park",
-            "tell me about bale mountains",
-            "tell me about baale mountain",
-            "park information",
-            "about the park"
-        ]):
-            return {
-                'parts': [{
-                    'type': 'header',
-                    'content': 'Bale Mountains National Park Information'
-                }, {
-                    'type': 'text',
-                    'content': 'Bale Mountains National Park is known for its diverse ecosystems, rare wildlife like the Ethiopian wolf, and stunning landscapes such as the Sanetti Plateau and Harenna Forest. It\'s perfect for wildlife enthusiasts and nature lovers.'
-                }],
-                'confidence': 0.95,
-                'intent': 'place_info'
-            }
-        
-        # How to Get There
-        if any(phrase in cleaned_input for phrase in [
-            "how do i get to bale mountains",
-            "how do i get to baale mountain",
-            "how to get there",
-            "directions to bale mountains",
-            "how to reach the park"
-        ]):
-            return {
-                'parts': [{
-                    'type': 'header',
-                    'content': 'How to Get to Bale Mountains National Park'
-                }, {
-                    'type': 'text',
-                    'content': 'There are three main routes to reach Bale Mountains National Park:'
-                }, {
-                    'type': 'list',
-                    'content': [
-                        'Route 1: Via Addis Ababa - Shashemene - Goba (460km, 6-8 hours)',
-                        'Route 2: Via Addis Ababa - Dodola - Adaba (380km, 5-7 hours)',
-                        'Route 3: Via Addis Ababa - Ziway - Shashemene (450km, 6-7 hours)'
-                    ]
-                }, {
-                    'type': 'text',
-                    'content': '💡 Tip: Goba town serves as the main gateway to the park with accommodation and supplies available.'
-                }],
-                'confidence': 0.95,
-                'intent': 'getting_there'
-            }
-        
-        # Accommodation Options
-        if any(phrase in cleaned_input for phrase in [
-            "accommodation options",
-            "where can i stay",
-            "lodging",
-            "hotels",
-            "places to stay"
-        ]):
-            return {
-                'parts': [{
-                    'type': 'header',
-                    'content': 'Accommodation Options'
-                }, {
-                    'type': 'text',
-                    'content': 'There are several accommodation options available for visitors:'
-                }, {
-                    'type': 'list',
-                    'content': [
-                        'Bale Mountain Lodge - Luxury eco-lodge with stunning views',
-                        'Goba Hotels - Various budget to mid-range options in Goba town',
-                        'Camping - Designated camping areas within the park',
-                        'Community Lodges - Local community-run accommodations'
-                    ]
-                }],
-                'confidence': 0.95,
-                'intent': 'lodging'
-            }
-        
-        # Activities
-        if any(phrase in cleaned_input for phrase in [
-            "what activities can i do",
-            "activities in the park",
-            "what can i do",
-            "park activities"
-        ]):
-            return {
-                'parts': [{
-                    'type': 'header',
-                    'content': 'Activities in Bale Mountains National Park'
-                }, {
-                    'type': 'text',
-                    'content': 'The park offers a wide range of activities for nature enthusiasts:'
-                }, {
-                    'type': 'list',
-                    'content': [
-                        'Wildlife viewing (Ethiopian wolves, mountain nyala, etc.)',
-                        'Bird watching (over 280 species recorded)',
-                        'Hiking and trekking on various trails',
-                        'Photography of landscapes and wildlife',
-                        'Cultural visits to local communities',
-                        'Horseback riding',
-                        'Camping under the stars'
-                    ]
-                }],
-                'confidence': 0.95,
-                'intent': 'activities_within_park'
-            }
-        
-        # Best Time to Visit
-        if any(phrase in cleaned_input for phrase in [
-            "when is the best time to visit",
-            "best time to go",
-            "when to visit",
-            "best season"
-        ]):
-            return {
-                'parts': [{
-                    'type': 'header',
-                    'content': 'Best Time to Visit Bale Mountains'
-                }, {
-                    'type': 'text',
-                    'content': 'The best time to visit depends on your preferences:'
-                }, {
-                    'type': 'section',
-                    'title': 'Dry Season (October - March)',
-                    'content': [{
-                        'type': 'list',
-                        'content': [
-                            'Best for wildlife viewing',
-                            'Clear skies and good visibility',
-                            'Easier road access',
-                            'Ideal for photography'
-                        ]
-                    }]
-                }, {
-                    'type': 'section',
-                    'title': 'Wet Season (April - September)',
-                    'content': [{
-                        'type': 'list',
-                        'content': [
-                            'Lush green landscapes',
-                            'Wildflowers in bloom',
-                            'Bird migration season',
-                            'Some roads may be challenging'
-                        ]
-                    }]
-                }],
-                'confidence': 0.95,
-                'intent': 'when_to_go'
-            }
-        
-        # Park Fees
-        if any(phrase in cleaned_input for phrase in [
-            "park fees",
-            "entrance fees",
-            "how much does it cost",
-            "park entrance fee"
-        ]):
-            return {
-                'parts': [{
-                    'type': 'header',
-                    'content': 'Bale Mountains National Park Fees'
-                }, {
-                    'type': 'text',
-                    'content': 'Park entrance fees vary by visitor type:'
-                }, {
-                    'type': 'table',
-                    'columns': ['Visitor Type', 'Daily Fee'],
-                    'rows': [
-                        ['Foreign Tourist', '200 ETB'],
-                        ['Domestic Tourist', '50 ETB'],
-                        ['Student (with ID)', '25 ETB'],
-                        ['Local Community', '10 ETB']
-                    ]
-                }, {
-                    'type': 'text',
-                    'content': '💡 Additional fees may apply for camping, guides, and special activities.'
-                }],
-                'confidence': 0.95,
-                'intent': 'park_fees'
-            }
-        
-        return None
+        """Canned answer when the message asks a quick-action question (see quick_actions.py)"""
+        return match_quick_action(cleaned_input) if self.quick_actions else None
     
     def _fallback_response(self):
         """Fallback response for unknown queries"""
         return {
             'parts': [{
                 'type': 'text',
-                'content': "I'd be happy to help you learn about Bale Mountains National Park! You can ask me about park information, how to get there, accommodations, activities, best times to visit, or park fees."
+                'content': self.replies['fallback']
             }],
             'confidence': 0.5,
             'intent': 'fallback'
@@ -316,7 +250,7 @@ class SimpleProcessor:
         return {
             'parts': [{
                 'type': 'text',
-                'content': "I'm having trouble processing your request right now. Please try asking about Bale Mountains National Park information, directions, or activities."
+                'content': self.replies['error']
             }],
             'confidence': 0.0,
             'intent': 'error'
@@ -327,9 +261,19 @@ class SimpleProcessor:
         self.response_cache.clear()
         logger.info("Cache cleared")
     
+    def persistent_caches(self):
+        """Caches worth keeping across restarts, with the artifact version their entries depend on"""
+        return {'response_cache': (self.response_cache, self.kb['version'])}
+    
     def get_cache_stats(self):
         """Get cache statistics"""
         return {
-            'response_cache_size': len(self.response_cache),
-            'bow_cache_size': 0  # Not used in simple processor
+            **self.response_cache.stats(),
+            **self.inflight.stats(),
+            'bow_cache_size': 0,  # Not used in simple processor
+            'exact_pattern_hits': self.exact_pattern_hits,
+            'pattern_index_size': len(self.pattern_index),
+            'kb_version': self.kb['version'],
+            'spelling_corrections': self.spelling_index.corrections if self.spelling_index else 0,
+            **self.phrase_memory.stats()
         }
\ No newline at end of file
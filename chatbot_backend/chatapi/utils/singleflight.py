@@ -0,0 +1,82 @@
+import threading
+
+from .resilience import remaining_time
+
+DEFAULTS = {
+    'SINGLEFLIGHT_MAX_WAIT': 10.0,
+}
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key.
+    The first caller (the leader) runs the function; callers arriving while
+    it is in flight wait for its result instead of repeating the work. A
+    waiter whose request deadline runs out first computes on its own; outside
+    a deadline scope (WebSocket messages, warmup, scripts) it waits at most
+    `max_wait` seconds (SINGLEFLIGHT_MAX_WAIT), so a stuck leader cannot
+    hang every duplicate caller.
+    """
+
+    def __init__(self, name, max_wait=None):
+        self.name = name
+        self.max_wait = max_wait if max_wait is not None else _setting('SINGLEFLIGHT_MAX_WAIT')
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.wait_timeouts = 0
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            remaining = remaining_time()
+            if not call.done.wait(timeout=self.max_wait if remaining is None else min(remaining, self.max_wait)):
+                self.wait_timeouts += 1
+                return func()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        return {
+            f'{self.name}_in_flight': len(self._calls),
+            f'{self.name}_leaders': self.leaders,
+            f'{self.name}_coalesced': self.coalesced,
+            f'{self.name}_wait_timeouts': self.wait_timeouts,
+        }
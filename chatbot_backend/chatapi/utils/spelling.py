@@ -0,0 +1,96 @@
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+def _deletes(word, distance):
+    """All strings reachable from word by deleting up to `distance` characters"""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1:]
+            for candidate in frontier
+            for i in range(len(candidate))
+        }
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (Damerau-Levenshtein with adjacent transpositions)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellingIndex:
+    """
+    SymSpell-style spelling corrector.
+    Every dictionary word is indexed under all of its deletion variants up to
+    max_distance, so a lookup only needs the deletions of the query token and
+    costs roughly the same regardless of dictionary size.
+    """
+
+    def __init__(self, words, max_distance=2, min_length=4):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.frequencies = Counter(words)
+        self.words = set(self.frequencies)
+        self.deletes = {}
+        for word in self.words:
+            for variant in _deletes(word, max_distance):
+                self.deletes.setdefault(variant, set()).add(word)
+        self.corrections = 0
+        logger.info(f"Spelling index built: {len(self.words)} words, {len(self.deletes)} variants")
+
+    def allowed_distance(self, token):
+        """Short tokens get a tighter bound so common words are not rewritten"""
+        return 1 if len(token) < 8 else self.max_distance
+
+    def correct(self, token, count=True):
+        """
+        Nearest dictionary word within the allowed edit distance, else the
+        token itself. `count=False` leaves the correction out of the stats.
+        """
+        if token in self.words or len(token) < self.min_length or not token.isalpha():
+            return token
+
+        limit = self.allowed_distance(token)
+        candidates = set()
+        for variant in _deletes(token, limit):
+            candidates |= self.deletes.get(variant, set())
+
+        best = None
+        best_rank = None
+        for candidate in candidates:
+            distance = edit_distance(token, candidate, limit)
+            if distance > limit:
+                continue
+            rank = (distance, -self.frequencies[candidate], candidate)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = candidate, rank
+
+        if best is None:
+            return token
+        if count:
+            self.corrections += 1
+        return best
+
+    def correct_text(self, text, count=True):
+        """Correct every whitespace-separated token of an already canonical message"""
+        return ' '.join(self.correct(token, count) for token in text.split())
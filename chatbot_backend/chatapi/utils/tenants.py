@@ -0,0 +1,273 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .memory import DATA_ATTRIBUTES, deep_sizeof, shared_components
+from .registry import configured_backend, create, get_processor
+from .simple_processor import park_replies
+from .warmup import warm_in_background
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'TENANTS_CONFIG': '',
+    'DEFAULT_TENANT': 'bale',
+    'TENANT_MEMORY_BUDGET_MB': 512,
+    'CHAT_BACKEND_FALLBACK': 'simple',
+}
+
+# Tier attributes that hold a model; sized by parameter count, not walked
+MODEL_ATTRIBUTES = ('model', 'teacher')
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+class UnknownTenant(Exception):
+    def __init__(self, name):
+        super().__init__(f"Unknown tenant '{name}'")
+        self.name = name
+
+
+class Tenant:
+    """
+    One park served by this process. Its directory holds the intents file,
+    the compiled knowledge_base.pkl and, for the model backends, the
+    vocabulary.pkl / classes.pkl / chatbot_model.keras that train_model.py
+    writes. Quick actions are Bale Mountains answers and are off by default.
+    Fallback and error answers name the park (`title`); `replies` replaces
+    any of them ('greeting', 'fallback', 'error') outright.
+    """
+
+    def __init__(self, name, directory, intents='intents.json', backend=None, quick_actions=False,
+                 title='this park', replies=None):
+        self.name = name
+        self.directory = Path(directory)
+        self.intents = intents
+        self.backend = backend
+        self.quick_actions = quick_actions
+        self.title = title
+        self.replies = replies or {}
+
+    def backends(self):
+        """Backends to try in order: the tenant's (or the configured one), then the fallback"""
+        names = [self.backend or configured_backend()]
+        fallback = _setting('CHAT_BACKEND_FALLBACK')
+        if fallback and fallback not in names:
+            names.append(fallback)
+        return names
+
+    def options(self):
+        return {
+            'model_dir': self.directory,
+            'intents_path': self.directory / self.intents,
+            'kb_path': self.directory / 'knowledge_base.pkl',
+            'quick_actions': self.quick_actions,
+            'replies': {**park_replies(self.title), **self.replies},
+        }
+
+
+def load_tenants(path):
+    """
+    Tenants declared in a TENANTS_CONFIG file, a JSON object such as
+    {"simien": {"dir": "tenants/simien", "intents": "simien.json", "backend": "simple",
+                "title": "Simien Mountains National Park"}}.
+    Relative directories are resolved against the file's own directory.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    tenants = {}
+    for name, entry in entries.items():
+        directory = Path(entry['dir'])
+        if not directory.is_absolute():
+            directory = path.parent / directory
+        tenants[name] = Tenant(
+            name, directory,
+            intents=entry.get('intents', 'intents.json'),
+            backend=entry.get('backend'),
+            quick_actions=entry.get('quick_actions', False),
+            title=entry.get('title', 'this park'),
+            replies=entry.get('replies'),
+        )
+    return tenants
+
+
+def tenant_footprint(processor):
+    """
+    Bytes a processor holds beyond the shared components: knowledge base,
+    indexes, vocabulary and tier data, plus four bytes per model parameter.
+    Caches are left out; they are bounded by entry count.
+    """
+    seen = {id(component) for component in shared_components().values()}
+    total = sum(
+        deep_sizeof(getattr(processor, name), seen)
+        for name in DATA_ATTRIBUTES if getattr(processor, name, None) is not None
+    )
+    for holder in [processor, *getattr(processor, 'tiers', [])]:
+        for name in MODEL_ATTRIBUTES:
+            model = getattr(holder, name, None)
+            if model is not None and hasattr(model, 'count_params'):
+                total += model.count_params() * 4
+        if holder is not processor:
+            total += deep_sizeof(
+                {key: value for key, value in vars(holder).items() if key not in MODEL_ATTRIBUTES}, seen
+            )
+    return total
+
+
+class TenantPool:
+    """
+    Processors of the non-default tenants, loaded on a tenant's first
+    request and kept in least-recently-used order. When their combined
+    footprint exceeds `budget_bytes` the least recently used are unloaded;
+    the tenant just loaded always stays, so one tenant larger than the
+    budget still serves. A tenant that failed to load is not retried.
+    With `warm` set, a tenant is warmed up in the background once loaded.
+    """
+
+    def __init__(self, tenants, budget_bytes, warm=False):
+        self.tenants = tenants
+        self.budget_bytes = budget_bytes
+        self.warm = warm
+        self.warmups = {}
+        self._loaded = OrderedDict()
+        self._errors = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def _cached(self, name):
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+                return entry[0]
+            return None
+
+    def get(self, name):
+        """The tenant's processor, or None if it cannot be loaded; raises UnknownTenant"""
+        if name not in self.tenants:
+            raise UnknownTenant(name)
+        processor = self._cached(name)
+        if processor is not None or name in self._errors:
+            return processor
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        # Requests for other tenants go on while this one loads
+        with load_lock:
+            processor = self._cached(name)
+            if processor is not None or name in self._errors:
+                return processor
+            return self._load(self.tenants[name])
+
+    def _load(self, tenant):
+        started = time.perf_counter()
+        options = tenant.options()
+        if not options['intents_path'].exists():
+            # SimpleProcessor would quietly serve its two built-in intents
+            logger.error(f"Tenant '{tenant.name}' has no intents file at {options['intents_path']}")
+            self._errors[tenant.name] = f"missing {options['intents_path']}"
+            return None
+        errors = []
+        for backend in tenant.backends():
+            try:
+                processor = create(backend, **options)
+                break
+            except Exception as e:
+                logger.error(f"Tenant '{tenant.name}' failed to load backend '{backend}': {str(e)}")
+                errors.append(f"{backend}: {str(e)}")
+        else:
+            self._errors[tenant.name] = '; '.join(errors)
+            return None
+
+        size = tenant_footprint(processor)
+        with self._lock:
+            self._loaded[tenant.name] = (processor, size)
+            self.loads += 1
+            self._evict(keep=tenant.name)
+        logger.info(f"Tenant '{tenant.name}' loaded with backend '{backend}' in "
+                    f"{time.perf_counter() - started:.3f}s ({size / (1024 * 1024):.1f} MB)")
+        if self.warm:
+            warm_in_background(processor, tenant.name, lambda report: self._warmed(tenant.name, report))
+        return processor
+
+    def _warmed(self, name, report):
+        with self._lock:
+            self.warmups[name] = report
+
+    def _evict(self, keep):
+        """Unload least recently used tenants until the pool fits its budget; holds the lock"""
+        while self._used_bytes() > self.budget_bytes and len(self._loaded) > 1:
+            name = next(name for name in self._loaded if name != keep)
+            _, size = self._loaded.pop(name)
+            self.evictions += 1
+            logger.info(f"Tenant '{name}' unloaded ({size / (1024 * 1024):.1f} MB), over memory budget")
+
+    def _used_bytes(self):
+        return sum(size for _, size in self._loaded.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'configured': sorted(self.tenants),
+                'loaded': {name: size for name, (_, size) in self._loaded.items()},
+                'used_bytes': self._used_bytes(),
+                'budget_bytes': self.budget_bytes,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'failed': dict(self._errors),
+                'warmed': {name: report['seconds'] for name, report in self.warmups.items()},
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_tenant_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            path = _setting('TENANTS_CONFIG')
+            tenants = load_tenants(path) if path else {}
+            tenants.pop(_setting('DEFAULT_TENANT'), None)
+            _pool = TenantPool(tenants, int(_setting('TENANT_MEMORY_BUDGET_MB') * 1024 * 1024), warm=True)
+            if tenants:
+                logger.info(f"Tenants configured: {', '.join(sorted(tenants))}")
+        return _pool
+
+
+def get_tenant_processor(name=None):
+    """
+    Processor for a tenant. The default tenant (Bale Mountains, or an
+    omitted name) is the configured backend from the registry, with its
+    cache snapshots; the others come from the tenant pool and are warmed
+    up after loading.
+    Raises UnknownTenant for a name that is not configured.
+    """
+    if not name or name == _setting('DEFAULT_TENANT'):
+        return get_processor()
+    if not isinstance(name, str):
+        raise UnknownTenant(name)
+    return get_tenant_pool().get(name)
+
+
+def tenant_stats():
+    return {'default': _setting('DEFAULT_TENANT'), **get_tenant_pool().stats()}
+
+
+def reset_tenants():
+    """Unload every tenant and reread TENANTS_CONFIG (tests and reloads)"""
+    global _pool
+    with _pool_lock:
+        _pool = None
@@ -0,0 +1,83 @@
+import logging
+import re
+import string
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_DANGLING_HYPHEN_RE = re.compile(r'(?<!\w)-|-(?!\w)')
+
+# Apostrophes and in-word hyphens survive because the vocabulary has tokens
+# like "'s" and "3-day"; typographic apostrophes are folded to ASCII.
+_APOSTROPHES = {'‘': "'", '’': "'", 'ʼ': "'", '`': "'", '´': "'"}
+_KEPT = "'-"
+
+# Fast path for plain ASCII input: punctuation becomes whitespace
+_ASCII_TABLE = str.maketrans(
+    {ch: ' ' for ch in string.punctuation if ch not in _KEPT} | {'`': "'"}
+)
+
+
+def canonicalize(text):
+    """
+    Canonical form of a user message used for cache keys and pattern lookup.
+    NFKC-normalizes, casefolds, strips punctuation and symbols (emoji,
+    quotes, Ethiopic punctuation) and collapses whitespace.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text).casefold()
+
+    if text.isascii():
+        text = text.translate(_ASCII_TABLE)
+    else:
+        chars = []
+        for ch in text:
+            if ch in _APOSTROPHES:
+                chars.append(_APOSTROPHES[ch])
+                continue
+            if ch in _KEPT:
+                chars.append(ch)
+                continue
+            category = unicodedata.category(ch)
+            if category == 'Cf':
+                # Zero-width joiners and friends carry no meaning here
+                continue
+            if category[0] in 'PSC':
+                chars.append(' ')
+            else:
+                chars.append(ch)
+        text = ''.join(chars)
+
+    if '-' in text:
+        text = _DANGLING_HYPHEN_RE.sub(' ', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def token_key(text, lemmatize=None):
+    """
+    Order-insensitive key: the sorted set of canonical tokens, optionally lemmatized.
+    Two messages with the same key produce the same bag-of-words vector.
+    """
+    tokens = canonicalize(text).split()
+    if lemmatize is not None:
+        tokens = [lemmatize(token) for token in tokens]
+    return ' '.join(sorted(set(tokens)))
+
+
+def build_pattern_index(intents):
+    """Map every canonicalized training pattern straight to its intent tag"""
+    index = {}
+    for intent in intents.get('intents', []):
+        tag = intent.get('tag')
+        for pattern in intent.get('patterns', []):
+            key = canonicalize(pattern)
+            if not key:
+                continue
+            if key in index and index[key] != tag:
+                # Ambiguous pattern: keep the first intent, like the model's training order
+                logger.debug(f"Pattern '{pattern}' shared by '{index[key]}' and '{tag}'")
+                continue
+            index.setdefault(key, tag)
+    return index
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from .text_normalizer import canonicalize
+
+logger = logging.getLogger(__name__)
+
+UTILS_DIR = Path(__file__).resolve().parent
+INTENTS_PATH = UTILS_DIR / 'baale_mountain.json'
+
+VOCABULARY_FILE = 'vocabulary.pkl'
+CLASSES_FILE = 'classes.pkl'
+MODEL_FILE = 'chatbot_model.keras'
+MANIFEST_FILE = 'training_manifest.json'
+ARTIFACT_FILES = (VOCABULARY_FILE, CLASSES_FILE, MODEL_FILE)
+
+IGNORE_TOKENS = {"?", "!", ".", ","}
+
+DEFAULT_EPOCHS = 200
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_SEED = 42
+
+
+class StageTimer:
+    """Wall-clock seconds spent in each named stage of a run"""
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = round(time.perf_counter() - started, 4)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def nltk_tokenizer():
+    """word_tokenize and WordNet lemmatize, fetching the NLTK data on first use"""
+    import nltk
+
+    for name, path in {'punkt': 'tokenizers/punkt', 'punkt_tab': 'tokenizers/punkt_tab',
+                       'wordnet': 'corpora/wordnet'}.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(name, quiet=True)
+    return nltk.word_tokenize, nltk.WordNetLemmatizer().lemmatize
+
+
+def load_intents(path=INTENTS_PATH):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+def build_vocabulary(intents, tokenize, lemmatize):
+    """
+    Sorted vocabulary and classes plus one (lemmas, tag) document per pattern.
+    Patterns are canonicalized first, exactly like messages at serving time,
+    so training and inference see the same tokens.
+    """
+    documents = []
+    for intent in intents.get('intents', []):
+        for pattern in intent.get('patterns', []):
+            lemmas = [lemmatize(token) for token in tokenize(canonicalize(pattern))]
+            documents.append(([lemma for lemma in lemmas if lemma not in IGNORE_TOKENS], intent['tag']))
+    words = sorted({lemma for lemmas, _ in documents for lemma in lemmas})
+    classes = sorted({intent['tag'] for intent in intents.get('intents', [])})
+    return words, classes, documents
+
+
+def bow_matrix(lemma_lists, words):
+    """Binary BoW rows for lemmatized texts, filled with one scatter"""
+    word_index = {word: i for i, word in enumerate(words)}
+    rows, cols = [], []
+    for row, lemmas in enumerate(lemma_lists):
+        columns = {word_index[lemma] for lemma in lemmas if lemma in word_index}
+        rows.extend([row] * len(columns))
+        cols.extend(columns)
+
+    X = np.zeros((len(lemma_lists), len(words)), dtype=np.float32)
+    X[rows, cols] = 1.0
+    return X
+
+
+def build_matrix(documents, words, classes):
+    """Binary BoW inputs and one-hot targets for (lemmas, tag) documents"""
+    class_index = {tag: i for i, tag in enumerate(classes)}
+    X = bow_matrix([lemmas for lemmas, _ in documents], words)
+    labels = np.fromiter((class_index[tag] for _, tag in documents), dtype=np.int64, count=len(documents))
+    y = np.eye(len(classes), dtype=np.float32)[labels]
+    return X, y
+
+
+def balanced_class_weights(y):
+    """n_samples / (n_classes * count) per class, as sklearn's 'balanced' mode"""
+    counts = y.sum(axis=0)
+    present = counts > 0
+    weights = np.zeros_like(counts)
+    weights[present] = y.shape[0] / (present.sum() * counts[present])
+    return {i: float(w) for i, w in enumerate(weights) if w > 0}
+
+
+def set_seed(seed):
+    """Seed Python, NumPy and TensorFlow and make TF kernels deterministic"""
+    import tensorflow as tf
+
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.keras.utils.set_random_seed(seed)
+    tf.config.experimental.enable_op_determinism()
+
+
+def build_model(input_dim, output_dim):
+    """The notebook's architecture: 256-128 ReLU MLP with L2 and dropout"""
+    from tensorflow.keras.layers import Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+    from tensorflow.keras.regularizers import l2
+
+    model = Sequential([
+        Input(shape=(input_dim,)),
+        Dense(256, activation='relu', kernel_regularizer=l2(0.01)),
+        Dropout(0.5),
+        Dense(128, activation='relu', kernel_regularizer=l2(0.01)),
+        Dropout(0.3),
+        Dense(output_dim, activation='softmax'),
+    ])
+    model.compile(loss='categorical_crossentropy', optimizer=Adam(learning_rate=0.001), metrics=['accuracy'])
+    return model
+
+
+def train(X, y, epochs=DEFAULT_EPOCHS, batch_size=DEFAULT_BATCH_SIZE, seed=DEFAULT_SEED):
+    set_seed(seed)
+    model = build_model(X.shape[1], y.shape[1])
+    history = model.fit(
+        X, y,
+        epochs=epochs,
+        batch_size=batch_size,
+        class_weight=balanced_class_weights(y),
+        shuffle=True,
+        verbose=0
+    )
+    return model, history.history
+
+
+def write_artifacts(output_dir, words, classes, model, manifest):
+    """
+    Write vocabulary, classes, model and manifest into a staging directory,
+    check the model against the vocabulary, then move each file into place
+    with os.replace. Each file is replaced atomically but the set is not:
+    a reader in between can see a new model next to an old vocabulary.
+    The manifest goes last and records every file's sha256, and
+    load_artifacts refuses a set that does not match it.
+    """
+    output_dir = Path(output_dir)
+    staging = Path(tempfile.mkdtemp(prefix='.training-', dir=output_dir))
+    try:
+        with open(staging / VOCABULARY_FILE, 'wb') as f:
+            pickle.dump(words, f)
+        with open(staging / CLASSES_FILE, 'wb') as f:
+            pickle.dump(classes, f)
+        model.save(str(staging / MODEL_FILE))
+
+        from tensorflow.keras.models import load_model
+        reloaded = load_model(str(staging / MODEL_FILE))
+        if reloaded.input_shape[1] != len(words) or reloaded.output_shape[1] != len(classes):
+            raise ValueError("Saved model does not match vocabulary/classes")
+
+        manifest['artifacts'] = {
+            name: file_sha256(staging / name) for name in ARTIFACT_FILES
+        }
+        with open(staging / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        for name in (*ARTIFACT_FILES, MANIFEST_FILE):
+            os.replace(staging / name, output_dir / name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return manifest
+
+
+class ArtifactMismatch(ValueError):
+    """The model artifacts on disk are not the set their training manifest describes"""
+
+
+def check_manifest(model_dir):
+    """
+    Raise ArtifactMismatch unless every artifact in model_dir has the sha256
+    its training manifest records. Artifacts from before manifests were
+    written have none and are not checked.
+    """
+    model_dir = Path(model_dir)
+    try:
+        with open(model_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            expected = json.load(f).get('artifacts', {})
+    except FileNotFoundError:
+        return
+    for name in ARTIFACT_FILES:
+        if name in expected and file_sha256(model_dir / name) != expected[name]:
+            raise ArtifactMismatch(f"{name} in {model_dir} does not match {MANIFEST_FILE}")
+
+
+def load_artifacts(model_dir=UTILS_DIR, load_model=None, attempts=3, retry_delay=0.5):
+    """
+    Vocabulary, classes and Keras model from model_dir, checked against the
+    manifest before and after loading so that a retrain replacing files
+    meanwhile is noticed. A mismatched set is retried after retry_delay
+    (write_artifacts replaces the files within milliseconds) and refused
+    with ArtifactMismatch after `attempts` tries. `load_model` takes the
+    model path; TensorFlow's load_model by default.
+    """
+    if load_model is None:
+        from tensorflow.keras.models import load_model
+    model_dir = Path(model_dir)
+    for attempt in range(1, attempts + 1):
+        try:
+            check_manifest(model_dir)
+            with open(model_dir / VOCABULARY_FILE, 'rb') as f:
+                words = pickle.load(f)
+            with open(model_dir / CLASSES_FILE, 'rb') as f:
+                classes = pickle.load(f)
+            model = load_model(str(model_dir / MODEL_FILE))
+            check_manifest(model_dir)
+            return words, classes, model
+        except ArtifactMismatch as e:
+            if attempt == attempts:
+                raise
+            logger.warning(f"{str(e)}, retrying ({attempt}/{attempts})")
+            time.sleep(retry_delay)
+
+
+def run(intents_path=INTENTS_PATH, output_dir=UTILS_DIR, epochs=DEFAULT_EPOCHS,
+        batch_size=DEFAULT_BATCH_SIZE, seed=DEFAULT_SEED, dry_run=False, tokenizer=None):
+    """Full pipeline: load, vocabulary, matrix, train, write. Returns the manifest"""
+    timer = StageTimer()
+    with timer.stage('load'):
+        intents = load_intents(intents_path)
+        tokenize, lemmatize = tokenizer or nltk_tokenizer()
+    with timer.stage('vocabulary'):
+        words, classes, documents = build_vocabulary(intents, tokenize, lemmatize)
+    with timer.stage('matrix'):
+        X, y = build_matrix(documents, words, classes)
+
+    manifest = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'intents_sha256': file_sha256(intents_path),
+        'seed': seed,
+        'epochs': epochs,
+        'batch_size': batch_size,
+        'documents': len(documents),
+        'vocabulary_size': len(words),
+        'classes': len(classes),
+    }
+    if dry_run:
+        manifest['stage_seconds'] = timer.seconds
+        return manifest
+
+    with timer.stage('train'):
+        model, history = train(X, y, epochs=epochs, batch_size=batch_size, seed=seed)
+    manifest['train_accuracy'] = round(float(history['accuracy'][-1]), 4)
+    manifest['train_loss'] = round(float(history['loss'][-1]), 4)
+
+    import tensorflow as tf
+    manifest['versions'] = {'tensorflow': tf.__version__, 'numpy': np.__version__}
+    with timer.stage('write'):
+        # Stage timings are recorded before the write so they end up in the file
+        manifest['stage_seconds'] = timer.seconds
+        write_artifacts(output_dir, words, classes, model, manifest)
+    manifest['stage_seconds'] = timer.seconds
+    logger.info(f"Training finished: {len(documents)} patterns, {len(words)} words, {len(classes)} classes")
+    return manifest
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from .evaluation import build_corpus
+from .query_log import QueryTrace
+from .quick_actions import QUICK_ACTIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WARMUP_ON_START': True,
+    'WARMUP_QUERIES': 48,
+}
+
+# Exact patterns, the spelling corrector and the model path in turn
+WARMUP_PERTURBATIONS = ('clean', 'typo', 'paraphrase')
+
+
+def _setting(name):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, DEFAULTS[name])
+    except Exception:
+        return DEFAULTS[name]
+
+
+def warmup_messages(processor, limit=None):
+    """
+    Representative queries: a quick-action button's query when the processor
+    answers them, then one clean, misspelled and paraphrased pattern per
+    intent of its own knowledge base, interleaved so a short budget still
+    reaches every stage.
+    """
+    limit = limit or _setting('WARMUP_QUERIES')
+    by_kind = {kind: [] for kind in WARMUP_PERTURBATIONS}
+    seen = set()
+    for text, tag, kind in build_corpus(processor.intents, WARMUP_PERTURBATIONS, variants=1, seed=0):
+        if (tag, kind) not in seen:
+            seen.add((tag, kind))
+            by_kind[kind].append(text)
+    messages = [QUICK_ACTIONS[0]['query']] if processor.quick_actions else []
+    for group in zip(*by_kind.values()):
+        messages.extend(group)
+    return messages[:limit]
+
+
+def warm_up(processor, messages):
+    """
+    Run messages through every pipeline stage (model graph tracing, WordNet
+    and spaCy loading, BoW encoding) and report how long it took. The
+    processor may already be serving, so the queries neither read nor fill
+    its caches (snapshot entries would otherwise answer them, and warmup
+    answers would take the place of real traffic) nor count towards the
+    serving metrics in /api/performance/.
+    """
+    latencies = np.empty(len(messages))
+    tiers = Counter()
+    started = time.perf_counter()
+    for i, message in enumerate(messages):
+        trace = QueryTrace(use_cache=False, synthetic=True)
+        query_started = time.perf_counter()
+        processor.get_response(message, trace=trace)
+        latencies[i] = time.perf_counter() - query_started
+        tiers[trace.tier] += 1
+    elapsed = time.perf_counter() - started
+    logger.info(f"Warmed up with {len(messages)} queries in {elapsed:.2f}s")
+    return {
+        'queries': len(messages),
+        'seconds': round(elapsed, 3),
+        'first_ms': round(latencies[0] * 1000, 3) if len(messages) else None,
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3) if len(messages) else None,
+        'tiers': dict(tiers),
+    }
+
+
+class Readiness:
+    """
+    Worker lifecycle for the health probes: pending until warmup starts,
+    warming while the backend loads and runs the warmup queries, then
+    ready, or failed when no backend loads or every warmup query errors.
+    """
+
+    def __init__(self, get_processor, messages=warmup_messages):
+        self.get_processor = get_processor
+        self.messages = messages
+        self.state = 'pending'
+        self.error = None
+        self.report = None
+        self.started_at = None
+        self.ready_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def start(self, background=True):
+        """Begin warmup unless it is running or done; a failed warmup is retried"""
+        with self._lock:
+            if self.state not in ('pending', 'failed'):
+                return
+            self.state = 'warming'
+            self.error = None
+            self.started_at = time.time()
+        if background:
+            self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+
+    def _run(self):
+        try:
+            processor = self.get_processor()
+            if processor is None:
+                raise RuntimeError("No chat backend could be loaded")
+            report = warm_up(processor, self.messages(processor))
+            if report['queries'] and report['tiers'].get('error', 0) == report['queries']:
+                raise RuntimeError("Every warmup query failed")
+        except Exception as e:
+            logger.error(f"Warmup failed: {str(e)}")
+            self.error = str(e)
+            self.state = 'failed'
+            return
+        self.report = report
+        self.ready_at = time.time()
+        self.state = 'ready'
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'error': self.error,
+            'warmup': self.report,
+            'warmup_wall_seconds': round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+        }
+
+
+_readiness = None
+_readiness_lock = threading.Lock()
+
+
+def get_readiness():
+    global _readiness
+    if _readiness is None:
+        with _readiness_lock:
+            if _readiness is None:
+                from .registry import get_processor
+                _readiness = Readiness(get_processor)
+    return _readiness
+
+
+def start_warmup():
+    """Called by the WSGI/ASGI entry points so workers warm up before the first probe"""
+    if _setting('WARMUP_ON_START'):
+        get_readiness().start()
+
+
+def warm_in_background(processor, name, on_done=None):
+    """
+    Warm a processor that is already serving (a tenant loaded on its first
+    request) on a daemon thread; `on_done` receives the report. Does nothing
+    when WARMUP_ON_START is off.
+    """
+    if not _setting('WARMUP_ON_START'):
+        return None
+
+    def run():
+        try:
+            report = warm_up(processor, warmup_messages(processor))
+        except Exception as e:
+            logger.error(f"Warmup of {name} failed: {str(e)}")
+            return
+        if on_done is not None:
+            on_done(report)
+
+    thread = threading.Thread(target=run, name=f'warmup-{name}', daemon=True)
+    thread.start()
+    return thread
+
+
+def reset_readiness():
+    global _readiness
+    with _readiness_lock:
+        _readiness = None
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import requests
+
+from .resilience import call_external
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCATION = 'Bale Mountains'
+DEFAULT_KEY = DEFAULT_LOCATION.lower()
+
+# Coordinates for the places visitors ask about; anything else is queried by name
+KNOWN_LOCATIONS = {
+    'bale mountains': (6.85, 39.75),
+    'sanetti plateau': (6.83, 39.88),
+    'harenna forest': (6.65, 39.75),
+    'dinsho': (7.10, 39.78),
+    'goba': (7.01, 39.98),
+    'robe': (7.12, 40.00),
+}
+
+PLACEHOLDER_KEYS = {'', 'your_api_key_here', 'your-openweathermap-key', 'your_openweathermap_api_key_here'}
+
+
+class ClimateNormalsProvider:
+    """Offline provider serving the park's typical climate; never fails"""
+
+    name = 'climate_normals'
+
+    def fetch(self, location, timeout=None):
+        return {
+            'location': location,
+            'temperature': '15-25°C',
+            'condition': 'Cool mountain climate',
+            'humidity': '60-80%',
+            'note': 'Weather data from local climate patterns',
+        }
+
+
+class OpenWeatherProvider:
+    """Current conditions from the OpenWeatherMap API"""
+
+    name = 'openweather'
+    URL = 'https://api.openweathermap.org/data/2.5/weather'
+
+    def __init__(self, api_key, url=None):
+        self.api_key = api_key
+        self.url = url or self.URL
+
+    def fetch(self, location, timeout=None):
+        params = {'appid': self.api_key, 'units': 'metric'}
+        coordinates = KNOWN_LOCATIONS.get(location.lower())
+        if coordinates:
+            params['lat'], params['lon'] = coordinates
+        else:
+            params['q'] = location
+        response = requests.get(self.url, params=params, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        return {
+            'location': location,
+            'temperature': f"{round(data['main']['temp'])}°C",
+            'condition': data['weather'][0]['description'].capitalize(),
+            'humidity': f"{data['main']['humidity']}%",
+            'wind_speed': f"{data.get('wind', {}).get('speed', 0)} m/s",
+        }
+
+
+class WeatherService:
+    """
+    Per-location forecast cache refreshed in the background.
+    get() never waits on the provider: fresh readings are served as-is,
+    readings older than ttl are served while a refresh is queued
+    (stale-while-revalidate), and locations with no usable reading get the
+    climate-normals fallback until the first refresh lands.
+
+    Locations come from clients, so at most `max_locations` are tracked
+    (least recently requested dropped first) and a location nobody has
+    asked about for `max_stale` seconds is dropped with its reading; the
+    park's default location is always kept.
+    """
+
+    def __init__(self, provider, ttl=600, max_stale=3600, refresh_interval=300, max_locations=32):
+        self.provider = provider
+        self.fallback_provider = ClimateNormalsProvider()
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_interval = refresh_interval
+        self.max_locations = max_locations
+        self.readings = {}
+        self.tracked = OrderedDict([(DEFAULT_KEY, DEFAULT_LOCATION)])
+        self.last_requested = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.stale_served = 0
+        self.fallbacks_served = 0
+        self.locations_dropped = 0
+
+    def start(self):
+        """Start the background refresher (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='weather-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def get(self, location=DEFAULT_LOCATION):
+        """Latest reading for a location with freshness metadata"""
+        key = location.lower()
+        with self._lock:
+            self._track(key, location)
+            entry = self.readings.get(key)
+
+        now = time.time()
+        age = now - entry['fetched_at'] if entry else None
+
+        if entry is None or age > self.max_stale:
+            self._schedule_refresh(key)
+            self.fallbacks_served += 1
+            reading = self.fallback_provider.fetch(location)
+            return {**reading, 'source': self.fallback_provider.name, 'fetched_at': None,
+                    'age_seconds': None, 'stale': True}
+
+        stale = age > self.ttl
+        if stale:
+            self._schedule_refresh(key)
+            self.stale_served += 1
+        return {
+            **entry['reading'],
+            'source': entry['source'],
+            'fetched_at': datetime.fromtimestamp(entry['fetched_at'], tz=timezone.utc).isoformat(),
+            'age_seconds': round(age, 1),
+            'stale': stale,
+        }
+
+    def _track(self, key, location):
+        """Mark a location as just requested, dropping the least recent beyond max_locations; holds the lock"""
+        self.tracked.setdefault(key, location)
+        self.tracked.move_to_end(key)
+        self.last_requested[key] = time.time()
+        while len(self.tracked) > self.max_locations:
+            self._forget(next(k for k in self.tracked if k != DEFAULT_KEY))
+
+    def _expire(self):
+        """Drop locations not requested within max_stale; holds the lock"""
+        cutoff = time.time() - self.max_stale
+        for key in [k for k, requested in self.last_requested.items() if requested < cutoff and k != DEFAULT_KEY]:
+            self._forget(key)
+
+    def _forget(self, key):
+        self.tracked.pop(key, None)
+        self.last_requested.pop(key, None)
+        self.readings.pop(key, None)
+        self._pending.discard(key)
+        self.locations_dropped += 1
+
+    def refresh(self, key):
+        """Fetch one tracked location from the provider through the 'weather' circuit breaker"""
+        with self._lock:
+            location = self.tracked.get(key)
+        if location is None:
+            return False
+        reading = call_external(
+            'weather',
+            lambda timeout: self.provider.fetch(location, timeout),
+            fallback=lambda: None
+        )
+        if reading is None:
+            self.refresh_failures += 1
+            return False
+        with self._lock:
+            if key not in self.tracked:
+                # Dropped while the provider was answering
+                return False
+            self.readings[key] = {
+                'reading': reading,
+                'source': self.provider.name,
+                'fetched_at': time.time(),
+            }
+        self.refreshes += 1
+        return True
+
+    def _schedule_refresh(self, key):
+        with self._lock:
+            self._pending.add(key)
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        # Refresh everything once at startup, then on schedule or on demand
+        due = set(self.tracked)
+        while not self._stopped.is_set():
+            with self._lock:
+                self._expire()
+                due |= self._pending
+                self._pending.clear()
+            for key in due:
+                try:
+                    self.refresh(key)
+                except Exception as e:
+                    logger.error(f"Weather refresh for '{key}' failed: {str(e)}")
+            woke = self._wake.wait(timeout=self.refresh_interval)
+            self._wake.clear()
+            with self._lock:
+                due = set() if woke else set(self.tracked)
+
+    def stats(self):
+        with self._lock:
+            locations = {
+                key: round(time.time() - entry['fetched_at'], 1) for key, entry in self.readings.items()
+            }
+            tracked = len(self.tracked)
+        return {
+            'provider': self.provider.name,
+            'reading_age_seconds': locations,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'stale_served': self.stale_served,
+            'fallbacks_served': self.fallbacks_served,
+            'locations_tracked': tracked,
+            'locations_dropped': self.locations_dropped,
+        }
+
+
+def build_provider():
+    """Provider named by settings.WEATHER_PROVIDER, or OpenWeather when a real key is configured"""
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    provider_path = getattr(settings, 'WEATHER_PROVIDER', None)
+    if provider_path:
+        return import_string(provider_path)()
+    api_key = getattr(settings, 'OPENWEATHER_API_KEY', '')
+    if api_key in PLACEHOLDER_KEYS:
+        logger.info("No OpenWeather API key configured, serving climate normals")
+        return ClimateNormalsProvider()
+    return OpenWeatherProvider(api_key)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_weather_service():
+    """Process-wide weather service, created and started on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            from django.conf import settings
+            _service = WeatherService(
+                build_provider(),
+                ttl=getattr(settings, 'WEATHER_TTL', 600),
+                max_stale=getattr(settings, 'WEATHER_MAX_STALE', 3600),
+                refresh_interval=getattr(settings, 'WEATHER_REFRESH_INTERVAL', 300),
+                max_locations=getattr(settings, 'WEATHER_MAX_LOCATIONS', 32),
+            )
+            _service.start()
+        return _service
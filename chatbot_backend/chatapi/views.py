@@ -1,32 +1,33 @@
 # chatapi/views.py
 import logging
 import os
+import time
 import warnings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
 
-# Force use of SimpleProcessor for deployment
-USE_SIMPLE_PROCESSOR = os.environ.get('USE_SIMPLE_PROCESSOR', 'false').lower() == 'true'
-IS_RENDER = os.environ.get('RENDER') is not None
-
-if USE_SIMPLE_PROCESSOR or IS_RENDER:
-    # Use SimpleProcessor for deployment (no ML dependencies)
-    from .utils.simple_processor import SimpleProcessor as ChatProcessor
-    PROCESSOR_TYPE = "SimpleProcessor (Deployment Mode)"
-else:
-    # Use full ChatProcessor for local development
-    try:
-        from .utils.chat_processor import ChatProcessor
-        PROCESSOR_TYPE = "ChatProcessor (Development Mode)"
-    except ImportError:
-        # Fallback to SimpleProcessor if ChatProcessor dependencies are missing
-        from .utils.simple_processor import SimpleProcessor as ChatProcessor
-        PROCESSOR_TYPE = "SimpleProcessor (Fallback Mode)"
-
 from django.conf import settings
 import requests
+from .utils.admin_auth import admin_authorized
+from .utils.admission import Overloaded, RateLimited, client_id, get_admission_controller, request_start
+from .utils.http_cache import (
+    DOCS_MAX_AGE, DOCS_SHARED_MAX_AGE, QUICK_ACTIONS_MAX_AGE, QUICK_ACTIONS_SHARED_MAX_AGE,
+    QUICK_ACTIONS_STALE_WHILE_REVALIDATE, WEATHER_MAX_AGE, WEATHER_SHARED_MAX_AGE, WEATHER_STALE_WHILE_REVALIDATE,
+    conditional_json,
+)
+from .utils.log_handlers import log_chat_request, logging_stats
+from .utils.memory import memory_report, run_admin_action
+from .utils.query_log import QueryTrace, get_query_log, log_query
+from .utils.quick_actions import QUICK_ACTIONS_BUNDLE
+from .utils.registry import (
+    active_backend, available_backends, configured_backend, get_processor, registry_stats, snapshot_writer
+)
+from .utils.resilience import breaker_states
+from .utils.tenants import UnknownTenant, get_tenant_processor, tenant_stats
+from .utils.warmup import get_readiness
+from .utils.weather_service import get_weather_service
 
 # Suppress warnings
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -34,13 +35,8 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 logger = logging.getLogger(__name__)
 
-# Initialize processor once to avoid repeated initialization
-try:
-    chat_processor = ChatProcessor()
-    logger.info(f"{PROCESSOR_TYPE} initialized successfully in views")
-except Exception as e:
-    logger.error(f"Failed to initialize {PROCESSOR_TYPE}: {str(e)}")
-    chat_processor = None
+# Backends are built on first use by the registry (see utils/registry.py);
+# CHAT_BACKEND picks the one serving chat traffic
 
 class ChatView(APIView):
     """
@@ -53,21 +49,28 @@ class ChatView(APIView):
         GET endpoint for API documentation
         """
         try:
-            return Response({
-                "message": "Bale Mountains National Park Chat API",
-                "status": "online",
-                "documentation": {
-                    "POST /api/chat/": {
-                        "description": "Process chat messages",
-                        "parameters": {
-                            "message": "String containing user query"
-                        },
-                        "example_request": {
-                            "message": "What's the history of Bale Mountains?"
+            return conditional_json(
+                request, {
+                    "message": "Bale Mountains National Park Chat API",
+                    "status": "online",
+                    "backend": configured_backend(),
+                    "documentation": {
+                        "POST /api/chat/": {
+                            "description": "Process chat messages",
+                            "parameters": {
+                                "message": "String containing user query",
+                                "tenant": "Optional park id (or X-Tenant header); defaults to Bale Mountains"
+                            },
+                            "example_request": {
+                                "message": "What's the history of Bale Mountains?"
+                            }
                         }
                     }
-                }
-            })
+                },
+                max_age=DOCS_MAX_AGE,
+                shared_max_age=DOCS_SHARED_MAX_AGE,
+                response_class=Response
+            )
         except Exception as e:
             logger.error(f"GET Error: {str(e)}", exc_info=True)
             return Response(
@@ -80,9 +83,14 @@ class ChatView(APIView):
         POST endpoint for processing chat messages
         """
         try:
-            # Check if ChatProcessor is available
+            # Loads the tenant's backend on its first request
+            tenant = request.data.get('tenant') or request.headers.get('X-Tenant')
+            try:
+                chat_processor = get_tenant_processor(tenant)
+            except UnknownTenant as e:
+                return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
             if chat_processor is None:
-                logger.error("ChatProcessor not initialized")
+                logger.error("No chat backend could be loaded")
                 return Response(
                     {
                         "text": "I'm sorry, but the chat service is currently unavailable. Please try again later.",
@@ -99,12 +107,29 @@ class ChatView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            logger.info(f"Processing message: {message[:50]}...")
-            
-            # Process the message
-            response_data = chat_processor.get_response(message)
+            # Cheap answers and model inference queue in separate lanes
+            lane = chat_processor.admission_lane(message)
+            trace = QueryTrace()
+            started = time.perf_counter()
+            try:
+                with get_admission_controller().admit(client_id(request), lane, request_start(request)):
+                    response_data = chat_processor.get_response(message, trace=trace)
+            except Overloaded as e:
+                logger.warning(f"Request shed: {e.reason}")
+                log_query(message, trace=trace, started=started, lane=lane,
+                          status=429 if isinstance(e, RateLimited) else 503)
+                return Response(
+                    {
+                        "text": "The chat service is busy right now. Please try again in a moment.",
+                        "error": "Too many requests" if isinstance(e, RateLimited) else "Server overloaded"
+                    },
+                    status=status.HTTP_429_TOO_MANY_REQUESTS if isinstance(e, RateLimited)
+                    else status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': str(e.retry_after)}
+                )
             
-            logger.info("Message processed successfully")
+            log_query(message, response_data, trace, started, lane)
+            log_chat_request(logger, message, response_data, trace, started, lane, tenant=tenant)
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -123,11 +148,23 @@ class PerformanceView(APIView):
     """
     def get(self, request):
         try:
+            chat_processor = get_processor()
             if chat_processor:
                 cache_stats = chat_processor.get_cache_stats()
+                readiness = get_readiness()
                 return Response({
-                    "status": "healthy",
+                    # Healthy only once warmed up, as the readiness probe sees it
+                    "status": "healthy" if readiness.ready else readiness.state,
+                    "readiness": readiness.stats(),
+                    "backend": active_backend(),
+                    "backends": registry_stats(),
                     "cache_stats": cache_stats,
+                    "circuit_breakers": breaker_states(),
+                    "admission": get_admission_controller().stats(),
+                    "cache_snapshot": snapshot_writer().stats() if snapshot_writer() else None,
+                    "query_log": get_query_log().stats() if get_query_log() else None,
+                    "logging": logging_stats(),
+                    "tenants": tenant_stats(),
                     "processor_available": True
                 })
             else:
@@ -141,29 +178,140 @@ class PerformanceView(APIView):
                 "status": "error",
                 "error": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MemoryView(APIView):
+    """
+    Admin memory introspection: GET reports RSS, per-component load deltas
+    and cache sizes; POST runs a tracemalloc action (start, snapshot, diff, stop).
+    """
+    http_method_names = ['get', 'post']
+
+    def get(self, request):
+        if not admin_authorized(request):
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(memory_report(get_processor()))
+
+    def post(self, request):
+        if not admin_authorized(request):
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            return Response(run_admin_action(request.data))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except KeyError as e:
+            return Response({"error": str(e.args[0])}, status=status.HTTP_404_NOT_FOUND)
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
+
+class CompareView(APIView):
+    """
+    Admin side-by-side comparison: POST {"message", "backends": [...]} runs
+    the message through each backend, loading any that are not yet loaded.
+    """
+    http_method_names = ['get', 'post']
+
+    def get(self, request):
+        if not admin_authorized(request):
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"available": available_backends(), **registry_stats()})
+
+    def post(self, request):
+        if not admin_authorized(request):
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        message = request.data.get('message', '').strip()
+        names = request.data.get('backends') or [active_backend() or configured_backend()]
+        if not message:
+            return Response({"error": "Message cannot be empty"}, status=status.HTTP_400_BAD_REQUEST)
+        unknown = [name for name in names if name not in available_backends()]
+        if unknown:
+            return Response({"error": f"Unknown backends: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = {}
+        for name in names:
+            processor = get_processor(name)
+            if processor is None:
+                results[name] = {"error": registry_stats()['failed'].get(name, "Backend unavailable")}
+                continue
+            trace = QueryTrace()
+            started = time.perf_counter()
+            response_data = processor.get_response(message, trace=trace)
+            parts = response_data.get('parts') or []
+            results[name] = {
+                "intent": response_data.get('intent'),
+                "confidence": response_data.get('confidence'),
+                # First text part for reading at a glance; the full answer in parts
+                "text": next((part['content'] for part in parts
+                              if part.get('type') == 'text' and isinstance(part.get('content'), str)), None),
+                "parts": parts,
+                "tier": trace.tier,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+        return Response({"message": message, "results": results})
+
+
+@api_view(['GET'])
+def liveness(request):
+    """Liveness probe: the process is up and serving requests"""
+    return Response({"status": "alive"})
+
+
+@api_view(['GET'])
+def readiness(request):
+    """
+    Readiness probe: 200 once the backend has loaded and run its warmup
+    queries, 503 before. The first probe starts warmup if nothing else has.
+    """
+    state = get_readiness()
+    state.start()
+    return Response(
+        state.stats(),
+        status=status.HTTP_200_OK if state.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+@api_view(['GET'])
+def quick_actions(request):
+    """
+    Every quick-action answer in one versioned response, so the frontend can
+    answer button presses locally and only revalidate with If-None-Match.
+    """
+    return conditional_json(
+        request, QUICK_ACTIONS_BUNDLE,
+        max_age=QUICK_ACTIONS_MAX_AGE,
+        shared_max_age=QUICK_ACTIONS_SHARED_MAX_AGE,
+        stale_while_revalidate=QUICK_ACTIONS_STALE_WHILE_REVALIDATE,
+        response_class=Response
+    )
+
+
 @api_view(['GET'])
 def weather_api(request):
     """Weather endpoint handler"""
     try:
         location = request.GET.get('location', 'Bale Mountains')
-        if chat_processor:
-            # Try to get weather data if processor supports it
-            if hasattr(chat_processor, '_get_weather'):
-                weather_data = chat_processor._get_weather(location)
-                if weather_data:
-                    return Response(weather_data)
-        
-        # Fallback weather response
-        return Response({
-            "location": location,
-            "temperature": "15-25°C",
-            "condition": "Cool mountain climate",
-            "note": "Weather data from local climate patterns"
-        })
+        # Served from the background-refreshed cache; never waits on the provider
+        weather_data = get_weather_service().get(location)
+        return weather_response(request, weather_data)
 
     except Exception as e:
         logger.error(f"Weather API error: {str(e)}", exc_info=True)
         return Response(
             {"error": "Weather service unavailable"},
             status=status.HTTP_503_SERVICE_UNAVAILABLE
-        )
\ No newline at end of file
+        )
+
+
+def weather_response(request, weather_data):
+    """Conditional response keyed on the reading itself, not on when it was fetched"""
+    reading = {
+        k: v for k, v in weather_data.items() if k not in ('fetched_at', 'age_seconds', 'stale')
+    }
+    return conditional_json(
+        request, weather_data,
+        max_age=WEATHER_MAX_AGE,
+        shared_max_age=WEATHER_SHARED_MAX_AGE,
+        stale_while_revalidate=WEATHER_STALE_WHILE_REVALIDATE,
+        etag_source=reading,
+        response_class=Response
+    )
@@ -0,0 +1,117 @@
+# chatapi/views_fast.py
+# Plain Django handlers for the lean API serving profile (settings_api).
+# They skip DRF content negotiation, parsers and authentication but keep
+# the exact response contract of ChatView.
+
+import json
+import logging
+import time
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .utils.admission import Overloaded, RateLimited, client_id, get_admission_controller, request_start
+from .utils.http_cache import DOCS_MAX_AGE, DOCS_SHARED_MAX_AGE, conditional_json
+from .utils.log_handlers import log_chat_request
+from .utils.query_log import QueryTrace, log_query
+from .utils.registry import configured_backend
+from .utils.tenants import UnknownTenant, get_tenant_processor
+
+logger = logging.getLogger(__name__)
+
+API_DOCUMENTATION = {
+    "message": "Bale Mountains National Park Chat API",
+    "status": "online",
+    "backend": configured_backend(),
+    "documentation": {
+        "POST /api/chat/": {
+            "description": "Process chat messages",
+            "parameters": {
+                "message": "String containing user query",
+                "tenant": "Optional park id (or X-Tenant header); defaults to Bale Mountains"
+            },
+            "example_request": {
+                "message": "What's the history of Bale Mountains?"
+            }
+        }
+    }
+}
+
+JSON_DUMPS_PARAMS = {'ensure_ascii': False}
+
+
+@csrf_exempt
+def fast_chat(request):
+    """Stateless chat endpoint: GET returns documentation, POST processes a message"""
+    if request.method == 'GET':
+        return conditional_json(
+            request, API_DOCUMENTATION,
+            max_age=DOCS_MAX_AGE,
+            shared_max_age=DOCS_SHARED_MAX_AGE
+        )
+    if request.method != 'POST':
+        return JsonResponse(
+            {"detail": f'Method "{request.method}" not allowed.'},
+            status=405
+        )
+
+    try:
+        try:
+            payload = json.loads(request.body or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            return JsonResponse({"detail": "JSON parse error"}, status=400)
+        if not isinstance(payload, dict):
+            payload = {}
+
+        tenant = payload.get('tenant') or request.headers.get('X-Tenant')
+        try:
+            chat_processor = get_tenant_processor(tenant)
+        except UnknownTenant as e:
+            return JsonResponse({"error": str(e)}, status=404)
+        if chat_processor is None:
+            logger.error("No chat backend could be loaded")
+            return JsonResponse(
+                {
+                    "text": "I'm sorry, but the chat service is currently unavailable. Please try again later.",
+                    "error": "Service initialization failed"
+                },
+                status=503
+            )
+
+        message = payload.get('message', '')
+        message = message.strip() if isinstance(message, str) else ''
+        if not message:
+            return JsonResponse({"error": "Message cannot be empty"}, status=400)
+
+        lane = chat_processor.admission_lane(message)
+        trace = QueryTrace()
+        started = time.perf_counter()
+        try:
+            with get_admission_controller().admit(client_id(request), lane, request_start(request)):
+                response_data = chat_processor.get_response(message, trace=trace)
+        except Overloaded as e:
+            logger.warning(f"Request shed: {e.reason}")
+            log_query(message, trace=trace, started=started, lane=lane,
+                      status=429 if isinstance(e, RateLimited) else 503)
+            response = JsonResponse(
+                {
+                    "text": "The chat service is busy right now. Please try again in a moment.",
+                    "error": "Too many requests" if isinstance(e, RateLimited) else "Server overloaded"
+                },
+                status=429 if isinstance(e, RateLimited) else 503
+            )
+            response['Retry-After'] = str(e.retry_after)
+            return response
+        log_query(message, response_data, trace, started, lane)
+        log_chat_request(logger, message, response_data, trace, started, lane, tenant=tenant)
+        return JsonResponse(response_data, json_dumps_params=JSON_DUMPS_PARAMS)
+
+    except Exception as e:
+        logger.error(f"POST Error: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {
+                "text": "I apologize, but I encountered an error while processing your request. Please try again.",
+                "error": "Processing failed"
+            },
+            status=500
+        )
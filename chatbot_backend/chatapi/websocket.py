@@ -0,0 +1,180 @@
+# chatapi/websocket.py
+# Chat over one WebSocket per conversation, dispatched from asgi.py without
+# going through Django's request cycle. Each message is answered with a
+# "start" frame (intent, confidence, number of parts), one "part" frame per
+# response part and an "end" frame. The processors build an answer in one
+# step, so all of it is computed before the first frame goes out; what the
+# socket saves over REST is the per-message request, preflight and
+# connection overhead, not inference time.
+
+import asyncio
+import json
+import logging
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from .utils.admission import Overloaded, RateLimited, client_id, get_admission_controller
+from .utils.log_handlers import log_chat_request
+from .utils.query_log import QueryTrace, log_query
+from .utils.resilience import deadline_scope
+from .utils.tenants import UnknownTenant, get_tenant_processor
+
+logger = logging.getLogger(__name__)
+
+CHAT_PATH = '/ws/chat/'
+POLICY_VIOLATION = 1008
+
+
+def origin_allowed(origin):
+    """Browsers do not apply CORS to WebSockets, so the handshake checks Origin itself"""
+    # Same lookup as django-cors-headers: the current name, then the older one
+    allow_all = getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', getattr(settings, 'CORS_ORIGIN_ALLOW_ALL', False))
+    if origin is None or allow_all:
+        return True
+    return origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', [])
+
+
+def handshake_request(scope):
+    """request.META-style view of the handshake for the admission helpers, and its Origin"""
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', [])}
+    meta = {'REMOTE_ADDR': (scope.get('client') or ['unknown'])[0]}
+    if 'x-forwarded-for' in headers:
+        meta['HTTP_X_FORWARDED_FOR'] = headers['x-forwarded-for']
+    return SimpleNamespace(META=meta), headers.get('origin')
+
+
+def answer(message, request, tenant=None):
+    """
+    Admission, processing and logging for one message; runs in a worker
+    thread, with the REQUEST_DEADLINE budget an HTTP request gets from
+    RequestDeadlineMiddleware.
+    """
+    with deadline_scope(getattr(settings, 'REQUEST_DEADLINE', 10.0)):
+        return _answer(message, request, tenant)
+
+
+def _answer(message, request, tenant):
+    try:
+        processor = get_tenant_processor(tenant)
+    except UnknownTenant as e:
+        return None, 404, str(e)
+    if processor is None:
+        return None, 503, "Service initialization failed"
+    lane = processor.admission_lane(message)
+    trace = QueryTrace()
+    started = time.perf_counter()
+    try:
+        with get_admission_controller().admit(client_id(request), lane):
+            response = processor.get_response(message, trace=trace)
+    except Overloaded as e:
+        status = 429 if isinstance(e, RateLimited) else 503
+        logger.warning(f"WebSocket message shed: {e.reason}")
+        log_query(message, trace=trace, started=started, lane=lane, status=status)
+        return None, status, "Too many requests" if status == 429 else "Server overloaded"
+    log_query(message, response, trace, started, lane)
+    log_chat_request(logger, message, response, trace, started, lane, transport='websocket', tenant=tenant)
+    return response, 200, None
+
+
+class ChatConnection:
+    """
+    One accepted socket. Messages are answered one at a time in arrival
+    order; at most WEBSOCKET_MAX_PENDING wait behind the one in progress and
+    further messages are refused with a 429 error frame rather than
+    buffered. Frames are sent one by one, each awaiting the server's flow
+    control, so a slow reader holds back its own answers only.
+    """
+
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self.request, self.origin = handshake_request(scope)
+        self.pending = asyncio.Queue(maxsize=getattr(settings, 'WEBSOCKET_MAX_PENDING', 8))
+
+    async def send(self, frame):
+        async with self._send_lock:
+            await self._send({
+                'type': 'websocket.send',
+                'text': json.dumps(frame, ensure_ascii=False, separators=(',', ':')),
+            })
+
+    async def error(self, message_id, status, error):
+        await self.send({'type': 'error', 'id': message_id, 'status': status, 'error': error})
+
+    async def run(self):
+        if (await self.receive())['type'] != 'websocket.connect':
+            return
+        if self.scope.get('path') != CHAT_PATH or not origin_allowed(self.origin):
+            # Closing before accepting rejects the handshake with HTTP 403
+            await self._send({'type': 'websocket.close', 'code': POLICY_VIOLATION})
+            return
+        await self._send({'type': 'websocket.accept'})
+
+        worker = asyncio.create_task(self.serve())
+        try:
+            while True:
+                event = await self.receive()
+                if event['type'] == 'websocket.disconnect':
+                    break
+                if event['type'] == 'websocket.receive':
+                    await self.enqueue(event.get('text') or (event.get('bytes') or b'').decode('utf-8', 'replace'))
+        finally:
+            worker.cancel()
+
+    async def enqueue(self, text):
+        try:
+            payload = json.loads(text)
+            message_id = payload.get('id')
+            message = str(payload.get('message', '')).strip()
+            tenant = payload.get('tenant')
+        except (ValueError, AttributeError):
+            await self.error(None, 400, "Invalid JSON")
+            return
+        if not message:
+            await self.error(message_id, 400, "Message cannot be empty")
+            return
+        try:
+            self.pending.put_nowait((message_id, message, tenant, time.perf_counter()))
+        except asyncio.QueueFull:
+            await self.error(message_id, 429, "Too many pending messages")
+
+    async def serve(self):
+        while True:
+            message_id, message, tenant, received = await self.pending.get()
+            try:
+                response, status, error = await asyncio.to_thread(answer, message, self.request, tenant)
+            except Exception as e:
+                # One failed message must not stop the answers to the next ones
+                logger.error(f"WebSocket message failed: {str(e)}", exc_info=True)
+                response, status, error = None, 500, "Processing failed"
+            try:
+                await self.reply(message_id, response, status, error, received)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The client went away mid-answer; the receive loop sees the disconnect
+                logger.info(f"WebSocket send failed: {str(e)}")
+                return
+
+    async def reply(self, message_id, response, status, error, received):
+        if response is None:
+            await self.error(message_id, status, error)
+            return
+        parts = response.get('parts') or []
+        await self.send({
+            'type': 'start', 'id': message_id, 'parts': len(parts),
+            **{key: value for key, value in response.items() if key != 'parts'},
+        })
+        for index, part in enumerate(parts):
+            await self.send({'type': 'part', 'id': message_id, 'index': index, 'part': part})
+        await self.send({
+            'type': 'end', 'id': message_id,
+            'latency_ms': round((time.perf_counter() - received) * 1000, 3),
+        })
+
+async def websocket_application(scope, receive, send):
+    await ChatConnection(scope, receive, send).run()
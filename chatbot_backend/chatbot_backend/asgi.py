@@ -13,4 +13,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from chatapi.utils.warmup import start_warmup  # noqa: E402
+from chatapi.websocket import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """HTTP goes to Django; WebSocket connections to the chat channel at /ws/chat/"""
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
+
+
+# Load and warm up the chat backend before the readiness probe passes
+start_warmup()
@@ -43,13 +43,41 @@ ALLOWED_HOSTS = [
     'baale-mountain-tour-chatbot.up.railway.app'
 ]
 
-# Logging configuration to reduce noise
+# Logging: records go through a bounded queue to a background thread that
+# writes them to stderr, as JSON lines (LOG_FORMAT=json) or plain text.
+# Routine per-request records are sampled (LOG_SAMPLE_RATE, at most
+# LOG_MAX_SAMPLED_PER_SECOND); errors and requests slower than
+# LOG_SLOW_REQUEST_MS are always logged in full.
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0.05'))
+LOG_MAX_SAMPLED_PER_SECOND = float(os.environ.get('LOG_MAX_SAMPLED_PER_SECOND', '10'))
+LOG_SLOW_REQUEST_MS = float(os.environ.get('LOG_SLOW_REQUEST_MS', '500'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'chatapi.utils.log_handlers.JsonFormatter',
+        },
+        'text': {
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+    },
+    'filters': {
+        'sampling': {
+            '()': 'chatapi.utils.log_handlers.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+            'max_per_second': LOG_MAX_SAMPLED_PER_SECOND,
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            '()': 'chatapi.utils.log_handlers.AsyncHandler',
+            'queue_size': LOG_QUEUE_SIZE,
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
         },
     },
     'loggers': {
@@ -84,13 +112,13 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'chatapi.middleware.RequestDeadlineMiddleware',
 ]
-CORS_ORIGIN_ALLOW_ALL = DEBUG  # Only allow all in development
+CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only allow all in development
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React dev server
@@ -100,21 +128,148 @@ CORS_ALLOWED_ORIGINS = [
     "https://ajme-abes.github.io"
 ]
 CORS_ALLOW_METHODS = [
+    'GET',
     'POST',
     'OPTIONS',
 ]
 CORS_ALLOW_HEADERS = [
     'content-type',
+    'if-none-match',
+    'if-modified-since',
+    'authorization',
+    'x-admin-token',
+    'x-tenant',
+]
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'last-modified',
 ]
 # Add these to your Django settings
 TRANSLATION_SERVICE = 'google'  # or 'deepl'
-GOOGLE_TRANSLATE_API_KEY = 'your_google_translate_api_key_here'
-GOOGLE_TRANSLATE_API_KEY = 'your-google-api-key'
+GOOGLE_TRANSLATE_API_KEY = os.environ.get('GOOGLE_TRANSLATE_API_KEY', 'your-google-api-key')
+GOOGLE_TRANSLATE_URL = os.environ.get(
+    'GOOGLE_TRANSLATE_URL', 'https://translation.googleapis.com/language/translate/v2'
+)
 DEEPL_API_KEY = 'your-deepl-key'
-OPENWEATHER_API_KEY = 'your_openweathermap_api_key_here'
-OPENWEATHER_API_KEY = 'your-openweathermap-key'
-OPENWEATHER_API_KEY = 'your_actual_api_key_here'
-OPENWEATHER_API_KEY = 'your_api_key_here'
+OPENWEATHER_API_KEY = os.environ.get('OPENWEATHER_API_KEY', 'your_api_key_here')
+
+# Weather service: readings are refreshed in the background every
+# WEATHER_REFRESH_INTERVAL seconds, served as fresh for WEATHER_TTL and as
+# stale (while a refresh runs) up to WEATHER_MAX_STALE. WEATHER_PROVIDER
+# takes a dotted path to a provider class; by default OpenWeather is used
+# when a key is configured and local climate normals otherwise.
+WEATHER_PROVIDER = os.environ.get('WEATHER_PROVIDER') or None
+WEATHER_TTL = int(os.environ.get('WEATHER_TTL', '600'))
+WEATHER_MAX_STALE = int(os.environ.get('WEATHER_MAX_STALE', '3600'))
+WEATHER_REFRESH_INTERVAL = int(os.environ.get('WEATHER_REFRESH_INTERVAL', '300'))
+# At most WEATHER_MAX_LOCATIONS client-supplied locations are kept refreshed;
+# one not requested within WEATHER_MAX_STALE is dropped.
+WEATHER_MAX_LOCATIONS = int(os.environ.get('WEATHER_MAX_LOCATIONS', '32'))
+
+# Outbound call resilience (translation, weather)
+# Each request gets REQUEST_DEADLINE seconds; outbound calls use at most
+# OUTBOUND_TIMEOUT of it and trip a per-dependency circuit breaker after
+# repeated failures, probing again after the reset timeout.
+REQUEST_DEADLINE = float(os.environ.get('REQUEST_DEADLINE', '10'))
+OUTBOUND_TIMEOUT = float(os.environ.get('OUTBOUND_TIMEOUT', '2'))
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '5'))
+CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_BREAKER_RESET_TIMEOUT', '30'))
+CIRCUIT_BREAKER_HALF_OPEN_CALLS = 1
+# A request waiting on an identical one already in flight gives up and
+# computes its own answer after the request deadline, or after
+# SINGLEFLIGHT_MAX_WAIT seconds when there is none (WebSocket, warmup).
+SINGLEFLIGHT_MAX_WAIT = float(os.environ.get('SINGLEFLIGHT_MAX_WAIT', '10'))
+
+# Admission control for /api/chat/
+# Cached and quick-action answers run in a fast lane, anything that may hit
+# the model or translator in a smaller model lane. Requests that have queued
+# (since the proxy's X-Request-Start) or would queue longer than the lane's
+# max queue delay get an early 503 with Retry-After;
+# each client is held to CLIENT_RATE_LIMIT requests/second (bursts up to
+# CLIENT_BURST) and gets 429 beyond that. Clients are told apart by the
+# X-Forwarded-For hop added by the outermost of TRUSTED_PROXY_COUNT proxies
+# (one on Render); set it to 0 when the server is reached directly.
+ADMISSION_FAST_CONCURRENCY = int(os.environ.get('ADMISSION_FAST_CONCURRENCY', '32'))
+ADMISSION_MODEL_CONCURRENCY = int(os.environ.get('ADMISSION_MODEL_CONCURRENCY', '4'))
+ADMISSION_FAST_MAX_QUEUE_DELAY = float(os.environ.get('ADMISSION_FAST_MAX_QUEUE_DELAY', '2'))
+ADMISSION_MODEL_MAX_QUEUE_DELAY = float(os.environ.get('ADMISSION_MODEL_MAX_QUEUE_DELAY', '0.5'))
+CLIENT_RATE_LIMIT = float(os.environ.get('CLIENT_RATE_LIMIT', '5'))
+CLIENT_BURST = int(os.environ.get('CLIENT_BURST', '20'))
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '1'))
+
+# Chat backend: simple, keras, cascade or bert, loaded on the first chat
+# request. Unset, it follows the older switches (USE_CASCADE_PROCESSOR,
+# RENDER / USE_SIMPLE_PROCESSOR, otherwise keras). If the backend cannot
+# load, CHAT_BACKEND_FALLBACK serves instead.
+CHAT_BACKEND = os.environ.get('CHAT_BACKEND') or None
+CHAT_BACKEND_FALLBACK = os.environ.get('CHAT_BACKEND_FALLBACK', 'simple')
+
+# Tenants: other parks served from this process, chosen per request by the
+# "tenant" field or X-Tenant header. TENANTS_CONFIG points to a JSON file
+# mapping tenant ids to their data directory (intents, compiled knowledge
+# base, model artifacts) and backend; requests without a tenant, or for
+# DEFAULT_TENANT, go to the configured backend above. Tenants load on first
+# use and the least recently used are unloaded while their combined
+# footprint exceeds TENANT_MEMORY_BUDGET_MB. Shared components (spaCy,
+# lemmatizer, tokenizer, phrase memory) are loaded once and not counted.
+TENANTS_CONFIG = os.environ.get('TENANTS_CONFIG', '')
+DEFAULT_TENANT = os.environ.get('DEFAULT_TENANT', 'bale')
+TENANT_MEMORY_BUDGET_MB = float(os.environ.get('TENANT_MEMORY_BUDGET_MB', '512'))
+
+# WebSocket chat (/ws/chat/, ASGI only): messages on one connection are
+# answered in order; at most WEBSOCKET_MAX_PENDING may wait behind the one
+# in progress before further ones are refused with a 429 error frame.
+WEBSOCKET_MAX_PENDING = int(os.environ.get('WEBSOCKET_MAX_PENDING', '8'))
+
+# Warmup: WSGI/ASGI workers load the chat backend at startup and run
+# WARMUP_QUERIES representative queries through every stage in the
+# background; /api/health/ready/ answers 503 until that has finished, while
+# /api/health/live/ only reports that the process is up.
+WARMUP_ON_START = os.environ.get('WARMUP_ON_START', 'true').lower() == 'true'
+WARMUP_QUERIES = int(os.environ.get('WARMUP_QUERIES', '48'))
+
+# Tiered inference (CHAT_BACKEND=cascade): quick actions and exact
+# patterns answer first, then the keyword matcher, the BoW model and the
+# optional heavy tier (CASCADE_HEAVY_TIER=bert) in turn, each only when the
+# previous one scored below its threshold.
+CASCADE_KEYWORD_THRESHOLD = float(os.environ.get('CASCADE_KEYWORD_THRESHOLD', '0.5'))
+CASCADE_MODEL_THRESHOLD = float(os.environ.get('CASCADE_MODEL_THRESHOLD', '0.7'))
+CASCADE_HEAVY_THRESHOLD = float(os.environ.get('CASCADE_HEAVY_THRESHOLD', '0.5'))
+CASCADE_HEAVY_TIER = os.environ.get('CASCADE_HEAVY_TIER') or None
+
+# Query log: one JSON line per chat request (normalized text, intent,
+# confidence, cache tier, stage timings) written by a background thread.
+# Records are dropped rather than delaying requests when the queue of
+# QUERY_LOG_QUEUE_SIZE fills up. Off unless a path is set, e.g.
+# /var/log/bale-chatbot/query_log.jsonl; each worker process writes its own
+# query_log.<pid>.jsonl next to it and rotates it at QUERY_LOG_MAX_BYTES,
+# keeping QUERY_LOG_BACKUPS old files.
+QUERY_LOG_PATH = os.environ.get('QUERY_LOG_PATH', '')
+QUERY_LOG_MAX_BYTES = int(os.environ.get('QUERY_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+QUERY_LOG_BACKUPS = int(os.environ.get('QUERY_LOG_BACKUPS', '5'))
+QUERY_LOG_QUEUE_SIZE = int(os.environ.get('QUERY_LOG_QUEUE_SIZE', '10000'))
+QUERY_LOG_BATCH_SIZE = int(os.environ.get('QUERY_LOG_BATCH_SIZE', '256'))
+
+# Cache warm start: the hottest CACHE_SNAPSHOT_ENTRIES entries of each cache
+# are written to CACHE_SNAPSHOT_PATH every CACHE_SNAPSHOT_INTERVAL seconds and
+# on shutdown, and preloaded at startup unless the artifacts changed. Off
+# unless a path is set; use one outside the source tree (e.g.
+# /var/lib/bale-chatbot/cache_snapshot.pkl). Workers sharing the file merge
+# their entries under a lock. CACHE_PREWARM also runs every training pattern
+# and the CACHE_PREWARM_TOP_QUERIES most frequent queries in
+# CACHE_PREWARM_QUERY_LOG (the query log by default) through the pipeline
+# before serving.
+CACHE_SNAPSHOT_PATH = os.environ.get('CACHE_SNAPSHOT_PATH', '')
+CACHE_SNAPSHOT_ENTRIES = int(os.environ.get('CACHE_SNAPSHOT_ENTRIES', '2000'))
+CACHE_SNAPSHOT_INTERVAL = int(os.environ.get('CACHE_SNAPSHOT_INTERVAL', '300'))
+CACHE_PREWARM = os.environ.get('CACHE_PREWARM', 'false').lower() == 'true'
+CACHE_PREWARM_QUERY_LOG = os.environ.get('CACHE_PREWARM_QUERY_LOG') or QUERY_LOG_PATH or None
+CACHE_PREWARM_TOP_QUERIES = int(os.environ.get('CACHE_PREWARM_TOP_QUERIES', '500'))
+
+# Admin endpoints (/api/admin/...) require this token as a Bearer token or
+# in X-Admin-Token; they answer 404 while it is unset.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN') or None
+
 ROOT_URLCONF = 'chatbot_backend.urls'
 
 TEMPLATES = [
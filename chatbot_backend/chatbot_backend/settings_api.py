@@ -0,0 +1,50 @@
+"""
+Lean API serving profile for chatbot_backend.
+
+The chat API is stateless and never touches the database, so this profile
+drops the session, auth, messages and CSRF machinery and routes /api/chat/
+to a plain Django view instead of the DRF stack.
+
+Enable it with:
+    DJANGO_SETTINGS_MODULE=chatbot_backend.settings_api
+"""
+
+import copy
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django.contrib.staticfiles',
+    'rest_framework',
+    'corsheaders',
+    'chatapi',
+]
+
+# CORS must stay first so preflight requests are answered before anything else
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'chatapi.middleware.RequestDeadlineMiddleware',
+]
+
+ROOT_URLCONF = 'chatbot_backend.urls_api'
+
+TEMPLATES = copy.deepcopy(TEMPLATES)  # noqa: F405
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    'django.template.context_processors.debug',
+    'django.template.context_processors.request',
+]
+
+# The remaining DRF endpoints (performance, weather) run without
+# authentication, permission checks or the browsable API renderer
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+}
+
+AUTH_PASSWORD_VALIDATORS = []
@@ -1,16 +1,16 @@
-import os
 from django.urls import path
 from django.views.generic import TemplateView
 
-# Use deployment views if in deployment environment
-if os.environ.get('RENDER') or os.environ.get('USE_SIMPLE_PROCESSOR'):
-    from chatapi.views_deployment import ChatView, weather_api, PerformanceView
-else:
-    from chatapi.views import ChatView, weather_api, PerformanceView
+from chatapi.views import ChatView, weather_api, PerformanceView, MemoryView, CompareView, liveness, readiness, quick_actions
 
 urlpatterns = [
     path('api/chat/', ChatView.as_view(), name='chat'),
     path('api/performance/', PerformanceView.as_view(), name='performance'),
+    path('api/admin/memory/', MemoryView.as_view(), name='admin-memory'),
+    path('api/admin/compare/', CompareView.as_view(), name='admin-compare'),
+    path('api/health/live/', liveness, name='health-live'),
+    path('api/health/ready/', readiness, name='health-ready'),
     path('', TemplateView.as_view(template_name='index.html')),
     path('api/weather/', weather_api, name='weather-api'),
+    path('api/quick-actions/', quick_actions, name='quick-actions'),
 ]
@@ -0,0 +1,17 @@
+from django.urls import path
+from django.views.generic import TemplateView
+
+from chatapi.views import weather_api, PerformanceView, MemoryView, CompareView, liveness, readiness, quick_actions
+from chatapi.views_fast import fast_chat
+
+urlpatterns = [
+    path('api/chat/', fast_chat, name='chat'),
+    path('api/performance/', PerformanceView.as_view(), name='performance'),
+    path('api/admin/memory/', MemoryView.as_view(), name='admin-memory'),
+    path('api/admin/compare/', CompareView.as_view(), name='admin-compare'),
+    path('api/health/live/', liveness, name='health-live'),
+    path('api/health/ready/', readiness, name='health-ready'),
+    path('', TemplateView.as_view(template_name='index.html')),
+    path('api/weather/', weather_api, name='weather-api'),
+    path('api/quick-actions/', quick_actions, name='quick-actions'),
+]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
 
 application = get_wsgi_application()
+
+# Load and warm up the chat backend before the readiness probe passes
+from chatapi.utils.warmup import start_warmup  # noqa: E402
+
+start_warmup()
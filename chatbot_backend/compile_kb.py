@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Knowledge-base compiler.
+Validates an intents file, deduplicates patterns, normalizes responses and
+writes the precompiled artifact (chatapi/utils/knowledge_base.pkl) the
+processors load at startup. Malformed files are rejected with every
+problem listed and a non-zero exit code.
+
+Usage:
+    python compile_kb.py [intents.json] [--output knowledge_base.pkl]
+    python compile_kb.py --check some_intents.json   # validate only
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+from chatapi.utils.kb_compiler import INTENTS_PATH, KB_PATH, KnowledgeBaseError, compile_kb, read_source, write_kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', nargs='?', default=str(INTENTS_PATH))
+    parser.add_argument('--output', default=str(KB_PATH))
+    parser.add_argument('--check', action='store_true', help='validate without writing the artifact')
+    args = parser.parse_args()
+
+    print(f"📚 Compiling {args.source}")
+    started = time.perf_counter()
+    try:
+        data, source_sha256 = read_source(args.source)
+        kb = compile_kb(data, source_sha256)
+    except KnowledgeBaseError as e:
+        print(f"❌ Rejected: {len(e.problems)} problem(s)")
+        for problem in e.problems:
+            print(f"   - {problem}")
+        sys.exit(1)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    for warning in kb['warnings']:
+        print(f"⚠️  {warning}")
+    patterns = sum(len(intent['patterns']) for intent in kb['intents']['intents'])
+    print(f"✅ {len(kb['tags'])} intents, {patterns} patterns, "
+          f"{len(kb['pattern_index'])} indexed, version {kb['version']} ({compile_ms:.1f} ms)")
+
+    if args.check:
+        return
+    write_kb(kb, args.output)
+    started = time.perf_counter()
+    with open(args.output, 'rb') as f:
+        pickle.load(f)
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"💾 Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB, loads in {load_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
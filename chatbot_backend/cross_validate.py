@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Stratified k-fold evaluation of the intent classifier.
+Every fold trains a fresh model (the notebook reused one model across folds,
+so later folds started from earlier folds' weights). Folds run in a process
+pool with TensorFlow's thread pools capped per process.
+
+Usage:
+    python cross_validate.py [--folds 5] [--workers N] [--epochs 200] [--compare]
+    --compare also runs the folds sequentially and reports the speedup
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import training
+from chatapi.utils.cross_validation import cross_validate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intents', default=str(training.INTENTS_PATH))
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: one per fold, up to the core count)')
+    parser.add_argument('--epochs', type=int, default=training.DEFAULT_EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=training.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=training.DEFAULT_SEED)
+    parser.add_argument('--compare', action='store_true', help='also run sequentially and report the speedup')
+    parser.add_argument('--report', help='write the full report as JSON to this path')
+    args = parser.parse_args()
+
+    tokenize, lemmatize = training.nltk_tokenizer()
+    words, classes, documents = training.build_vocabulary(training.load_intents(args.intents), tokenize, lemmatize)
+    X, y = training.build_matrix(documents, words, classes)
+    options = dict(n_splits=args.folds, epochs=args.epochs, batch_size=args.batch_size, seed=args.seed)
+
+    print("🔁 Stratified k-fold evaluation")
+    print("=" * 50)
+    print(f"{len(documents)} patterns, {len(classes)} classes, {args.folds} folds\n")
+
+    report = cross_validate(X, y, classes, workers=args.workers, **options)
+    print(f"⚡ Parallel: {report['workers']} workers x {report['threads_per_worker']} threads, "
+          f"{report['wall_seconds']:.1f}s wall")
+
+    if args.compare:
+        sequential = cross_validate(X, y, classes, workers=1, **options)
+        print(f"🐢 Sequential: {sequential['wall_seconds']:.1f}s wall")
+        print(f"🚀 Speedup: {sequential['wall_seconds'] / report['wall_seconds']:.2f}x")
+        report['sequential_wall_seconds'] = sequential['wall_seconds']
+
+    print(f"\n🎯 Accuracy: {report['accuracy']:.2%} "
+          f"(per fold {', '.join(f'{a:.2f}' for a in report['fold_accuracy'])}, std {report['fold_accuracy_std']:.3f})")
+    print(f"📊 Macro F1: {report['macro_f1']:.4f}  Weighted F1: {report['weighted_f1']:.4f}")
+    print(f"\n{'intent':<45}{'prec':>7}{'recall':>8}{'f1':>7}{'n':>5}")
+    for tag, metrics in sorted(report['per_class'].items(), key=lambda item: item[1]['f1']):
+        print(f"{tag[:44]:<45}{metrics['precision']:>7.2f}{metrics['recall']:>8.2f}{metrics['f1']:>7.2f}"
+              f"{metrics['support']:>5}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
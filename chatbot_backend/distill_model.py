@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Distil the fine-tuned BERT intent classifier (bert_baale_model) into the BoW
+student that ChatProcessor serves.
+Training patterns are augmented with paraphrases, typos and dropped words,
+labelled with the teacher's temperature-softened predictions blended with
+the gold intent, and used to train the student. Teacher and student are
+compared on the same held-out variants.
+
+Usage:
+    python distill_model.py [--copies 8] [--temperature 2.0] [--alpha 0.7]
+    python distill_model.py --write     # replace the serving artifacts with the student
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import distillation, training
+from chatapi.utils.bert_teacher import LABELS_PATH, TEACHER_DIR, BertTeacher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intents', default=str(training.INTENTS_PATH))
+    parser.add_argument('--teacher-dir', default=str(TEACHER_DIR))
+    parser.add_argument('--labels', default=str(LABELS_PATH))
+    parser.add_argument('--copies', type=int, default=distillation.DEFAULT_COPIES, help='augmented variants per pattern')
+    parser.add_argument('--temperature', type=float, default=distillation.DEFAULT_TEMPERATURE)
+    parser.add_argument('--alpha', type=float, default=distillation.DEFAULT_ALPHA, help='weight of the teacher targets')
+    parser.add_argument('--epochs', type=int, default=training.DEFAULT_EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=training.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=training.DEFAULT_SEED)
+    parser.add_argument('--write', action='store_true', help='write the student as the serving model')
+    args = parser.parse_args()
+
+    print("🎓 Distilling BERT teacher into the BoW student")
+    print("=" * 50)
+    teacher = BertTeacher(args.teacher_dir, args.labels)
+    intents = training.load_intents(args.intents)
+    tokenize, lemmatize = training.nltk_tokenizer()
+
+    student, words, classes, report = distillation.distill(
+        teacher, intents, tokenize, lemmatize,
+        copies=args.copies,
+        temperature=args.temperature,
+        alpha=args.alpha,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        seed=args.seed
+    )
+
+    print(f"📚 {report['training_examples']} training examples, "
+          f"{report['evaluation_examples']} held-out evaluation examples")
+    print(f"\n{'model':<10}{'accuracy':>10}{'known intents':>15}{'latency':>12}")
+    for name in ('teacher', 'student'):
+        metrics = report[name]
+        print(f"{name:<10}{metrics['accuracy']:>10.2%}{metrics['accuracy_on_known_intents']:>15.2%}"
+              f"{metrics['latency_ms']:>9.2f} ms")
+    speedup = report['teacher']['latency_ms'] / max(report['student']['latency_ms'], 1e-6)
+    print(f"\n🚀 Student is {speedup:.0f}x faster per message")
+    print("⏱️  Stage timings:")
+    for stage, seconds in report['stage_seconds'].items():
+        print(f"   {stage:<16}{seconds:>9.3f}s")
+
+    if args.write:
+        manifest = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'intents_sha256': training.file_sha256(args.intents),
+            'seed': args.seed,
+            'epochs': args.epochs,
+            'batch_size': args.batch_size,
+            'vocabulary_size': len(words),
+            'classes': len(classes),
+            'distillation': report,
+        }
+        training.write_artifacts(training.UTILS_DIR, words, classes, student, manifest)
+        print(f"✅ Student written to {training.UTILS_DIR}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Accuracy-vs-latency comparison of the intent backends.
+Builds a labelled query corpus from baale_mountain.json patterns with
+controlled perturbations (typos, paraphrase templates, extra and dropped
+words), runs every available backend over it in this process and prints
+accuracy, fallback rate, p50/p99 latency, throughput and memory per backend.
+Backends whose dependencies are missing are reported as skipped.
+
+Usage:
+    python evaluate_backends.py [--backends simple,keras,cascade,bert] [--variants 2]
+    python evaluate_backends.py --perturbations clean,typo --json report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from functools import partial
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import evaluation, registry, training
+
+
+# The bert entry is the classifier on its own, not the rules-then-BERT cascade
+BACKENDS = {
+    name: evaluation.processor_backend(partial(registry.create, name))
+    for name in ('simple', 'keras', 'cascade')
+}
+BACKENDS['bert'] = evaluation.bert_backend()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='comma-separated backends to compare')
+    parser.add_argument('--perturbations', default=','.join(evaluation.PERTURBATIONS))
+    parser.add_argument('--variants', type=int, default=2, help='variants per pattern and perturbation')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--intents', default=str(training.INTENTS_PATH))
+    parser.add_argument('--json', help='also write the full report to this file')
+    args = parser.parse_args()
+
+    perturbations = [p for p in args.perturbations.split(',') if p]
+    unknown = [p for p in perturbations if p not in evaluation.PERTURBATIONS]
+    if unknown:
+        parser.error(f"unknown perturbations: {', '.join(unknown)}")
+
+    corpus = evaluation.build_corpus(
+        training.load_intents(args.intents), perturbations, variants=args.variants, seed=args.seed
+    )
+    print("📊 Backend evaluation")
+    print("=" * 50)
+    counts = {kind: sum(k == kind for _, _, k in corpus) for kind in perturbations}
+    print(f"📚 {len(corpus)} labelled queries: " + ", ".join(f"{k} {n}" for k, n in counts.items()))
+
+    results, skipped = [], {}
+    for name in [b for b in args.backends.split(',') if b]:
+        if name not in BACKENDS:
+            parser.error(f"unknown backend: {name}")
+        print(f"⏳ {name}...")
+        try:
+            results.append(evaluation.evaluate_backend(name, BACKENDS[name], corpus))
+        except (ImportError, OSError) as e:
+            skipped[name] = str(e)
+            print(f"⚠️  {name} skipped: {e}")
+
+    print(f"\n{'backend':<8}{'accuracy':>10}{'fallback':>10}{'p50':>10}{'p99':>10}"
+          f"{'q/s':>9}{'load':>8}{'memory':>10}")
+    for r in results:
+        print(f"{r['backend']:<8}{r['accuracy']:>10.2%}{r['fallback_rate']:>10.2%}"
+              f"{r['p50_ms']:>7.2f} ms{r['p99_ms']:>7.2f} ms{r['throughput_qps']:>9.1f}"
+              f"{r['load_seconds']:>7.2f}s{r['memory_mb']:>7.1f} MB")
+
+    if results:
+        print(f"\n{'accuracy':<14}" + "".join(f"{r['backend']:>10}" for r in results))
+        for kind in perturbations:
+            print(f"{kind:<14}" + "".join(
+                f"{r['accuracy_by_perturbation'].get(kind, 0.0):>10.2%}" for r in results
+            ))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'queries': len(corpus), 'seed': args.seed, 'results': results, 'skipped': skipped}, f, indent=2)
+        print(f"\n✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Memory attribution for the chat backend.
+In-process, loads a backend, replays labelled queries between two
+tracemalloc snapshots and prints the RSS each component added at load time,
+the size of the loaded data and of every cache, and the top allocation
+growth. Against a running server, drives /api/admin/memory/ instead.
+
+Usage:
+    python memory_report.py [--backend simple|keras|cascade|bert] [--queries 2000]
+    python memory_report.py --url http://localhost:8000 --token $ADMIN_TOKEN
+    python memory_report.py --url ... --action start|snapshot|diff|stop [--label before] [--from before]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chatbot_backend.settings')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import evaluation, memory, registry, training
+
+MB = 1024 * 1024
+
+
+def print_report(report):
+    print(f"💾 RSS {report['rss_bytes'] / MB:.1f} MB (peak {report['peak_rss_bytes'] / MB:.1f} MB)")
+    print(f"\n{'component':<18}{'RSS added':>12}{'load':>10}")
+    for name, entry in report['components'].items():
+        print(f"{name:<18}{entry['rss_delta_bytes'] / MB:>9.1f} MB{entry['load_seconds']:>9.2f}s")
+    if 'data' in report:
+        print(f"\n{'data':<22}{'size':>12}")
+        for name, size in report['data'].items():
+            print(f"{name:<22}{size / 1024:>9.1f} KB")
+    if 'caches' in report:
+        print(f"\n{'cache':<22}{'entries':>9}{'size':>12}")
+        for name, entry in report['caches'].items():
+            print(f"{name:<22}{entry['entries']:>9}{entry['bytes'] / 1024:>9.1f} KB")
+
+
+def print_diff(diff):
+    print(f"\n📈 Allocations {diff['from']} → {diff['to'] or 'now'}: {diff['size_diff_bytes'] / 1024:+.1f} KB")
+    for stat in diff['top']:
+        print(f"   {stat['size_diff_bytes'] / 1024:>+9.1f} KB {stat['count_diff']:>+7} blocks  {stat['location']}")
+
+
+def run_local(args):
+    tracker = memory.get_allocation_tracker()
+    processor = registry.create(args.backend)
+    corpus = evaluation.build_corpus(training.load_intents(), variants=3)[:args.queries]
+
+    tracker.start()
+    tracker.snapshot('before')
+    for text, _, _ in corpus:
+        processor.get_response(text)
+    diff = tracker.diff('before', limit=args.limit)
+    report = memory.memory_report(processor)
+    tracker.stop()
+
+    print(f"🧠 Memory report: {args.backend} backend after {len(corpus)} queries")
+    print("=" * 50)
+    print_report(report)
+    print_diff(diff)
+    return {'report': report, 'diff': diff}
+
+
+def run_remote(args):
+    import requests
+
+    token = args.token or os.environ.get('ADMIN_TOKEN', '')
+    url = args.url.rstrip('/') + '/api/admin/memory/'
+    headers = {'Authorization': f'Bearer {token}'}
+    if args.action == 'report':
+        response = requests.get(url, headers=headers, timeout=30)
+    else:
+        payload = {'action': args.action, 'label': args.label, 'from': args.from_label,
+                   'to': args.to_label, 'limit': args.limit}
+        response = requests.post(url, headers=headers, timeout=60,
+                                 json={k: v for k, v in payload.items() if v is not None})
+    if response.status_code != 200:
+        sys.exit(f"❌ {response.status_code}: {response.text}")
+    result = response.json()
+
+    print(f"🧠 Memory {args.action} at {args.url}")
+    print("=" * 50)
+    if args.action == 'report':
+        print_report(result)
+    elif args.action == 'diff':
+        print_diff(result)
+    else:
+        print(json.dumps(result, indent=2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=list(registry.available_backends()), default='simple')
+    parser.add_argument('--queries', type=int, default=2000, help='queries replayed between snapshots')
+    parser.add_argument('--url', help='query a running server instead of loading a backend')
+    parser.add_argument('--token', help='admin token (defaults to $ADMIN_TOKEN)')
+    parser.add_argument('--action', choices=['report', 'start', 'snapshot', 'diff', 'stop'], default='report')
+    parser.add_argument('--label', help='snapshot label')
+    parser.add_argument('--from', dest='from_label', help='diff from this snapshot')
+    parser.add_argument('--to', dest='to_label', help='diff to this snapshot (default: now)')
+    parser.add_argument('--limit', type=int, default=15, help='allocation sites to show')
+    parser.add_argument('--json', help='also write the result to this file')
+    args = parser.parse_args()
+
+    result = run_remote(args) if args.url else run_local(args)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
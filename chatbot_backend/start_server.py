@@ -31,14 +31,15 @@ def start_server():
     if os.environ.get('RENDER') or os.environ.get('USE_SIMPLE_PROCESSOR'):
         print("🚀 Starting production server...")
         try:
-            # Use Gunicorn for production
+            # Gunicorn with ASGI workers, so /ws/chat/ is served next to the REST API
             subprocess.run([
                 sys.executable, 
                 "-m", "gunicorn",
                 "--bind", f"0.0.0.0:{os.environ.get('PORT', '8000')}",
                 "--workers", "2",
                 "--timeout", "120",
-                "chatbot_backend.wsgi:application"
+                "--worker-class", "uvicorn.workers.UvicornWorker",
+                "chatbot_backend.asgi:application"
             ], check=True)
         except KeyboardInterrupt:
             print("\n\n🛑 Server stopped by user")
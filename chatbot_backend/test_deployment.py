@@ -35,8 +35,16 @@ def test_imports():
         print(f"✅ SimpleProcessor response: {result['intent']} ({result['confidence']})")
         
         print("Testing views import...")
-        from chatapi.views_deployment import ChatView
-        print("✅ Deployment views import successful")
+        from chatapi.views import ChatView
+        from chatapi.utils.registry import active_backend, get_processor
+        print("✅ Views import successful")
+
+        print("Testing backend registry...")
+        get_processor()
+        loaded = [name for name in ('tensorflow', 'spacy', 'transformers') if name in sys.modules]
+        if active_backend() != 'simple' or loaded:
+            raise RuntimeError(f"Expected the simple backend alone, got {active_backend()} with {loaded}")
+        print("✅ Registry resolved the simple backend without ML imports")
         
         return True
         
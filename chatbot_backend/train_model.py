@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Training pipeline for the ChatProcessor intent model.
+Replaces the training cells of chatbot.ipynb: reads baale_mountain.json,
+builds the BoW matrix, trains with a fixed seed and deterministic kernels,
+and atomically writes vocabulary.pkl, classes.pkl, chatbot_model.keras and
+training_manifest.json into chatapi/utils/.
+
+Usage:
+    python train_model.py [--epochs 200] [--batch-size 16] [--seed 42]
+    python train_model.py --dry-run        # build the dataset only, no TensorFlow needed
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from chatapi.utils import training
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intents', default=str(training.INTENTS_PATH))
+    parser.add_argument('--output-dir', default=str(training.UTILS_DIR))
+    parser.add_argument('--epochs', type=int, default=training.DEFAULT_EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=training.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=training.DEFAULT_SEED)
+    parser.add_argument('--dry-run', action='store_true', help='build vocabulary and matrix without training')
+    args = parser.parse_args()
+
+    print("🏋️ Training Bale Mountains intent model")
+    print("=" * 50)
+    manifest = training.run(
+        intents_path=args.intents,
+        output_dir=args.output_dir,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        dry_run=args.dry_run
+    )
+
+    print(f"📚 {manifest['documents']} patterns, {manifest['vocabulary_size']} words, {manifest['classes']} classes")
+    if 'train_accuracy' in manifest:
+        print(f"🎯 Training accuracy: {manifest['train_accuracy']:.2%} (loss {manifest['train_loss']:.4f})")
+    print("⏱️  Stage timings:")
+    for stage, seconds in manifest['stage_seconds'].items():
+        print(f"   {stage:<12}{seconds:>9.3f}s")
+    if args.dry_run:
+        print("ℹ️  Dry run, no artifacts written")
+    else:
+        print(f"✅ Artifacts written to {args.output_dir}")
+        print(json.dumps(manifest['artifacts'], indent=2))
+
+
+if __name__ == "__main__":
+    main()